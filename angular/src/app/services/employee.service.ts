@@ -8,6 +8,9 @@
  * - deleteEmployee(id): Delete an employee by ID
  * - getEmployeeById(id): Get details of a single employee
  * - updateEmployee(id, employee): Update employee details
+ * - getEmployeesByIds(ids): Get several employees in one request
+ * - updateEmployees(items, mode): Update several employees in one request
+ * - deleteEmployees(ids, mode): Delete several employees in one request
  */
 import { Injectable } from '@angular/core';
 import { HttpClient } from '@angular/common/http';
@@ -56,4 +59,17 @@ export class EmployeeService {
   updateEmployee(id: any, employee: any): Observable<any> {
     return this.http.put<any>(`${this.apiUrl}/${id}`, employee, { headers: this.getAuthHeaders() });
   }
+
+  getEmployeesByIds(ids: number[]): Observable<any> {
+    return this.http.post<any>(`${this.apiUrl}/batch-get`, { ids }, { headers: this.getAuthHeaders() });
+  }
+
+  // items: [{ id, ...changed fields }]; mode 'all_or_nothing' (default) or 'best_effort'
+  updateEmployees(items: any[], mode: string = 'all_or_nothing'): Observable<any> {
+    return this.http.patch<any>(`${this.apiUrl}/batch`, { items, mode }, { headers: this.getAuthHeaders() });
+  }
+
+  deleteEmployees(ids: number[], mode: string = 'all_or_nothing'): Observable<any> {
+    return this.http.delete<any>(`${this.apiUrl}/batch`, { headers: this.getAuthHeaders(), body: { ids, mode } });
+  }
 }
@@ -5,90 +5,192 @@ Main Flask application entry point for Employee Directory.
 This file sets up the Flask app, configures the database, registers blueprints, and defines RESTful API endpoints for employee CRUD operations.
 It uses Pydantic for input validation and SQLAlchemy for ORM/database access.
 """
-from flask import Flask, request, jsonify
-from flask_mail import Mail, Message
+from flask import Blueprint, Flask, Response, current_app, request, jsonify, stream_with_context
+from flask_mail import Mail
 import re
 from employee_app.app.models.db import db
 from employee_app.app.models.models import Employee, User
-from employee_app.app.models.reset_token import PasswordResetToken
 from employee_app.app.models.schemas import EmployeeCreateSchema, EmployeeUpdateSchema, UserRegisterSchema, UserLoginSchema
+from employee_app.app.pagination import InvalidCursor, decode_cursor, encode_cursor, keyset_page
+from employee_app.app.search import init_search, apply_search, order_by_relevance
+from employee_app.app.counts import COUNT_MODES, CountCache, count_total
+from employee_app.app.bulk_import import import_employees, iter_csv, iter_ndjson
+from employee_app.app.export import EXPORT_FORMATS, export_statement, generate_export
+from employee_app.app.token_cache import TokenCache
+from employee_app.app.cache import ResponseCache
+from employee_app.app.ratelimit import RateLimiter
+from employee_app.app.etags import conditional_get, employee_etag, employee_etag_by_id, if_match_failed, list_etag
+from employee_app.app.compression import init_compression
+from employee_app.app.metrics import init_metrics
+from employee_app.app.batch import BatchError, delete_employees, get_employees_by_id, parse_ids, parse_mode, update_employees
+from employee_app.app.serialization import employee_columns, employee_dicts, init_json
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
 from flask_cors import CORS
-from werkzeug.security import generate_password_hash, check_password_hash
+from employee_app.app.passwords import PasswordHasher, PasswordHasherBusy
+from employee_app.app.mailer import drain_outbox, enqueue_email, start_outbox_worker
+from employee_app.app.reset_tokens import find_valid_token, issue_reset_token, purge_reset_tokens
+from employee_app.app.config import get_config
+from employee_app.app.engine import engine_options, pool_stats, tune_engines
+from employee_app.app.migrate import init_migrations, upgrade_database
+import click
 import logging
-from dotenv import load_dotenv
 import os
 from datetime import datetime, timedelta
 import jwt as pyjwt
 from datetime import datetime, timedelta, timezone
-import secrets
+import math
+from functools import wraps
 
 """
-Flask-Mail setup and environment loading
+Extensions
+Created unconfigured at import; create_app() configures them from app.config via init_app
 """
 mail = Mail()  # Create Flask-Mail instance
-app = Flask(__name__)
-# Load environment variables based on APP_ENV (custom, not deprecated)
-env = os.environ.get('APP_ENV', 'development')
-if env == 'production':
-    # Load production environment variables
-    load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env.prod'))
-else:
-    # Load development environment variables
-    load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env.dev'))
-# Enable CORS for cross-origin requests from frontend
-CORS(app, resources={r"/*": {"origins": ["http://localhost:4200"]}}, supports_credentials=True)
-database_url = os.environ.get('DATABASE_URL')
-secret_key = os.environ.get('SECRET_KEY')
-# Configure mail settings from environment
-app.config['MAIL_SERVER'] = os.environ.get('MAIL_SERVER')
-app.config['MAIL_PORT'] = int(os.environ.get('MAIL_PORT', 587))
-app.config['MAIL_USE_TLS'] = os.environ.get('MAIL_USE_TLS', 'True') == 'True'
-app.config['MAIL_USERNAME'] = os.environ.get('MAIL_USERNAME')
-app.config['MAIL_PASSWORD'] = os.environ.get('MAIL_PASSWORD')
-app.config['MAIL_DEFAULT_SENDER'] = os.environ.get('MAIL_DEFAULT_SENDER')
-# Debug print for mail config (for troubleshooting)
-print("Loaded mail config:")
-for key in ['MAIL_SERVER', 'MAIL_PORT', 'MAIL_USE_TLS', 'MAIL_USERNAME', 'MAIL_PASSWORD', 'MAIL_DEFAULT_SENDER']:
-    print(f"  {key}: {app.config.get(key)}")
-# Validate mail config and warn if missing
-missing_mail_settings = []
-for key in ['MAIL_SERVER', 'MAIL_PORT', 'MAIL_USERNAME', 'MAIL_PASSWORD', 'MAIL_DEFAULT_SENDER']:
-    if not app.config.get(key):
-        missing_mail_settings.append(key)
-if missing_mail_settings:
-    logging.warning(f"Missing mail settings: {', '.join(missing_mail_settings)}. Password reset emails may not work.")
-mail.init_app(app)  # Initialize Flask-Mail with app
-if env == 'production':
-    if not database_url or not secret_key:
-        raise RuntimeError('DATABASE_URL and SECRET_KEY must be set in production environment!')
-    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
-    app.config['SECRET_KEY'] = secret_key
-else:
-    app.config['SQLALCHEMY_DATABASE_URI'] = database_url or 'sqlite:///employees.db'
-    app.config['SECRET_KEY'] = secret_key or 'your_secret_key_here'
-db.init_app(app)  # Initialize SQLAlchemy ORM
-
-# Password reset request endpoint (sends email to user)
-@app.route('/password-reset-request', methods=['POST'])
+# All endpoints are registered on this blueprint; create_app() attaches it to each app instance
+bp = Blueprint('api', __name__, cli_group=None)
+# Cache of listing totals, keyed by the employee table version so writes from any worker retire them
+count_cache = CountCache()
+# Read-through cache of employee read responses, keyed by their ETags
+response_cache = ResponseCache()
+# Cache of verified token payloads so repeat requests skip signature verification
+token_cache = TokenCache()
+# Password hashing runs on a bounded process pool so logins cannot starve other requests of CPU
+password_hasher = PasswordHasher()
+# Token buckets per client IP and email for the authentication endpoints
+rate_limiter = RateLimiter()
+
+
+def outbox_drain_options(app):
+    """
+    Outbox sender settings from the app config, as keyword arguments for drain_outbox.
+    Args:
+        app: Flask app
+    Returns:
+        Dict with batch_size, max_attempts and backoff
+    """
+    return {
+        'batch_size': app.config['MAIL_OUTBOX_BATCH_SIZE'],
+        'max_attempts': app.config['MAIL_OUTBOX_MAX_ATTEMPTS'],
+        'backoff': app.config['MAIL_OUTBOX_BACKOFF'],
+    }
+
+def clear_counts():
+    """
+    Drop this process's cached listing totals after employee writes have committed.
+    Totals of older table versions are unreachable anyway; clearing frees them at once. Cached responses need no
+    invalidation: their keys embed the ETags the write has changed.
+    """
+    count_cache.clear()
+
+
+def find_user(email):
+    """
+    Look up a user by email regardless of letter case, as uniqueness is enforced (served by ux_user_email_lower).
+    Args:
+        email: Email from the request
+    Returns:
+        User or None
+    """
+    if not isinstance(email, str):
+        return None
+    return User.query.filter(func.lower(User.email) == email.lower()).first()
+
+
+def integrity_error(error):
+    """
+    Response for a write rejected by a database constraint. Must be called after rolling back.
+    Args:
+        error: IntegrityError
+    Returns:
+        'User already exists' for the unique email indexes, the database message otherwise; 400 either way
+    """
+    if 'email' in str(error.orig).lower():
+        return jsonify({'error': 'User already exists'}), 400
+    return jsonify({'error': str(error.orig)}), 400
+
+
+@bp.errorhandler(PasswordHasherBusy)
+def hasher_busy(error=None):
+    """
+    Response for a request whose password hash could not be computed because the hashing pool is saturated.
+    Also registered as the blueprint's handler, for views without their own try block.
+    Args:
+        error: PasswordHasherBusy (unused)
+    Returns:
+        503 with a Retry-After header from PASSWORD_HASH_RETRY_AFTER
+    """
+    response = jsonify({'error': 'Service busy, please try again later'})
+    response.headers['Retry-After'] = str(current_app.config['PASSWORD_HASH_RETRY_AFTER'])
+    return response, 503
+
+
+def cached_response(key_for):
+    """
+    Decorator serving a GET endpoint's JSON body from the response cache.
+    Must be applied under conditional_get: the key is built from the ETag it has just read from the database, so a
+    cached body is only served with the ETag of the version it was computed from, whichever worker made the last
+    write. Requests without an ETag (missing employees) bypass the cache. Only 200 responses are cached.
+    Args:
+        key_for: Function of the ETag returning the cache key
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if not response_cache.enabled:
+                return f(*args, **kwargs)
+            if request.etag is None:
+                return f(*args, **kwargs)
+            key = key_for(request.etag)
+            body = response_cache.get(key)
+            if body is not None:
+                return Response(body, mimetype='application/json', headers={'X-Cache': 'HIT'})
+            response = current_app.make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                response_cache.set(key, response.get_data())
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return decorated
+    return decorator
+
+
+def rate_limited(endpoint):
+    """
+    Decorator answering 429 Too Many Requests when one of the endpoint's rate limits is exhausted.
+    Runs before the view, so a throttled request never queries the database, hashes a password or queues an email.
+    Args:
+        endpoint: Key in RATE_LIMITS, e.g. 'login'
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if rate_limiter.enabled:
+                retry_after = rate_limiter.check(endpoint)
+                if retry_after:
+                    response = jsonify({'error': 'Too many requests, please try again later'})
+                    response.headers['Retry-After'] = str(math.ceil(retry_after))
+                    return response, 429
+            return f(*args, **kwargs)
+        return decorated
+    return decorator
+
+# Password reset request endpoint (queues an email to the user)
+@bp.route('/password-reset-request', methods=['POST'])
+@rate_limited('password_reset_request')
 def password_reset_request():
     try:
         email = request.json.get('email')  # Get email from request
-        user = User.query.filter_by(email=email).first()  # Find user by email
+        user = find_user(email)
         if not user:
             return jsonify({'error': 'No user found with that email'}), 404
-        # Generate secure token for password reset
-        token = secrets.token_urlsafe(32)
-        # Save token and expiration to DB
-        expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
-        reset_token = PasswordResetToken(user_id=user.id, token=token, expires_at=expires_at)
-        db.session.add(reset_token)
-        db.session.commit()
+        # Generate a secure token; only its hash and expiry are saved
+        token = issue_reset_token(user.id)
         # Build password reset link for frontend using FRONTEND_URL from environment
-        frontend_url = os.environ.get('FRONTEND_URL', 'http://localhost:4200')
+        frontend_url = current_app.config['FRONTEND_URL']
         reset_link = f"{frontend_url}/reset-password?token={token}"
-        # Create and send email message
-        msg = Message('Password Reset Request', recipients=[email])
-        msg.body = (
+        # Queue the email in the same transaction as the token; the outbox worker sends it
+        body = (
             f"Hello {user.name},\n\n"
             f"We received a request to reset your password for your Employee Directory account.\n\n"
             f"To reset your password, please click the link below or copy and paste it into your browser:\n\n"
@@ -96,41 +198,19 @@ def password_reset_request():
             f"If you did not request a password reset, please ignore this email.\n\n"
             f"Thank you,\nEmployee Directory Team"
         )
-        mail.send(msg)
-        return jsonify({'message': 'Password reset email sent!', 'token': token})
+        enqueue_email(email, 'Password Reset Request', body)
+        db.session.commit()
+        return jsonify({'message': 'Password reset email sent!'})
     except Exception as e:
         logging.error(f"Password reset error: {e}")
         return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
 
 """
 JWT configuration
-JWT_SECRET: Secret key for signing tokens
 JWT_ALGORITHM: Algorithm used for JWT
-JWT_EXP_DELTA_SECONDS: Token expiration time in seconds
+The signing key (JWT_SECRET_KEY), expiration (JWT_EXP_DELTA_SECONDS) and cache settings live in app.config
 """
-JWT_SECRET = os.environ.get('JWT_SECRET_KEY', 'your-jwt-secret-key')
 JWT_ALGORITHM = 'HS256'
-JWT_EXP_DELTA_SECONDS = int(os.environ.get('JWT_EXP_DELTA_SECONDS', 3600))
-
-# Setup basic logging
-logging.basicConfig(level=logging.INFO)
-
-with app.app_context():
-    """
-    Initialize database and add sample employees if table is empty.
-    """
-    db.create_all()  # Create tables
-    # Add sample employees if table is empty
-    if Employee.query.count() == 0:
-        sample_employees = [
-            Employee(name="Alice Smith", email="alice@example.com", department="HR", phone="1234567890"),
-            Employee(name="Bob Johnson", email="bob@example.com", department="IT", phone="2345678901"),
-            Employee(name="Charlie Lee", email="charlie@example.com", department="Finance", phone="3456789012"),
-            Employee(name="Diana King", email="diana@example.com", department="Marketing", phone="4567890123"),
-            Employee(name="Evan Wright", email="evan@example.com", department="Sales", phone="5678901234"),
-        ]
-        db.session.add_all(sample_employees)
-        db.session.commit()
 
 
 # Helper to create JWT token
@@ -146,9 +226,29 @@ def create_jwt(user):
         'user_id': user.id,  # User ID
         'name': user.name,   # User name
         'email': user.email, # User email
-    'exp': datetime.now(timezone.utc) + timedelta(seconds=JWT_EXP_DELTA_SECONDS)  # Expiration
+    'exp': datetime.now(timezone.utc) + timedelta(seconds=current_app.config['JWT_EXP_DELTA_SECONDS'])  # Expiration
     }
-    return pyjwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    return pyjwt.encode(payload, current_app.config['JWT_SECRET_KEY'], algorithm=JWT_ALGORITHM)
+
+
+def verify_jwt(token):
+    """
+    Verify a JWT and return its payload, using the verified-token cache when enabled.
+    Args:
+        token: Raw JWT string
+    Returns:
+        Decoded payload
+    Raises:
+        pyjwt.InvalidTokenError: If the token is invalid or expired
+    """
+    cache_enabled = current_app.config['JWT_CACHE_ENABLED']
+    secret = current_app.config['JWT_SECRET_KEY']
+    payload = token_cache.get(token, secret) if cache_enabled else None
+    if payload is None:
+        payload = pyjwt.decode(token, secret, algorithms=[JWT_ALGORITHM])
+        if cache_enabled:
+            token_cache.set(token, payload, secret)
+    return payload
 
 
 # JWT validation decorator
@@ -157,7 +257,6 @@ def jwt_required(f):
     Decorator to require JWT authentication for protected endpoints.
     Checks for valid token in Authorization header.
     """
-    from functools import wraps
     @wraps(f)
     def decorated(*args, **kwargs):
         auth_header = request.headers.get('Authorization', None)
@@ -165,56 +264,175 @@ def jwt_required(f):
             return jsonify({'error': 'Missing or invalid token'}), 401
         token = auth_header.split(' ')[1]
         try:
-            payload = pyjwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+            payload = verify_jwt(token)
             request.user = payload  # Attach user info to request
         except Exception as e:
             return jsonify({'error': 'Invalid or expired token'}), 401
         return f(*args, **kwargs)
     return decorated
 
+# Columns clients may sort employee listings and exports by
+SORT_FIELDS = ['id', 'name', 'email', 'department', 'phone']
+
+
+def sort_columns(sort_field):
+    """
+    ORDER BY columns for a sort field: the field itself, then id as the tiebreaker.
+    Args:
+        sort_field: One of SORT_FIELDS
+    Returns:
+        List of Employee columns
+    """
+    if sort_field == 'id':
+        return [Employee.id]
+    return [getattr(Employee, sort_field), Employee.id]
+
 # Example: protect employee endpoints
-@app.route('/employees', methods=['GET'])
+@bp.route('/employees', methods=['GET'])
 @jwt_required
+@conditional_get(lambda: list_etag(request.args))
+@cached_response(lambda etag: response_cache.list_key(request.args, etag))
 def get_employees():
+    """
+    List employees with search, department filter, sorting and pagination (JWT protected).
+    Uses page/per_page by default. Passing `after` (empty for the first page) switches to cursor mode,
+    which seeks on (sort, id), skips the total count and returns `next_cursor` instead of page counts.
+    In page mode `count` selects how `total` is computed: exact (default, cached), estimate or none.
+    Returns:
+        Page of employees as JSON
+    """
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 5, type=int)
     sort_field = request.args.get('sort', None)
     sort_direction = request.args.get('direction', 'asc')
-    query = Employee.query
+    # Plain column tuples: no ORM entities are built for a response that is only serialized
+    query = Employee.query.with_entities(*employee_columns())
     search = request.args.get('search', None)
     if search:
-        search_pattern = f"%{search}%"
-        query = query.filter(
-            Employee.name.ilike(search_pattern) |
-            Employee.email.ilike(search_pattern) |
-            Employee.department.ilike(search_pattern) |
-            Employee.phone.ilike(search_pattern)
-        )
-    if sort_field in ['id', 'name', 'email', 'department', 'phone']:
+        query = apply_search(query, search)  # Indexed prefix search, see search.py
+    department = request.args.get('department', None)
+    if department:
+        query = query.filter(Employee.department == department)
+    if 'after' in request.args:
+        return get_employees_after(query, per_page, sort_field, sort_direction, request.args.get('after'))
+    if sort_field in SORT_FIELDS:
+        # id breaks ties so page boundaries are stable; every (sort, id) pair has a matching index
+        columns = sort_columns(sort_field)
         if sort_direction == 'desc':
-            query = query.order_by(getattr(Employee, sort_field).desc())
+            query = query.order_by(*[column.desc() for column in columns])
         else:
-            query = query.order_by(getattr(Employee, sort_field).asc())
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-    result = [
-        {
-            'id': e.id,
-            'name': e.name,
-            'email': e.email,
-            'department': e.department,
-            'phone': e.phone
-        } for e in pagination.items
-    ]
+            query = query.order_by(*[column.asc() for column in columns])
+    elif search:
+        query = order_by_relevance(query, search)  # Best matches first
+    count_mode = request.args.get('count', 'exact')
+    if count_mode not in COUNT_MODES:
+        return jsonify({'error': f"count must be one of: {', '.join(COUNT_MODES)}"}), 400
+    # Skip Flask-SQLAlchemy's COUNT(*); the total comes from the count cache instead
+    pagination = query.paginate(page=page, per_page=per_page, error_out=False, count=False)
+    # Keyed by the table version the ETag was built from, so a cached body never carries another version's total
+    total = count_total(count_cache, query, search, count_mode, db.session, Employee.__tablename__,
+                        request.table_version, department)
     return jsonify({
-        'employees': result,
-        'total': pagination.total,
+        'employees': employee_dicts(pagination.items),
+        'total': total,
         'page': pagination.page,
-        'pages': pagination.pages,
+        'pages': math.ceil(total / pagination.per_page) if total is not None else None,
         'per_page': pagination.per_page
     })
 
-@app.route('/employees/<int:emp_id>', methods=['GET'])
+def get_employees_after(query, per_page, sort_field, sort_direction, cursor):
+    """
+    Cursor (keyset) mode for GET /employees.
+    Args:
+        query: Employee query with search filters applied
+        per_page: Page size
+        sort_field: Requested sort column (defaults to id)
+        sort_direction: 'asc' or 'desc'
+        cursor: Value of the `after` parameter (empty for the first page)
+    Returns:
+        Page of employees with next_cursor, or error if the cursor is invalid
+    """
+    if sort_field not in SORT_FIELDS:
+        sort_field = 'id'
+    if sort_direction != 'desc':
+        sort_direction = 'asc'
+    if per_page < 1:
+        return jsonify({'error': 'per_page must be a positive integer'}), 400
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, sort_field, sort_direction)
+        except InvalidCursor as e:
+            return jsonify({'error': str(e)}), 400
+    employees, has_more = keyset_page(query, getattr(Employee, sort_field), Employee.id, sort_direction, per_page, after)
+    next_cursor = None
+    if has_more:
+        last = employees[-1]
+        next_cursor = encode_cursor(sort_field, sort_direction, getattr(last, sort_field), last.id)
+    return jsonify({
+        'employees': employee_dicts(employees),
+        'per_page': per_page,
+        'next_cursor': next_cursor
+    })
+
+@bp.route('/employees/export', methods=['GET'])
+@jwt_required
+def export_employees():
+    """
+    Stream the employee directory as CSV or NDJSON (JWT protected).
+    Accepts the same search/department/sort/direction parameters as GET /employees, plus format=csv|ndjson.
+    Rows are read with a server-side cursor and streamed, so memory stays flat for any directory size.
+    Returns:
+        Streaming CSV or NDJSON response
+    """
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    sort_field = request.args.get('sort', None)
+    sort_direction = request.args.get('direction', 'asc')
+    stmt = export_statement()
+    search = request.args.get('search', None)
+    if search:
+        stmt = apply_search(stmt, search)
+    department = request.args.get('department', None)
+    if department:
+        stmt = stmt.where(Employee.department == department)
+    columns = sort_columns(sort_field if sort_field in SORT_FIELDS else 'id')
+    if sort_direction == 'desc':
+        stmt = stmt.order_by(*[column.desc() for column in columns])
+    else:
+        stmt = stmt.order_by(*[column.asc() for column in columns])
+    chunks = generate_export(stmt, export_format, chunk_size=current_app.config['EXPORT_CHUNK_SIZE'])
+    return Response(
+        stream_with_context(chunks),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={'Content-Disposition': f'attachment; filename=employees.{export_format}'}
+    )
+
+@bp.route('/stats/db-pool', methods=['GET'])
+@jwt_required
+def db_pool_stats():
+    """
+    Connection pool statistics for this worker process (JWT protected).
+    Returns:
+        Pool size, connections in use and checkout wait times per database
+    """
+    return jsonify(pool_stats())
+
+@bp.route('/stats/cache', methods=['GET'])
+@jwt_required
+def response_cache_stats():
+    """
+    Response cache statistics for this worker process (JWT protected).
+    Returns:
+        Backend, hits, misses, hit ratio and memory use
+    """
+    return jsonify(response_cache.stats())
+
+@bp.route('/employees/<int:emp_id>', methods=['GET'])
 @jwt_required
+@conditional_get(employee_etag_by_id)
+@cached_response(response_cache.employee_key)
 def get_employee(emp_id):
     """
     Get a single employee by ID (JWT protected).
@@ -223,32 +441,23 @@ def get_employee(emp_id):
     Returns:
         Employee details as JSON or error if not found
     """
-    employee = db.session.get(Employee, emp_id)
-    if not employee:
+    row = db.session.execute(select(*employee_columns()).where(Employee.id == emp_id)).first()
+    if not row:
         return jsonify({'error': 'Employee not found'}), 404
-    return jsonify({
-        'id': employee.id,
-        'name': employee.name,
-        'email': employee.email,
-        'department': employee.department,
-        'phone': employee.phone
-    })
+    return jsonify(employee_dicts([row])[0])
 
-@app.route('/employees', methods=['POST'])
+@bp.route('/employees', methods=['POST'])
 @jwt_required
 def create_employee():
     """
     Create a new employee (JWT protected).
-    Validates input and checks for duplicate email.
+    Validates input; duplicate emails (in any letter case) are rejected by the database's unique index.
     Returns:
         Success message and new employee ID or error
     """
     try:
         data = request.get_json()  # Get JSON data from request
         validated = EmployeeCreateSchema(**data)  # Validate input
-        # Check for duplicate email
-        if Employee.query.filter_by(email=validated.email).first():
-            return jsonify({'error': 'User already exists'}), 400
         employee = Employee(
             name=validated.name,
             email=validated.email,
@@ -256,45 +465,182 @@ def create_employee():
             phone=validated.phone
         )
         db.session.add(employee)
+        db.session.flush()  # Raises IntegrityError for a duplicate email
+        emp_id = employee.id  # Read before commit expires the instance, saving a reload
         db.session.commit()
-        return jsonify({'message': 'Employee created', 'id': employee.id}), 200
+        clear_counts()
+        return jsonify({'message': 'Employee created', 'id': emp_id}), 200
+    except IntegrityError as e:
+        db.session.rollback()
+        return integrity_error(e)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@bp.route('/employees/bulk', methods=['POST'])
+@jwt_required
+def bulk_import_employees():
+    """
+    Bulk import employees from an NDJSON or CSV request body (JWT protected).
+    The body is streamed and processed in batches of BULK_IMPORT_BATCH_SIZE rows, each committed separately.
+    Rows that fail validation or use an existing email are skipped and reported by line number.
+    Returns:
+        Inserted/failed counts and per-row errors
+    """
+    if request.mimetype == 'text/csv':
+        records = iter_csv(request.stream)
+    elif request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        records = iter_ndjson(request.stream)
+    else:
+        return jsonify({'error': 'Content-Type must be text/csv or application/x-ndjson'}), 415
+    try:
+        report = import_employees(
+            records,
+            batch_size=current_app.config['BULK_IMPORT_BATCH_SIZE'],
+            max_errors=current_app.config['BULK_IMPORT_MAX_ERRORS'],
+            on_commit=clear_counts
+        )
+        return jsonify(report), 200
     except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+
+@bp.route('/employees/batch-get', methods=['POST'])
+@jwt_required
+def batch_get_employees():
+    """
+    Get many employees by id with one query (JWT protected).
+    Body: {"ids": [1, 2, ...]}
+    Returns:
+        Employees in request order and the ids that were not found
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        ids = parse_ids(data.get('ids'), current_app.config['BATCH_MAX_ITEMS'])
+    except BatchError as e:
+        return jsonify({'error': str(e)}), 400
+    employees, missing = get_employees_by_id(ids)
+    return jsonify({'employees': employees, 'missing': missing})
+
+@bp.route('/employees/batch', methods=['PATCH'])
+@jwt_required
+def batch_update_employees():
+    """
+    Update many employees in one transaction (JWT protected).
+    Body: {"items": [{"id": 1, "department": "IT"}, ...], "mode": "all_or_nothing" | "best_effort"}
+    Each item is validated with EmployeeUpdateSchema; all targets are loaded with one IN query.
+    Returns:
+        Per-item results; 200 if anything was written (or nothing failed), 400 if an all-or-nothing batch failed
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        mode = parse_mode(data.get('mode'))
+        results, committed = update_employees(data.get('items'), mode, current_app.config['BATCH_MAX_ITEMS'])
+    except BatchError as e:
         return jsonify({'error': str(e)}), 400
+    except StaleDataError:
+        db.session.rollback()
+        return jsonify({'error': 'Employees were modified by another request, retry the batch'}), 409
+    if committed:
+        clear_counts()
+    return batch_response(results, mode, committed)
 
-@app.route('/employees/<int:emp_id>', methods=['PUT'])
+@bp.route('/employees/batch', methods=['DELETE'])
+@jwt_required
+def batch_delete_employees():
+    """
+    Delete many employees in one transaction (JWT protected).
+    Body: {"ids": [1, 2, ...], "mode": "all_or_nothing" | "best_effort"}
+    Returns:
+        Per-item results; 200 if anything was deleted (or nothing failed), 400 if an all-or-nothing batch failed
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        mode = parse_mode(data.get('mode'))
+        ids = parse_ids(data.get('ids'), current_app.config['BATCH_MAX_ITEMS'])
+        results, committed = delete_employees(ids, mode)
+    except BatchError as e:
+        return jsonify({'error': str(e)}), 400
+    except StaleDataError:
+        db.session.rollback()
+        return jsonify({'error': 'Employees were modified by another request, retry the batch'}), 409
+    if committed:
+        clear_counts()
+    return batch_response(results, mode, committed)
+
+def batch_response(results, mode, committed):
+    """
+    Response for a batch write.
+    Args:
+        results: Per-item results
+        mode: Batch mode
+        committed: Whether anything was written
+    Returns:
+        JSON response with counts and results
+    """
+    succeeded = sum(1 for result in results if result['status'] in ('updated', 'deleted'))
+    body = {'mode': mode, 'succeeded': succeeded, 'failed': len(results) - succeeded, 'results': results}
+    return jsonify(body), 200 if committed or mode == 'best_effort' else 400
+
+def precondition_failed(employee):
+    """
+    412 response for a write whose If-Match no longer holds.
+    Args:
+        employee: Current employee, or None if it has been deleted meanwhile
+    Returns:
+        Error response carrying the current ETag
+    """
+    response = jsonify({'error': 'Employee was modified by another request'})
+    response.status_code = 412
+    if employee is not None:
+        response.set_etag(employee_etag(employee))
+    return response
+
+@bp.route('/employees/<int:emp_id>', methods=['PUT'])
 @jwt_required
 def update_employee(emp_id):
     """
     Update an employee by ID (JWT protected).
-    Validates input and checks for duplicate email.
+    Validates input and checks for duplicate email. With If-Match, the update only applies if the employee still
+    has that ETag, otherwise it fails with 412.
     Args:
         emp_id: Employee ID
     Returns:
-        Success message or error
+        Success message with the new ETag, or error
     """
     try:
         employee = db.session.get(Employee, emp_id)
         if not employee:
             return jsonify({'error': 'Employee not found'}), 404
+        if if_match_failed(employee_etag(employee)):
+            return precondition_failed(employee)
         data = request.get_json()  # Get JSON data
         validated = EmployeeUpdateSchema(**data)  # Validate input
         for field in ['name', 'email', 'department', 'phone']:
             value = getattr(validated, field)
             if value is not None:
-                # Check for duplicate email
-                if field == 'email' and Employee.query.filter_by(email=value).first() and employee.email != value:
-                    return jsonify({'error': 'User already exists'}), 400
                 setattr(employee, field, value)
+        db.session.flush()  # Raises StaleDataError if another request changed the employee since it was loaded
+        etag = employee_etag(employee)  # Read before commit expires the row, which would cost a SELECT to reload it
         db.session.commit()
-        return jsonify({'message': 'Employee updated'})
+        clear_counts()
+        response = jsonify({'message': 'Employee updated'})
+        response.set_etag(etag)
+        return response
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed(db.session.get(Employee, emp_id))
+    except IntegrityError as e:
+        db.session.rollback()
+        return integrity_error(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
-@app.route('/employees/<int:emp_id>', methods=['DELETE'])
+@bp.route('/employees/<int:emp_id>', methods=['DELETE'])
 @jwt_required
 def delete_employee(emp_id):
     """
     Delete an employee by ID (JWT protected).
+    With If-Match, the employee is only deleted if it still has that ETag, otherwise the request fails with 412.
     Args:
         emp_id: Employee ID
     Returns:
@@ -304,38 +650,49 @@ def delete_employee(emp_id):
         employee = db.session.get(Employee, emp_id)
         if not employee:
             return jsonify({'error': 'Employee not found'}), 404
+        if if_match_failed(employee_etag(employee)):
+            return precondition_failed(employee)
         db.session.delete(employee)
         db.session.commit()
+        clear_counts()
         return jsonify({'message': 'Employee deleted'})
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed(db.session.get(Employee, emp_id))
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
-@app.route('/register', methods=['POST'])
+@bp.route('/register', methods=['POST'])
+@rate_limited('register')
 def register():
     """
     Register a new user.
-    Validates input and checks for duplicate email.
+    Validates input; duplicate emails (in any letter case) are rejected by the database's unique index.
     Returns:
         Success message or error
     """
     try:
         data = request.get_json()  # Get JSON data
         validated = UserRegisterSchema(**data)  # Validate input
-        # Check for duplicate email
-        if User.query.filter_by(email=validated.email).first():
-            return jsonify({'error': 'User already exists'}), 400
         user = User(
             name=validated.name,
             email=validated.email,
-            password_hash=generate_password_hash(validated.password)
+            password_hash=password_hasher.hash(validated.password)
         )
         db.session.add(user)
         db.session.commit()
         return jsonify({'message': 'User registered'}), 200
+    except IntegrityError as e:
+        db.session.rollback()
+        return integrity_error(e)
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return hasher_busy()
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
-@app.route('/login', methods=['POST'])
+@bp.route('/login', methods=['POST'])
+@rate_limited('login')
 def login():
     """
     Login user and return JWT token.
@@ -346,21 +703,29 @@ def login():
     try:
         data = request.get_json()  # Get JSON data
         validated = UserLoginSchema(**data)  # Validate input
-        user = User.query.filter_by(email=validated.email).first()
+        user = find_user(validated.email)
         if not user:
             logging.info(f"Login failed: No user found for email {validated.email}")
             return jsonify({'error': 'No user found for this email'}), 401
-        if not check_password_hash(user.password_hash, validated.password):
+        if not password_hasher.verify(user.password_hash, validated.password):
             logging.info(f"Login failed: Incorrect password for email {validated.email}")
             return jsonify({'error': 'Incorrect password'}), 401
+        if password_hasher.needs_rehash(user.password_hash):
+            # Upgrade hashes made with outdated parameters while we have the plain password
+            user.password_hash = password_hasher.hash(validated.password)
+            db.session.commit()
         logging.info(f"Login successful for user {validated.email}")
         token = create_jwt(user)  # Create JWT token
         return jsonify({'message': 'Login successful', 'token': token, 'user': {'id': user.id, 'name': user.name, 'email': user.email}}), 200
+    except PasswordHasherBusy:
+        db.session.rollback()
+        logging.warning("Login deferred: password hashing pool busy")
+        return hasher_busy()
     except Exception as e:
         logging.error(f"Login error: {str(e)}")
         return jsonify({'error': str(e)}), 400
 
-@app.route('/logout', methods=['POST'])
+@bp.route('/logout', methods=['POST'])
 def logout():
     """
     Logout user (demo endpoint).
@@ -370,21 +735,7 @@ def logout():
     # For demo: just return success (session/cookie handling can be added)
     return jsonify({'message': 'Logout successful'}), 200
 
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
-    # Generate token and expiration
-    reset_token = secrets.token_urlsafe(32)
-    expires_at = datetime.utcnow() + timedelta(hours=1)
-    # Store token in DB
-    token_entry = PasswordResetToken(user_id=user.id, token=reset_token, expires_at=expires_at)
-    db.session.add(token_entry)
-    db.session.commit()
-    # Simulate sending email (log to console)
-    print(f"Password reset requested for {email}. Token: {reset_token}")
-    # In real app, send email with reset link
-    return jsonify({'message': 'Password reset email sent', 'token': reset_token}), 200
-
-@app.route('/password-reset', methods=['POST'])
+@bp.route('/password-reset', methods=['POST'])
 def password_reset():
     """
     Handle password reset using token and new password.
@@ -396,20 +747,142 @@ def password_reset():
     password = data.get('password')
     if not token or not password:
         return jsonify({'error': 'Token and password are required'}), 400
-    # Lookup token in DB
-    token_entry = PasswordResetToken.query.filter_by(token=token, used=False).first()
-    if not token_entry or not token_entry.is_valid():
+    # Lookup by hash; used and expired tokens are filtered out in SQL
+    token_entry = find_valid_token(token)
+    if not token_entry:
         return jsonify({'error': 'Invalid or expired token'}), 400
     user = User.query.get(token_entry.user_id)
     if not user:
         return jsonify({'error': 'User not found'}), 404
-    user.password_hash = generate_password_hash(password)
+    user.password_hash = password_hasher.hash(password)
     token_entry.used = True
     db.session.commit()
-    print(f"Password reset for user {user.email} with token {token}")
     return jsonify({'message': 'Password reset successful!'}), 200
+
+# Sample data for a fresh development database (see the seed-db command)
+SAMPLE_EMPLOYEES = [
+    {'name': "Alice Smith", 'email': "alice@example.com", 'department': "HR", 'phone': "1234567890"},
+    {'name': "Bob Johnson", 'email': "bob@example.com", 'department': "IT", 'phone': "2345678901"},
+    {'name': "Charlie Lee", 'email': "charlie@example.com", 'department': "Finance", 'phone': "3456789012"},
+    {'name': "Diana King", 'email': "diana@example.com", 'department': "Marketing", 'phone': "4567890123"},
+    {'name': "Evan Wright", 'email': "evan@example.com", 'department': "Sales", 'phone': "5678901234"},
+]
+
+
+def create_app(config=None):
+    """
+    Application factory: build and configure a Flask app with all extensions and endpoints.
+    Does not touch the database; create the schema with `flask init-db` (and sample data with `flask seed-db`).
+    Production servers call this once per process (see employee_app/wsgi.py and gunicorn.conf.py).
+    Args:
+        config: Config class or object (defaults to the one matching APP_ENV, see config.py)
+    Returns:
+        Configured Flask app
+    """
+    config = config or get_config()
+    app = Flask(__name__)
+    app.config.from_object(config)
+    init_json(app)  # orjson when available (see serialization.py)
+    # Setup basic logging
+    logging.basicConfig(level=logging.INFO)
+    if app.config['ENV_NAME'] == 'production':
+        if not app.config['SQLALCHEMY_DATABASE_URI'] or not app.config['SECRET_KEY']:
+            raise RuntimeError('DATABASE_URL and SECRET_KEY must be set in production environment!')
+    # Enable CORS for cross-origin requests from frontend
+    # ETag is exposed so the frontend can send it back in If-Match
+    CORS(app, resources={r"/*": {"origins": app.config['CORS_ORIGINS']}}, supports_credentials=True, expose_headers=['ETag'])
+    # Validate mail config and warn if missing
+    missing_mail_settings = []
+    for key in ['MAIL_SERVER', 'MAIL_PORT', 'MAIL_USERNAME', 'MAIL_PASSWORD', 'MAIL_DEFAULT_SENDER']:
+        if not app.config.get(key):
+            missing_mail_settings.append(key)
+    if missing_mail_settings and not app.testing:
+        logging.warning(f"Missing mail settings: {', '.join(missing_mail_settings)}. Password reset emails may not work.")
+    mail.init_app(app)  # Initialize Flask-Mail with app
+    # Pool sizing and driver settings; explicit SQLALCHEMY_ENGINE_OPTIONS entries win
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {**engine_options(app.config), **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})}
+    db.init_app(app)  # Initialize SQLAlchemy ORM (connections are opened on first use)
+    with app.app_context():
+        tune_engines(app)  # Connect-time PRAGMAs for SQLite
+        init_metrics(app)  # Request latency, SQL counts and /metrics; registered before compression so it is timed too
+    count_cache.init_app(app)
+    token_cache.init_app(app)
+    response_cache.init_app(app)
+    password_hasher.init_app(app)
+    rate_limiter.init_app(app)
+    app.register_blueprint(bp)
+    init_compression(app)  # gzip/brotli per Accept-Encoding
+    init_migrations(app)  # `flask db ...` commands
+    return app
+
+
+def init_db():
+    """Apply pending schema migrations and detect the search backend. Must run inside an app context."""
+    upgrade_database()  # Alembic migrations in employee_app/migrations
+    init_search(current_app)  # Record which search backend the migrated database supports
+
+
+def seed_db():
+    """
+    Add the sample employees if the table is empty. Must run inside an app context.
+    Returns:
+        Number of employees added
+    """
+    if db.session.query(Employee.id).first() is not None:
+        return 0
+    db.session.add_all([Employee(**sample) for sample in SAMPLE_EMPLOYEES])
+    db.session.commit()
+    return len(SAMPLE_EMPLOYEES)
+
+
+@bp.cli.command('init-db')
+def init_db_command():
+    """Migrate the database to the latest schema (safe to run on every deploy)."""
+    init_db()
+    print(f"Database initialized (search backend: {current_app.extensions['employee_search']})")
+
+
+@bp.cli.command('seed-db')
+def seed_db_command():
+    """Add sample employees to an empty database."""
+    added = seed_db()
+    print(f"Added {added} sample employees" if added else "Employee table is not empty; nothing added")
+
+
+@bp.cli.command('drain-outbox')
+def drain_outbox_command():
+    """Send every due email in the outbox now (e.g. from cron when no worker is running)."""
+    options = outbox_drain_options(current_app)
+    totals = {'sent': 0, 'retried': 0, 'failed': 0}
+    while True:
+        stats = drain_outbox(mail, **options)
+        for key, value in stats.items():
+            totals[key] += value
+        if sum(stats.values()) < options['batch_size']:
+            break
+    print(f"Outbox drained: {totals['sent']} sent, {totals['retried']} retried, {totals['failed']} failed")
+
+
+@bp.cli.command('purge-reset-tokens')
+@click.option('--batch-size', type=int, default=None, help='Rows deleted per transaction (default RESET_TOKEN_PURGE_BATCH_SIZE).')
+@click.option('--max-batches', type=int, default=None, help='Stop after this many batches.')
+@click.option('--pause', type=float, default=0.0, help='Seconds to sleep between batches.')
+def purge_reset_tokens_command(batch_size, max_batches, pause):
+    """Delete expired and used password reset tokens in small batches (e.g. hourly from cron)."""
+    stats = purge_reset_tokens(batch_size or current_app.config['RESET_TOKEN_PURGE_BATCH_SIZE'], max_batches, pause)
+    print(f"Purged {stats['expired']} expired and {stats['used']} used reset tokens in {stats['batches']} batches")
+
+
 if __name__ == '__main__':
     """
     Run the Flask development server.
     """
+    app = create_app()
+    with app.app_context():
+        # Convenience for local development; deployments run `flask init-db` explicitly
+        init_db()
+        seed_db()
+    # The reloader runs this block in a watcher process too; only the serving child sends mail
+    if app.config['MAIL_OUTBOX_WORKER'] and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_outbox_worker(app, mail, app.config['MAIL_OUTBOX_INTERVAL'], **outbox_drain_options(app))
     app.run(host="0.0.0.0", port=5000, debug=True)
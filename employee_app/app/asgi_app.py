@@ -0,0 +1,275 @@
+"""
+asgi_app.py
+ASGI serving for the Employee Directory API: the read endpoints run on the event loop with an async database session.
+
+Under gunicorn's threaded workers every in-flight request holds a thread (and its stack) while it waits on the
+database, so concurrency per worker is capped by GUNICORN_THREADS. `AsyncReadApp` serves the read-heavy endpoints
+listed in ASYNC_READ_ENDPOINTS (GET /employees, GET /employees/<id>, GET /employees/export) as coroutines instead:
+- the Flask view runs unchanged inside `AsyncSession.run_sync()`, i.e. in a greenlet on the event loop, with
+  `db.session` pointing at the async session's sync facade. Each statement it executes goes through aiosqlite
+  (or asyncpg) and suspends the request while the database works, so one worker process keeps hundreds of requests
+  in flight with a single thread;
+- jwt_required, ETags and 304s, the response cache, compression, metrics and the streamed export behave exactly
+  as under WSGI, because the same Flask app produces the response;
+- the response is sent chunk by chunk from the same greenlet, so a streamed export never buffers.
+
+All other requests (writes, auth, bulk import) run the Flask app in a small thread pool (ASYNC_SYNC_THREADS) on the
+regular synchronous engine. CPU-bound work (JSON encoding, JWT checks) still runs on the loop thread, so run one
+worker process per core as with gunicorn.
+
+Optional dependencies: `aiosqlite` (SQLite) or `asyncpg` (PostgreSQL), `greenlet`, and an ASGI server such as
+uvicorn. In-memory SQLite cannot be shared with a second engine, so with it every request takes the thread pool.
+"""
+import asyncio
+import io
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from flask import has_request_context, request
+from sqlalchemy.engine import make_url
+from werkzeug.exceptions import HTTPException
+from employee_app.app.engine import _is_memory_sqlite, tune_engine
+from employee_app.app.metrics import instrument_engine
+from employee_app.app.models.db import db
+from employee_app.app.search import search_backend
+
+# Async driver used for each database backend
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+# WSGI environ key holding the session of a request served on the event loop
+SESSION_KEY = 'employee_app.async_session'
+
+
+def async_engine_url(config):
+    """
+    Database URL for the async engine, or None when the database cannot be shared with one.
+    Args:
+        config: App config
+    Returns:
+        SQLAlchemy URL or None
+    """
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS or _is_memory_sqlite(url):
+        return None
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def async_engine_options(config):
+    """
+    create_async_engine() keyword arguments, mirroring engine_options() for the async drivers.
+    Args:
+        config: App config
+    Returns:
+        Dict of keyword arguments
+    """
+    backend = make_url(config['SQLALCHEMY_DATABASE_URI']).get_backend_name()
+    connect_args = {}
+    if backend == 'sqlite':
+        connect_args['timeout'] = config['DB_BUSY_TIMEOUT_MS'] / 1000
+    elif backend == 'postgresql' and config['DB_STATEMENT_TIMEOUT_MS']:
+        connect_args['server_settings'] = {'statement_timeout': str(config['DB_STATEMENT_TIMEOUT_MS'])}
+    return {
+        # Connections are cheap to hold while a coroutine waits, so this pool is larger than the threaded one
+        'pool_size': config['ASYNC_DB_POOL_SIZE'],
+        'max_overflow': config['ASYNC_DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'] and backend != 'sqlite',
+        'connect_args': connect_args,
+    }
+
+
+def _install_session_lookup():
+    """
+    Make `db.session` return the request's async session when it has one. Installed once per process.
+
+    Flask-SQLAlchemy scopes sessions to the app context, which is popped (and the session removed) before a streamed
+    export is iterated and pushed again for it, so the session is looked up from the request's environ rather than
+    set once in a before_request hook.
+    """
+    registry = db.session.registry
+    if getattr(registry.createfunc, 'async_session_lookup', False):
+        return
+    create_default = registry.createfunc
+
+    def create_session():
+        if has_request_context():
+            session = request.environ.get(SESSION_KEY)
+            if session is not None:
+                return session
+        return create_default()
+
+    create_session.async_session_lookup = True
+    registry.createfunc = create_session
+
+
+def build_environ(scope, body):
+    """
+    WSGI environ for an ASGI HTTP request.
+    Args:
+        scope: ASGI connection scope
+        body: Request body bytes
+    Returns:
+        Dict
+    """
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': scope['client'][0] if scope.get('client') else '',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = f'HTTP_{name}'
+        # Repeated headers are folded into one comma-separated value, as WSGI servers do
+        environ[name] = f'{environ[name]},{value}' if name in environ else value
+    # The body is read in full before the app runs, so its length is known even for chunked uploads
+    environ['CONTENT_LENGTH'] = str(len(body))
+    environ.pop('HTTP_TRANSFER_ENCODING', None)
+    return environ
+
+
+class AsyncReadApp:
+    """ASGI application wrapping the Flask app; see the module docstring."""
+
+    def __init__(self, app):
+        self.app = app
+        self.endpoints = set(app.config['ASYNC_READ_ENDPOINTS'])
+        self.engine = None
+        self.executor = ThreadPoolExecutor(max_workers=app.config['ASYNC_SYNC_THREADS'],
+                                           thread_name_prefix='asgi-sync')
+        _install_session_lookup()
+
+    def start(self):
+        """Create the async engine and detect the search backend (which would otherwise query on first use)."""
+        if self.engine is not None:
+            return
+        url = async_engine_url(self.app.config)
+        with self.app.app_context():
+            search_backend()
+        if url is None:
+            logging.warning('No async driver for this database; serving every request from the thread pool')
+            self.endpoints = set()
+            self.engine = False
+            return
+        from sqlalchemy.ext.asyncio import create_async_engine  # Optional dependency, needs greenlet
+        self.engine = create_async_engine(url, **async_engine_options(self.app.config))
+        tune_engine(self.engine.sync_engine, self.app.config)
+        if 'metrics' in self.app.extensions:
+            instrument_engine(self.engine.sync_engine)
+
+    async def stop(self):
+        if self.engine:
+            await self.engine.dispose()
+        self.engine = None
+        self.executor.shutdown(wait=False)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+        self.start()  # No-op after the lifespan startup; covers servers that skip lifespan events
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+        environ = build_environ(scope, bytes(body))
+        if self.is_async_read(environ):
+            from sqlalchemy.ext.asyncio import AsyncSession
+            from sqlalchemy.util import await_only
+            async with AsyncSession(self.engine) as session:
+                await session.run_sync(self.respond, environ, lambda message: await_only(send(message)))
+        else:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                self.executor, self.respond, None, environ,
+                lambda message: asyncio.run_coroutine_threadsafe(send(message), loop).result())
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    self.start()
+                except Exception as e:
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.stop()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def is_async_read(self, environ):
+        """
+        Whether a request goes to one of the ASYNC_READ_ENDPOINTS.
+        Args:
+            environ: WSGI environ
+        Returns:
+            bool
+        """
+        if not self.endpoints or environ['REQUEST_METHOD'] not in ('GET', 'HEAD'):
+            return False
+        try:
+            endpoint, _ = self.app.url_map.bind_to_environ(environ).match()
+        except HTTPException:
+            return False  # 404/405 and redirects are left to Flask
+        return endpoint in self.endpoints
+
+    def respond(self, session, environ, send_sync):
+        """
+        Run the Flask app for one request and send its response.
+        Args:
+            session: Sync facade of the request's AsyncSession, or None to use the regular session
+            environ: WSGI environ
+            send_sync: Callable sending one ASGI message and blocking (or suspending the greenlet) until it is sent
+        """
+        if session is not None:
+            environ[SESSION_KEY] = session
+        started = []
+
+        def start_response(status, headers, exc_info=None):
+            started[:] = [int(status.split(' ', 1)[0]),
+                          [(name.encode('latin-1'), value.encode('latin-1')) for name, value in headers]]
+
+        def send_start():
+            send_sync({'type': 'http.response.start', 'status': started[0], 'headers': started[1]})
+
+        chunks = self.app(environ, start_response)
+        try:
+            sent_start = False
+            for chunk in chunks:
+                if not sent_start:
+                    send_start()
+                    sent_start = True
+                if chunk:
+                    send_sync({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            if not sent_start:
+                send_start()
+            send_sync({'type': 'http.response.body', 'body': b''})
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
@@ -0,0 +1,187 @@
+"""
+batch.py
+Batch read, update and delete of employees selected by id.
+
+Each operation loads all of its targets with a single `id IN (...)` query and commits once, instead of one request,
+lookup and commit per employee. Results are reported per item, in request order.
+
+Two modes:
+- all_or_nothing (default): if any item fails, nothing is written and every item is reported. Updates are flushed
+  together, so a batch costs one UPDATE per employee and no per-item savepoints;
+- best_effort: valid items are written and failing ones reported. Each update runs in its own SAVEPOINT, so a
+  database error on one item (e.g. two items setting the same email) rolls back only that item.
+"""
+from pydantic import ValidationError
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from employee_app.app.bulk_import import EMPLOYEE_FIELDS, format_validation_error
+from employee_app.app.etags import bump_table_version
+from employee_app.app.models.db import db
+from employee_app.app.models.models import Employee
+from employee_app.app.models.schemas import EmployeeUpdateSchema
+from employee_app.app.serialization import employee_columns, employee_dicts
+
+BATCH_MODES = ['all_or_nothing', 'best_effort']
+
+
+class BatchError(ValueError):
+    """The batch request itself is malformed (not a single item)."""
+
+
+def parse_ids(ids, max_items):
+    """
+    Validate a list of employee ids from a request body.
+    Args:
+        ids: Value of the `ids` field
+        max_items: Largest accepted batch
+    Returns:
+        List of unique ids in request order
+    """
+    if not isinstance(ids, list) or not ids:
+        raise BatchError('ids must be a non-empty list of employee ids')
+    if len(ids) > max_items:
+        raise BatchError(f'At most {max_items} ids per request')
+    if not all(isinstance(emp_id, int) and not isinstance(emp_id, bool) for emp_id in ids):
+        raise BatchError('ids must be integers')
+    return list(dict.fromkeys(ids))
+
+
+def parse_mode(mode):
+    """Validate the `mode` field (defaults to all_or_nothing)."""
+    mode = mode or 'all_or_nothing'
+    if mode not in BATCH_MODES:
+        raise BatchError(f"mode must be one of: {', '.join(BATCH_MODES)}")
+    return mode
+
+
+def get_employees_by_id(ids):
+    """
+    Fetch employees as response dicts with one IN query.
+    Args:
+        ids: Unique employee ids
+    Returns:
+        Tuple of (employee dicts in request order, ids that do not exist)
+    """
+    rows = db.session.execute(select(*employee_columns()).where(Employee.id.in_(ids))).all()
+    found = {employee['id']: employee for employee in employee_dicts(rows)}
+    return [found[emp_id] for emp_id in ids if emp_id in found], [emp_id for emp_id in ids if emp_id not in found]
+
+
+def _load(ids):
+    """Load ORM employees for writing with one IN query, keyed by id."""
+    return {employee.id: employee for employee in Employee.query.filter(Employee.id.in_(ids))}
+
+
+def _finish(results, mode):
+    """
+    Commit or roll back according to the mode and the per-item results.
+    Returns:
+        Tuple of (results, whether anything was committed)
+    """
+    failed = any(result['status'] not in ('updated', 'deleted') for result in results)
+    if (failed and mode == 'all_or_nothing') or all(result['status'] not in ('updated', 'deleted') for result in results):
+        db.session.rollback()
+        for result in results:
+            if result['status'] in ('updated', 'deleted', 'pending'):
+                result['status'] = 'rolled_back'
+        return results, False
+    db.session.commit()
+    return results, True
+
+
+def update_employees(items, mode, max_items):
+    """
+    Apply partial updates to many employees and commit once.
+    Args:
+        items: List of dicts, each with an `id` and the fields to change (validated with EmployeeUpdateSchema)
+        mode: 'all_or_nothing' or 'best_effort'
+        max_items: Largest accepted batch
+    Returns:
+        Tuple of (per-item results, whether anything was committed)
+    """
+    if not isinstance(items, list) or not items:
+        raise BatchError('items must be a non-empty list')
+    if len(items) > max_items:
+        raise BatchError(f'At most {max_items} items per request')
+    results, changes, seen = [], [], set()
+    for item in items:
+        emp_id = item.get('id') if isinstance(item, dict) else None
+        result = {'id': emp_id, 'status': 'invalid'}
+        results.append(result)
+        if not isinstance(emp_id, int) or isinstance(emp_id, bool):
+            result['error'] = 'Each item must be an object with an integer id'
+            continue
+        if emp_id in seen:
+            result['error'] = 'Duplicate id in batch'
+            continue
+        seen.add(emp_id)
+        try:
+            validated = EmployeeUpdateSchema(**{key: value for key, value in item.items() if key != 'id'})
+        except ValidationError as e:
+            result['error'] = format_validation_error(e)
+            continue
+        changes.append((result, {field: value for field, value in validated.model_dump(include=set(EMPLOYEE_FIELDS)).items()
+                                 if value is not None}))
+    employees = _load([result['id'] for result, _ in changes]) if changes else {}
+    # Emails already used by employees outside their own item (in any letter case), in one IN query
+    emails = {values['email'].lower() for _, values in changes if 'email' in values}
+    lowered = func.lower(Employee.email)
+    taken = dict(db.session.execute(select(lowered, Employee.id).where(lowered.in_(emails))).all()) if emails else {}
+    pending = []
+    for result, values in changes:
+        employee = employees.get(result['id'])
+        if employee is None:
+            result.update(status='not_found', error='Employee not found')
+        elif 'email' in values and taken.get(values['email'].lower(), employee.id) != employee.id:
+            result.update(status='conflict', error='User already exists')
+        else:
+            result['status'] = 'pending'
+            pending.append((result, employee, values))
+    if mode == 'all_or_nothing' and len(pending) < len(results):
+        return _finish(results, mode)  # Fails without writing anything
+    if mode == 'all_or_nothing':
+        try:
+            for result, employee, values in pending:
+                for field, value in values.items():
+                    setattr(employee, field, value)
+            db.session.flush()
+            for result, _, _ in pending:
+                result['status'] = 'updated'
+            return _finish(results, mode)
+        except IntegrityError:
+            # Lost a race for an email: redo the items one by one below to report which of them failed
+            db.session.rollback()
+    if pending:
+        # Any write first, so SQLite's driver has opened the transaction the savepoints nest in
+        bump_table_version(db.session, Employee.__tablename__)
+    for result, employee, values in pending:
+        try:
+            with db.session.begin_nested():
+                for field, value in values.items():
+                    setattr(employee, field, value)
+                db.session.flush()
+            result['status'] = 'updated'
+        except IntegrityError as e:
+            result.update(status='conflict', error='User already exists' if 'email' in str(e.orig).lower() else str(e.orig))
+    return _finish(results, mode)
+
+
+def delete_employees(ids, mode):
+    """
+    Delete many employees and commit once.
+    Args:
+        ids: Unique employee ids
+        mode: 'all_or_nothing' or 'best_effort'
+    Returns:
+        Tuple of (per-item results, whether anything was committed)
+    """
+    employees = _load(ids)
+    results = []
+    for emp_id in ids:
+        employee = employees.get(emp_id)
+        if employee is None:
+            results.append({'id': emp_id, 'status': 'not_found', 'error': 'Employee not found'})
+            continue
+        db.session.delete(employee)
+        results.append({'id': emp_id, 'status': 'deleted'})
+    return _finish(results, mode)
@@ -0,0 +1,151 @@
+"""
+bulk_import.py
+Streaming bulk import of employees from NDJSON or CSV uploads.
+
+Rows are read from the request stream one line at a time and processed in fixed-size batches: each batch is
+validated with EmployeeCreateSchema, checked for duplicate emails with a single IN query, inserted with one
+executemany INSERT and committed on its own. Only the current batch and a capped error list are held in memory,
+so memory use does not grow with the size of the upload.
+"""
+import csv
+import io
+import json
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select
+from employee_app.app.models.db import db
+from employee_app.app.models.models import Employee
+from employee_app.app.etags import bump_table_version
+from employee_app.app.models.schemas import EmployeeCreateSchema
+
+EMPLOYEE_FIELDS = ['name', 'email', 'department', 'phone']
+
+
+def iter_ndjson(stream):
+    """
+    Read employee records from a newline-delimited JSON stream.
+    Args:
+        stream: Binary request stream
+    Yields:
+        Tuples of (line number, record dict or None, error message or None)
+    """
+    for line_no, line in enumerate(io.TextIOWrapper(stream, encoding='utf-8'), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, 'Each line must be a JSON object'
+            continue
+        yield line_no, record, None
+
+
+def iter_csv(stream):
+    """
+    Read employee records from a CSV stream with a header row.
+    Args:
+        stream: Binary request stream
+    Yields:
+        Tuples of (line number, record dict or None, error message or None)
+    """
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8', newline=''))
+    for record in reader:
+        yield reader.line_num, record, None
+
+
+def format_validation_error(error):
+    """Turn a Pydantic ValidationError into a short one-line message."""
+    return '; '.join(f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in error.errors())
+
+
+class ImportReport:
+    """Running totals and a capped list of per-row errors for one bulk import."""
+
+    def __init__(self, max_errors):
+        self.max_errors = max_errors
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+
+    def fail(self, line_no, message):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': line_no, 'error': message})
+
+    def to_dict(self):
+        return {
+            'message': 'Bulk import finished',
+            'inserted': self.inserted,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+        }
+
+
+def _insert_batch(batch, report):
+    """
+    Insert one validated batch: one duplicate-email query, one executemany INSERT, one commit.
+    Args:
+        batch: List of (line number, validated row dict)
+        report: ImportReport to update
+    Returns:
+        Number of rows inserted
+    """
+    # Emails are unique regardless of case (ux_employee_email_lower serves this lookup)
+    emails = [row['email'].lower() for _, row in batch]
+    existing = set(db.session.execute(select(func.lower(Employee.email)).where(func.lower(Employee.email).in_(emails))).scalars())
+    rows = []
+    for line_no, row in batch:
+        if row['email'].lower() in existing:
+            report.fail(line_no, 'User already exists')
+            continue
+        existing.add(row['email'].lower())  # Catch duplicates within the same upload too
+        rows.append((line_no, row))
+    if not rows:
+        return 0
+    try:
+        # Bulk SQL bypasses the ORM flush that stamps versions, so bump the change counter here
+        version = bump_table_version(db.session, Employee.__tablename__)
+        db.session.execute(insert(Employee), [{**row, 'version': version} for _, row in rows])
+        db.session.commit()
+        report.inserted += len(rows)
+        return len(rows)
+    except Exception as e:
+        db.session.rollback()
+        for line_no, _ in rows:
+            report.fail(line_no, str(e.__cause__ or e))
+        return 0
+
+
+def import_employees(records, batch_size=1000, max_errors=1000, on_commit=None):
+    """
+    Validate and insert a stream of employee records in batches.
+    Args:
+        records: Iterable of (line number, record dict or None, error message or None)
+        batch_size: Rows validated, checked and inserted per transaction
+        max_errors: Maximum number of per-row errors kept for the report
+        on_commit: Optional callback run after each batch that inserted rows commits (e.g. cache invalidation)
+    Returns:
+        Report dict with inserted/failed counts and per-row errors
+    """
+    report = ImportReport(max_errors)
+    batch = []
+    for line_no, record, error in records:
+        if error:
+            report.fail(line_no, error)
+            continue
+        try:
+            validated = EmployeeCreateSchema.model_validate(record)
+        except ValidationError as e:
+            report.fail(line_no, format_validation_error(e))
+            continue
+        batch.append((line_no, validated.model_dump(include=set(EMPLOYEE_FIELDS))))
+        if len(batch) >= batch_size:
+            if _insert_batch(batch, report) and on_commit:
+                on_commit()
+            batch = []
+    if batch and _insert_batch(batch, report) and on_commit:
+        on_commit()
+    return report.to_dict()
@@ -0,0 +1,189 @@
+"""
+cache.py
+Read-through cache of employee API responses, keyed by the versions the database holds for them.
+
+GET /employees/<id> and GET /employees are read far more often than employees change. Their serialized JSON bodies
+are cached under keys that embed the ETag the response is served with (see etags.py):
+- `employee:<id>.<version>` where version is the employee's `version` column, restamped by every update;
+- `list:l<n>.<digest>:<hash of the normalized query parameters>` where n is the `employee` change counter in
+  `table_version`, bumped by every create, update, delete and bulk import.
+The versions live in the database, so a write made by any worker process changes the keys that every worker builds
+next: nothing has to be invalidated. A cached body is only ever returned with the ETag it was stored under, so a
+client polling with If-None-Match never pins a body that does not belong to its ETag. The ETag is read before the
+body, so a response computed while a write was in flight is at least as new as its key.
+Superseded entries age out of the LRU (or expire in Redis).
+
+Backends: an in-process LRU bounded by entry count and bytes (per worker process), or a Redis-compatible server
+shared by all workers.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from employee_app.app.counts import normalize_search
+
+# Query parameters that change the GET /employees response; anything else is ignored in the cache key
+LIST_PARAMS = ['page', 'per_page', 'sort', 'direction', 'search', 'department', 'count', 'after']
+
+
+class MemoryBackend:
+    """Thread-safe LRU of bytes values bounded by entry count and total size, with per-entry TTL."""
+
+    def __init__(self, max_entries=10000, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._bytes += len(key) + len(value)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        value, _ = self._entries.pop(key)
+        self._bytes -= len(key) + len(value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'memory_bytes': self._bytes, 'max_bytes': self.max_bytes}
+
+
+class RedisBackend:
+    """Redis (or any server speaking its protocol) shared by all workers; needs the `redis` package."""
+
+    def __init__(self, url=None, client=None, prefix='employee-cache:'):
+        if client is None:
+            import redis  # Optional dependency, only needed for this backend
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value, ex=ttl)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=f'{self.prefix}*'))
+        if keys:
+            self.client.delete(*keys)
+
+    def stats(self):
+        info = self.client.info('memory')
+        return {'entries': None, 'memory_bytes': info.get('used_memory'), 'max_bytes': info.get('maxmemory') or None}
+
+
+class ResponseCache:
+    """Response cache for employee reads with hit/miss counters; configure with init_app."""
+
+    def __init__(self):
+        self.backend = None
+        self.ttl = 300
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Pick the backend from RESPONSE_CACHE_BACKEND ('memory', 'redis' or 'none') and its settings.
+        Args:
+            app: Flask app
+        """
+        kind = app.config['RESPONSE_CACHE_BACKEND']
+        if kind == 'redis':
+            self.backend = RedisBackend(app.config['RESPONSE_CACHE_REDIS_URL'])
+        elif kind == 'memory':
+            self.backend = MemoryBackend(app.config['RESPONSE_CACHE_MAX_ENTRIES'], app.config['RESPONSE_CACHE_MAX_BYTES'])
+        else:
+            self.backend = None
+        self.ttl = app.config['RESPONSE_CACHE_TTL']
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    @staticmethod
+    def employee_key(etag):
+        """Cache key for GET /employees/<id> served with this ETag (`<id>.<version>`)."""
+        return f'employee:{etag}'
+
+    @staticmethod
+    def list_key(args, etag):
+        """
+        Cache key for GET /employees served with this ETag.
+        Args:
+            args: Request query parameters
+            etag: Listing ETag, which carries the employee table's change counter
+        Returns:
+            Key string
+        """
+        params = []
+        for name in LIST_PARAMS:
+            if name in args:
+                value = args.get(name)
+                params.append(f'{name}={normalize_search(value) if name == "search" else value}')
+        digest = hashlib.sha256('&'.join(params).encode('utf-8')).hexdigest()[:32]
+        return f'list:{etag}:{digest}'
+
+    def get(self, key):
+        """
+        Look up a cached response body.
+        Returns:
+            Bytes or None
+        """
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, body):
+        """Store a response body under a key from employee_key or list_key."""
+        self.backend.set(key, body, self.ttl)
+
+    def clear(self):
+        """Drop every cached response and reset the counters."""
+        if self.enabled:
+            self.backend.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Hit ratio and memory use.
+        Returns:
+            Dict with backend, hits, misses, hit_ratio, entries and memory_bytes
+        """
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        stats = {'backend': type(self.backend).__name__ if self.enabled else None, 'hits': hits, 'misses': misses,
+                 'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else None}
+        if self.enabled:
+            stats.update(self.backend.stats())
+        return stats
@@ -0,0 +1,145 @@
+"""
+compression.py
+gzip/brotli compression of API responses, negotiated from Accept-Encoding.
+
+`init_compression()` registers an after_request hook that compresses JSON, CSV and NDJSON responses when the client
+accepts it:
+- buffered responses smaller than COMPRESS_MIN_SIZE bytes are sent as they are, since for a few hundred bytes the
+  CPU cost outweighs the saving;
+- streamed responses (the export) are compressed chunk by chunk as they are generated, each chunk flushed so the
+  client keeps receiving data, and memory stays flat.
+Brotli is offered when the `brotli` (or `brotlicffi`) package is installed; gzip always is.
+
+Compressed responses carry `Vary: Accept-Encoding`, and a strong ETag is weakened (W/"...") because the bytes
+differ from the identity encoding. If-None-Match still matches it, since that comparison is weak.
+"""
+import zlib
+from flask import current_app, request
+
+try:
+    import brotli  # Optional, better ratio than gzip at similar speed
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+
+class GzipStream:
+    """Incremental gzip encoder."""
+
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # 16+: gzip container
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliStream:
+    """Incremental brotli encoder."""
+
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def available_encodings(config):
+    """
+    Encodings the server offers, in order of preference.
+    Args:
+        config: App config
+    Returns:
+        List of content-coding names
+    """
+    return [name for name in config['COMPRESS_ENCODINGS'] if name == 'gzip' or (name == 'br' and brotli is not None)]
+
+
+def new_stream(encoding, config):
+    """Encoder for a content coding at the configured level."""
+    if encoding == 'br':
+        return BrotliStream(config['COMPRESS_BROTLI_QUALITY'])
+    return GzipStream(config['COMPRESS_LEVEL'])
+
+
+def compress_chunks(chunks, stream):
+    """
+    Compress an iterable of chunks as they arrive.
+    Args:
+        chunks: Iterable of bytes or str
+        stream: GzipStream or BrotliStream
+    Returns:
+        Generator of compressed chunks
+    """
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = stream.compress(chunk) + stream.flush()
+            if data:
+                yield data
+        yield stream.finish()
+    finally:
+        # Close the wrapped generator too (e.g. to release the export's database cursor)
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+def compress_response(response):
+    """
+    after_request hook: compress the response body if the client accepts it and it is worth it.
+    Args:
+        response: Flask response
+    Returns:
+        The same response, compressed or not
+    """
+    config = current_app.config
+    if (
+        not config['COMPRESS_ENABLED']
+        or response.mimetype not in config['COMPRESS_MIMETYPES']
+        or response.status_code < 200 or response.status_code in (204, 206, 304)
+        or 'Content-Encoding' in response.headers
+        or response.direct_passthrough
+        or 'no-transform' in response.headers.get('Cache-Control', '')
+    ):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = request.accept_encodings.best_match(available_encodings(config))
+    if encoding is None:
+        return response
+    if response.is_streamed:
+        response.response = compress_chunks(response.response, new_stream(encoding, config))
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        if len(body) < config['COMPRESS_MIN_SIZE']:
+            return response
+        stream = new_stream(encoding, config)
+        response.set_data(stream.compress(body) + stream.finish())
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app):
+    """
+    Register response compression on an app.
+    Args:
+        app: Flask app
+    """
+    app.after_request(compress_response)
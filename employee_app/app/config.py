@@ -0,0 +1,167 @@
+"""
+config.py
+Configuration classes for the Employee Directory application.
+
+The .env file selected by APP_ENV and all environment variables are read exactly once, when this module is imported.
+`create_app()` takes one of the classes below (by default the one matching APP_ENV, see `get_config()`) and copies
+it into `app.config`; nothing else in the application reads `os.environ`.
+"""
+import os
+from dotenv import load_dotenv
+
+APP_ENV = os.environ.get('APP_ENV', 'development')
+# Load .env.prod in production and .env.dev otherwise; real environment variables take precedence
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env.prod' if APP_ENV == 'production' else '.env.dev'))
+
+
+def env_bool(name, default):
+    """Read a 'True'/'False' environment variable."""
+    return os.environ.get(name, default) == 'True'
+
+
+def env_int(name, default):
+    """Read an integer environment variable."""
+    return int(os.environ.get(name, default))
+
+
+class Config:
+    """Settings shared by every environment."""
+    ENV_NAME = APP_ENV
+    SECRET_KEY = os.environ.get('SECRET_KEY', 'your_secret_key_here')
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///employees.db')
+    # Origins allowed to call the API from a browser (the Angular frontend)
+    CORS_ORIGINS = ['http://localhost:4200']
+    FRONTEND_URL = os.environ.get('FRONTEND_URL', 'http://localhost:4200')
+
+    # Connection pool and engine tuning (see engine.py)
+    DB_POOL_SIZE = env_int('DB_POOL_SIZE', 5)
+    DB_MAX_OVERFLOW = env_int('DB_MAX_OVERFLOW', 10)
+    DB_POOL_TIMEOUT = env_int('DB_POOL_TIMEOUT', 30)
+    DB_POOL_RECYCLE = env_int('DB_POOL_RECYCLE', 1800)
+    DB_POOL_PRE_PING = env_bool('DB_POOL_PRE_PING', 'True')
+    DB_STATEMENT_TIMEOUT_MS = env_int('DB_STATEMENT_TIMEOUT_MS', 30000)
+    DB_BUSY_TIMEOUT_MS = env_int('DB_BUSY_TIMEOUT_MS', 5000)
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_MMAP_SIZE = env_int('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)
+    # PostgreSQL lock_timeout for migrations, so DDL fails fast instead of queueing every query behind it
+    MIGRATION_LOCK_TIMEOUT_MS = env_int('MIGRATION_LOCK_TIMEOUT_MS', 5000)
+
+    # ASGI serving (see asgi_app.py): endpoints served on the event loop with an async database session, the async
+    # engine's pool, and the thread pool that runs every other endpoint
+    ASYNC_READ_ENDPOINTS = ['api.get_employees', 'api.get_employee', 'api.export_employees']
+    ASYNC_DB_POOL_SIZE = env_int('ASYNC_DB_POOL_SIZE', 20)
+    ASYNC_DB_MAX_OVERFLOW = env_int('ASYNC_DB_MAX_OVERFLOW', 10)
+    ASYNC_SYNC_THREADS = env_int('ASYNC_SYNC_THREADS', 8)
+
+    # Flask-Mail
+    MAIL_SERVER = os.environ.get('MAIL_SERVER')
+    MAIL_PORT = env_int('MAIL_PORT', 587)
+    MAIL_USE_TLS = env_bool('MAIL_USE_TLS', 'True')
+    MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
+    MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
+    MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER')
+    # Outbox sender: emails are queued in the database and sent by a background worker
+    MAIL_OUTBOX_WORKER = env_bool('MAIL_OUTBOX_WORKER', 'True')
+    MAIL_OUTBOX_INTERVAL = env_int('MAIL_OUTBOX_INTERVAL', 5)
+    MAIL_OUTBOX_BATCH_SIZE = env_int('MAIL_OUTBOX_BATCH_SIZE', 50)
+    MAIL_OUTBOX_MAX_ATTEMPTS = env_int('MAIL_OUTBOX_MAX_ATTEMPTS', 5)
+    MAIL_OUTBOX_BACKOFF = env_int('MAIL_OUTBOX_BACKOFF', 30)
+    # Rows per transaction for `flask purge-reset-tokens`
+    RESET_TOKEN_PURGE_BATCH_SIZE = env_int('RESET_TOKEN_PURGE_BATCH_SIZE', 1000)
+
+    # JWT signing and the verified-token cache
+    JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-jwt-secret-key')
+    JWT_EXP_DELTA_SECONDS = env_int('JWT_EXP_DELTA_SECONDS', 3600)
+    JWT_CACHE_ENABLED = env_bool('JWT_CACHE_ENABLED', 'True')
+    JWT_CACHE_SIZE = env_int('JWT_CACHE_SIZE', 1024)
+    JWT_CACHE_TTL = env_int('JWT_CACHE_TTL', 300)
+
+    # Password hashing pool
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+    PASSWORD_HASH_WORKERS = env_int('PASSWORD_HASH_WORKERS', 2)
+    PASSWORD_HASH_MAX_PENDING = env_int('PASSWORD_HASH_MAX_PENDING', 32)
+    # Seconds to wait for a free slot or a result before answering 503, and the Retry-After sent with it
+    PASSWORD_HASH_TIMEOUT = env_int('PASSWORD_HASH_TIMEOUT', 30)
+    PASSWORD_HASH_RETRY_AFTER = env_int('PASSWORD_HASH_RETRY_AFTER', 5)
+
+    # JSON encoder for API responses: 'auto' (orjson when installed), 'orjson' or 'stdlib'
+    JSON_BACKEND = os.environ.get('JSON_BACKEND', 'auto')
+
+    # Response compression (see compression.py)
+    COMPRESS_ENABLED = env_bool('COMPRESS_ENABLED', 'True')
+    COMPRESS_MIN_SIZE = env_int('COMPRESS_MIN_SIZE', 1024)
+    COMPRESS_LEVEL = env_int('COMPRESS_LEVEL', 6)  # gzip 1-9
+    COMPRESS_BROTLI_QUALITY = env_int('COMPRESS_BROTLI_QUALITY', 4)  # brotli 0-11
+    COMPRESS_ENCODINGS = ['br', 'gzip']  # Server preference when the client accepts both equally
+    COMPRESS_MIMETYPES = ['application/json', 'text/csv', 'application/x-ndjson']
+
+    # Rate limits of the authentication endpoints (see ratelimit.py): endpoint -> {'ip' or 'email': (requests, seconds)}
+    RATE_LIMIT_ENABLED = env_bool('RATE_LIMIT_ENABLED', 'True')
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')  # 'memory' (per worker) or 'redis' (shared)
+    RATE_LIMIT_REDIS_URL = os.environ.get('RATE_LIMIT_REDIS_URL', 'redis://localhost:6379/0')
+    RATE_LIMIT_MAX_KEYS = env_int('RATE_LIMIT_MAX_KEYS', 100000)
+    RATE_LIMIT_TRUSTED_PROXIES = env_int('RATE_LIMIT_TRUSTED_PROXIES', 0)  # Proxies that append to X-Forwarded-For
+    RATE_LIMITS = {
+        'login': {'ip': (20, 60), 'email': (10, 60)},
+        'register': {'ip': (5, 60)},
+        'password_reset_request': {'ip': (5, 60), 'email': (3, 3600)},
+    }
+
+    # Request metrics (see metrics.py): GET /metrics in Prometheus format and the Server-Timing header
+    METRICS_ENABLED = env_bool('METRICS_ENABLED', 'True')
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # When set, scrapes must send `Authorization: Bearer <token>`
+    SERVER_TIMING_ENABLED = env_bool('SERVER_TIMING_ENABLED', 'True')
+
+    # Employee listing, import and export
+    COUNT_CACHE_TTL = env_int('COUNT_CACHE_TTL', 30)
+    BULK_IMPORT_BATCH_SIZE = env_int('BULK_IMPORT_BATCH_SIZE', 1000)
+    BULK_IMPORT_MAX_ERRORS = env_int('BULK_IMPORT_MAX_ERRORS', 1000)
+    EXPORT_CHUNK_SIZE = env_int('EXPORT_CHUNK_SIZE', 1000)
+    BATCH_MAX_ITEMS = env_int('BATCH_MAX_ITEMS', 1000)  # Ids or items per batch get/update/delete request
+
+    # Read-through cache of employee read responses (see cache.py): 'memory' (per worker), 'redis' (shared) or 'none'
+    RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory')
+    RESPONSE_CACHE_REDIS_URL = os.environ.get('RESPONSE_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    RESPONSE_CACHE_MAX_ENTRIES = env_int('RESPONSE_CACHE_MAX_ENTRIES', 10000)
+    RESPONSE_CACHE_MAX_BYTES = env_int('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024)
+    RESPONSE_CACHE_TTL = env_int('RESPONSE_CACHE_TTL', 300)
+
+
+class DevelopmentConfig(Config):
+    """Local development with the SQLite file database."""
+
+
+class ProductionConfig(Config):
+    """Production: the database URL and secret key must come from the environment."""
+    SECRET_KEY = os.environ.get('SECRET_KEY')
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
+
+
+class TestingConfig(Config):
+    """Tests: private in-memory database, no real email, no background sender, no response cache, no rate limits."""
+    ENV_NAME = 'testing'
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    MAIL_SUPPRESS_SEND = True
+    MAIL_OUTBOX_WORKER = False
+    # Tests insert rows directly and inspect the SQL each request runs; the cache tests enable it explicitly
+    RESPONSE_CACHE_BACKEND = 'none'
+    # Every test registers and logs in from the same address; the rate limit tests enable it explicitly
+    RATE_LIMIT_ENABLED = False
+
+
+def get_config(env=None):
+    """
+    Pick the configuration class for an environment name.
+    Args:
+        env: 'production', 'testing' or anything else for development (defaults to APP_ENV)
+    Returns:
+        Config class
+    """
+    env = env or APP_ENV
+    if env == 'production':
+        return ProductionConfig
+    if env == 'testing':
+        return TestingConfig
+    return DevelopmentConfig
@@ -0,0 +1,125 @@
+"""
+counts.py
+Cached and approximate row totals for paginated employee listings.
+
+Counting a filtered result set means scanning every matching row, and the listing only needs the number to fill
+in `total` and `pages`. Totals are cached per normalized filter and employee table version (the `table_version`
+change counter of etags.py, which the listing's ETag carries too), so a write made by any worker process makes the
+old totals unreachable: a listing never pairs rows and an ETag of one version with the total of another. This
+process also clears the cache after its own writes, and entries expire after a short TTL.
+"""
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import text
+
+COUNT_MODES = ['exact', 'estimate', 'none']
+
+
+def normalize_search(search):
+    """
+    Normalize a search string so equivalent searches share a cache entry.
+    Args:
+        search: Raw search string or None
+    Returns:
+        Lowercase string with collapsed whitespace ('' for no search)
+    """
+    return ' '.join((search or '').lower().split())
+
+
+class CountCache:
+    """Thread-safe, size-bounded cache of listing totals keyed by table version and normalized filters."""
+
+    def __init__(self, maxsize=256, ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (total, stored_at)
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Take the TTL from COUNT_CACHE_TTL in the app config."""
+        self.ttl = app.config['COUNT_CACHE_TTL']
+
+    def get(self, key, allow_stale=False):
+        """
+        Look up a cached total.
+        Args:
+            key: Cache key
+            allow_stale: Return entries older than the TTL too (used for estimates)
+        Returns:
+            Cached total or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            total, stored_at = entry
+            if not allow_stale and time.monotonic() - stored_at > self.ttl:
+                return None
+            self._entries.move_to_end(key)
+            return total
+
+    def set(self, key, total):
+        """Store a total, evicting the least recently used entry when full."""
+        with self._lock:
+            self._entries[key] = (total, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached total. Called after any employee write commits."""
+        with self._lock:
+            self._entries.clear()
+
+
+def estimate_table_rows(session, table_name):
+    """
+    Cheaply estimate the number of rows in a table without scanning it.
+    Uses planner statistics on PostgreSQL and the highest rowid on SQLite.
+    Args:
+        session: SQLAlchemy session
+        table_name: Name of the table
+    Returns:
+        Estimated row count, or None if the database offers no cheap estimate
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        estimate = session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE relname = :name"), {'name': table_name}
+        ).scalar()
+        # reltuples is -1 until the table has been vacuumed or analyzed
+        return estimate if estimate is not None and estimate >= 0 else None
+    if dialect == 'sqlite':
+        return session.execute(text(f"SELECT coalesce(max(rowid), 0) FROM {table_name}")).scalar()
+    return None
+
+
+def count_total(cache, query, search, mode, session, table_name, version, department=None):
+    """
+    Resolve the total for a listing according to the requested count mode.
+    Args:
+        cache: CountCache instance
+        query: Filtered query (ordering is ignored)
+        search: Raw search string or None
+        mode: 'exact' (cached for up to the TTL), 'estimate' (cheap approximation) or 'none'
+        session: SQLAlchemy session, for estimates
+        table_name: Table to estimate when there is no filter
+        version: Current table_version of the table, read in the same transaction as the page
+        department: Department filter or None
+    Returns:
+        Total number of matching rows, or None for mode 'none'
+    """
+    if mode == 'none':
+        return None
+    key = (version, normalize_search(search), department or '')
+    total = cache.get(key, allow_stale=(mode == 'estimate'))
+    if total is not None:
+        return total
+    if mode == 'estimate' and not search and not department:
+        total = estimate_table_rows(session, table_name)
+        if total is not None:
+            return total
+    total = query.order_by(None).count()
+    cache.set(key, total)
+    return total
@@ -0,0 +1,184 @@
+"""
+engine.py
+Engine tuning for the Employee Directory database: connection pool options, per-dialect connect-time settings and
+pool checkout wait statistics.
+
+`engine_options(config)` turns the DB_* and SQLITE_* settings into SQLALCHEMY_ENGINE_OPTIONS, and `tune_engines(app)`
+installs connect hooks on the engines Flask-SQLAlchemy created:
+- PostgreSQL: pooled connections with pre-ping, recycling and a server-side statement_timeout.
+- SQLite files: a pool plus journal_mode (WAL by default, so readers never block the writer), synchronous=NORMAL,
+  mmap and a busy timeout, applied to every new connection.
+- SQLite in-memory databases keep Flask-SQLAlchemy's single shared connection.
+
+Pooled engines use TimedQueuePool, which records how long each checkout waited for a connection.
+"""
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+from employee_app.app.models.db import db
+
+# Upper bounds (seconds) of the checkout wait histogram buckets
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class PoolStats:
+    """Thread-safe counters for connection pool checkout waits."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.buckets = [0] * len(WAIT_BUCKETS)
+
+    def record(self, seconds):
+        """
+        Count one checkout.
+        Args:
+            seconds: Time spent waiting for (or opening) a connection
+        """
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            for i, bound in enumerate(WAIT_BUCKETS):
+                if seconds <= bound:
+                    self.buckets[i] += 1
+
+    def snapshot(self):
+        """
+        Current statistics.
+        Returns:
+            Dict with checkout count, total/mean/max wait in milliseconds and cumulative bucket counts
+        """
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'wait_total_ms': round(self.wait_total * 1000, 3),
+                'wait_mean_ms': round(self.wait_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                'wait_max_ms': round(self.wait_max * 1000, 3),
+                'wait_buckets': {f'le_{bound}': count for bound, count in zip(WAIT_BUCKETS, self.buckets)},
+            }
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records the checkout wait of every connection request in `self.stats`."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        # Covers both waiting for a free connection and opening a new one while under pool_size + max_overflow
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.stats.record(time.perf_counter() - start)
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep counting into the same stats
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+def _is_memory_sqlite(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def engine_options(config):
+    """
+    Build SQLALCHEMY_ENGINE_OPTIONS for the configured database.
+    Args:
+        config: App config (mapping with SQLALCHEMY_DATABASE_URI and the DB_* settings)
+    Returns:
+        Dict of create_engine() keyword arguments
+    """
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    backend = url.get_backend_name()
+    connect_args = {}
+    if backend == 'sqlite':
+        # Seconds a connection waits on a locked database before raising "database is locked"
+        connect_args['timeout'] = config['DB_BUSY_TIMEOUT_MS'] / 1000
+        if _is_memory_sqlite(url):
+            # One shared connection (StaticPool); pool sizing does not apply
+            return {'connect_args': connect_args}
+    elif backend == 'postgresql' and config['DB_STATEMENT_TIMEOUT_MS']:
+        connect_args['options'] = f"-c statement_timeout={config['DB_STATEMENT_TIMEOUT_MS']}"
+    return {
+        'poolclass': TimedQueuePool,
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        # A local SQLite file cannot drop a connection, so the extra round-trip is only paid for network databases
+        'pool_pre_ping': config['DB_POOL_PRE_PING'] and backend != 'sqlite',
+        'connect_args': connect_args,
+    }
+
+
+def sqlite_pragmas(config):
+    """
+    PRAGMA statements run on every new SQLite connection.
+    Args:
+        config: App config
+    Returns:
+        List of SQL strings
+    """
+    pragmas = [
+        f"PRAGMA journal_mode={config['SQLITE_JOURNAL_MODE']}",
+        f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA busy_timeout={config['DB_BUSY_TIMEOUT_MS']}",
+    ]
+    if config['SQLITE_MMAP_SIZE']:
+        pragmas.append(f"PRAGMA mmap_size={config['SQLITE_MMAP_SIZE']}")
+    return pragmas
+
+
+def tune_engine(engine, config):
+    """
+    Install connect-time settings on one engine. Opens no connections.
+    Args:
+        engine: SQLAlchemy Engine (for an AsyncEngine, its sync_engine)
+        config: App config
+    """
+    if engine.dialect.name == 'sqlite':
+        pragmas = sqlite_pragmas(config)
+
+        @event.listens_for(engine, 'connect')
+        def set_sqlite_pragmas(dbapi_connection, connection_record, pragmas=pragmas):
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            cursor.close()
+
+
+def tune_engines(app):
+    """
+    Install connect-time settings on the app's engines. Opens no connections. Must run inside an app context.
+    Args:
+        app: Flask app with Flask-SQLAlchemy initialized
+    """
+    for engine in db.engines.values():
+        tune_engine(engine, app.config)
+
+
+def pool_stats():
+    """
+    Pool size and checkout wait statistics for each engine of the current app. Must run inside an app context.
+    Returns:
+        Dict of bind name ('default' for the main database) -> statistics
+    """
+    stats = {}
+    for bind, engine in db.engines.items():
+        pool = engine.pool
+        entry = {'pool': type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            entry.update(size=pool.size(), checked_out=pool.checkedout(), overflow=pool.overflow())
+        if isinstance(pool, TimedQueuePool):
+            entry.update(pool.stats.snapshot())
+        stats[bind or 'default'] = entry
+    return stats
@@ -0,0 +1,135 @@
+"""
+etags.py
+Strong ETags for employee reads and If-Match checks for employee writes.
+
+Every transaction that writes employees bumps the `employee` row of the `table_version` change counter once, and
+stamps each inserted or updated employee with the new counter value as its `version`. So:
+- an employee's ETag is `<id>.<version>`, which changes on every update and is never reused, even when SQLite hands
+  a deleted row's id to a new employee;
+- a listing's ETag is the counter plus a digest of the query parameters, which changes on any employee write.
+Both are read with a single primary-key lookup, so conditional requests are answered with 304 before any rows are
+loaded or serialized.
+
+ORM writes are stamped by a `before_flush` listener; bulk SQL inserts call `bump_table_version()` themselves.
+"""
+import hashlib
+from functools import wraps
+from flask import Response, request
+from sqlalchemy import event, insert, select, update
+from employee_app.app.cache import LIST_PARAMS
+from employee_app.app.models.db import db
+from employee_app.app.models.models import Employee
+from employee_app.app.models.table_version import TableVersion
+
+
+def bump_table_version(session, table_name):
+    """
+    Increment a table's change counter inside the session's current transaction.
+    Args:
+        session: SQLAlchemy session
+        table_name: Name of the table that was written
+    Returns:
+        New counter value
+    """
+    connection = session.connection()
+    result = connection.execute(
+        update(TableVersion).where(TableVersion.table_name == table_name).values(version=TableVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        # Counter row missing (database created without migrations): start it
+        connection.execute(insert(TableVersion).values(table_name=table_name, version=2))
+    return connection.execute(select(TableVersion.version).where(TableVersion.table_name == table_name)).scalar_one()
+
+
+def table_version(table_name):
+    """
+    Current change counter of a table.
+    Args:
+        table_name: Table name
+    Returns:
+        Counter value (0 if the table was never written)
+    """
+    return db.session.execute(
+        select(TableVersion.version).where(TableVersion.table_name == table_name)
+    ).scalar_one_or_none() or 0
+
+
+@event.listens_for(db.session, 'before_flush')
+def stamp_employee_versions(session, flush_context, instances):
+    """Bump the employee change counter and stamp new and changed employees with it, once per flush."""
+    new = [obj for obj in session.new if isinstance(obj, Employee)]
+    changed = [obj for obj in session.dirty if isinstance(obj, Employee) and session.is_modified(obj)]
+    deleted = any(isinstance(obj, Employee) for obj in session.deleted)
+    if not (new or changed or deleted):
+        return
+    version = bump_table_version(session, Employee.__tablename__)
+    for employee in new + changed:
+        employee.version = version
+
+
+def employee_etag(employee):
+    """ETag value of one employee."""
+    return f'{employee.id}.{employee.version}'
+
+
+def employee_etag_by_id(emp_id):
+    """
+    ETag of an employee looked up by id, without loading the row.
+    Args:
+        emp_id: Employee ID
+    Returns:
+        ETag value or None if the employee does not exist
+    """
+    version = db.session.execute(select(Employee.version).where(Employee.id == emp_id)).scalar_one_or_none()
+    return None if version is None else f'{emp_id}.{version}'
+
+
+def list_etag(args):
+    """
+    ETag of an employee listing: the table's change counter and the query parameters that shape the response.
+    The counter is also attached to the request as `request.table_version`, so the listing's total is looked up
+    for the same version without another query.
+    Args:
+        args: Request query parameters
+    Returns:
+        ETag value
+    """
+    request.table_version = table_version(Employee.__tablename__)
+    shape = '&'.join(f'{name}={args.get(name)}' for name in LIST_PARAMS if name in args)
+    digest = hashlib.sha256(shape.encode('utf-8')).hexdigest()[:16]
+    return f'l{request.table_version}.{digest}'
+
+
+def conditional_get(etag_for):
+    """
+    Decorator answering If-None-Match with 304 before the view runs, and tagging 200 responses with the ETag.
+    The ETag is also attached to the request as `request.etag`, for the response cache to key on.
+    Args:
+        etag_for: Function of the view kwargs returning the current ETag, or None if there is nothing to tag
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            etag = etag_for(**kwargs)
+            request.etag = etag
+            if etag is not None and request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+                response.set_etag(etag)
+                return response
+            response = f(*args, **kwargs)
+            if etag is not None and isinstance(response, Response) and response.status_code == 200:
+                response.set_etag(etag)
+            return response
+        return decorated
+    return decorator
+
+
+def if_match_failed(etag):
+    """
+    Whether the request's If-Match header rules out a write to a resource with this ETag.
+    Args:
+        etag: Current ETag value of the resource
+    Returns:
+        True if If-Match is present and matches neither the ETag nor `*`
+    """
+    return 'If-Match' in request.headers and not request.if_match.contains(etag)
@@ -0,0 +1,83 @@
+"""
+export.py
+Streaming export of the employee directory as CSV or NDJSON.
+
+Rows are fetched in chunks with `yield_per` (a server-side cursor on PostgreSQL) and written to the response as
+they arrive, so memory stays flat no matter how many employees are exported.
+"""
+import csv
+import io
+import json
+from sqlalchemy import select
+from employee_app.app.models.db import db
+from employee_app.app.models.models import Employee
+
+EXPORT_FIELDS = ['id', 'name', 'email', 'department', 'phone']
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def export_statement():
+    """
+    Base SELECT for exports: plain column tuples, no ORM entities.
+    Returns:
+        SQLAlchemy Select over the exported employee columns
+    """
+    return select(*[getattr(Employee, field) for field in EXPORT_FIELDS])
+
+
+def _batches(stmt, chunk_size):
+    result = db.session.execute(stmt.execution_options(yield_per=chunk_size))
+    for partition in result.partitions():
+        yield partition
+
+
+def generate_csv(stmt, chunk_size=1000):
+    """
+    Yield the export as CSV text, one chunk of rows at a time.
+    Args:
+        stmt: Select returning EXPORT_FIELDS columns
+        chunk_size: Rows fetched and written per chunk
+    Yields:
+        CSV text chunks (the first one starts with the header row)
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for rows in _batches(stmt, chunk_size):
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()  # Header only: the export matched no rows
+
+
+def generate_ndjson(stmt, chunk_size=1000):
+    """
+    Yield the export as newline-delimited JSON, one chunk of rows at a time.
+    Args:
+        stmt: Select returning EXPORT_FIELDS columns
+        chunk_size: Rows fetched and written per chunk
+    Yields:
+        NDJSON text chunks
+    """
+    for rows in _batches(stmt, chunk_size):
+        yield ''.join(json.dumps(dict(zip(EXPORT_FIELDS, row))) + '\n' for row in rows)
+
+
+def generate_export(stmt, export_format, chunk_size=1000):
+    """
+    Pick the generator for an export format.
+    Args:
+        stmt: Select returning EXPORT_FIELDS columns
+        export_format: 'csv' or 'ndjson'
+        chunk_size: Rows fetched per chunk
+    Returns:
+        Generator of text chunks
+    """
+    if export_format == 'ndjson':
+        return generate_ndjson(stmt, chunk_size)
+    return generate_csv(stmt, chunk_size)
@@ -0,0 +1,162 @@
+"""
+mailer.py
+Background delivery of queued emails from the outbox table.
+
+Request handlers never talk to SMTP. They add an OutboundEmail row in the same transaction as the data it
+belongs to (e.g. a password reset token), and a background sender drains the table: it claims a batch of due
+messages, sends them all over one reused SMTP connection, and reschedules failures with exponential backoff.
+
+Claiming is a conditional UPDATE per row, so several server processes can run a sender against the same table
+without sending a message twice. A claimed message is leased for SENDING_LEASE; if its sender dies mid-batch the
+message becomes due again once the lease runs out.
+"""
+import logging
+import threading
+from datetime import timedelta
+from flask_mail import Message
+from sqlalchemy import select, update
+from employee_app.app.models.db import db
+from employee_app.app.models.outbox import OutboundEmail, utcnow
+
+SENDING_LEASE = timedelta(minutes=5)
+MAX_BACKOFF_SECONDS = 3600
+
+
+def enqueue_email(recipient, subject, body):
+    """
+    Queue an email for the background sender. The caller commits it with the rest of its transaction.
+    Args:
+        recipient: Email address
+        subject: Subject line
+        body: Plain text body
+    Returns:
+        The pending OutboundEmail
+    """
+    email = OutboundEmail(recipient=recipient, subject=subject, body=body)
+    db.session.add(email)
+    return email
+
+
+def claim_due_emails(batch_size):
+    """
+    Claim up to `batch_size` due messages for this sender.
+    Returns:
+        List of claimed OutboundEmail rows (status 'sending')
+    """
+    now = utcnow()
+    candidates = db.session.execute(
+        select(OutboundEmail.id, OutboundEmail.status, OutboundEmail.next_attempt_at)
+        .where(OutboundEmail.status.in_(['pending', 'sending']), OutboundEmail.next_attempt_at <= now)
+        .order_by(OutboundEmail.next_attempt_at)
+        .limit(batch_size)
+    ).all()
+    claimed = []
+    for email_id, status, next_attempt_at in candidates:
+        # Only succeeds if no other sender changed the row since we read it
+        result = db.session.execute(
+            update(OutboundEmail)
+            .where(OutboundEmail.id == email_id, OutboundEmail.status == status,
+                   OutboundEmail.next_attempt_at == next_attempt_at)
+            .values(status='sending', next_attempt_at=now + SENDING_LEASE)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            claimed.append(email_id)
+    db.session.commit()
+    if not claimed:
+        return []
+    return db.session.execute(select(OutboundEmail).where(OutboundEmail.id.in_(claimed))).scalars().all()
+
+
+def _schedule_retry(email, error, max_attempts, backoff):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= max_attempts:
+        email.status = 'failed'
+        logging.error(f"Giving up on email {email.id} to {email.recipient} after {email.attempts} attempts: {error}")
+        return 'failed'
+    email.status = 'pending'
+    delay = min(backoff * 2 ** (email.attempts - 1), MAX_BACKOFF_SECONDS)
+    email.next_attempt_at = utcnow() + timedelta(seconds=delay)
+    return 'retried'
+
+
+def drain_outbox(mail, batch_size=50, max_attempts=5, backoff=30):
+    """
+    Send one batch of due messages over a single SMTP connection. Must run inside an app context.
+    Args:
+        mail: Flask-Mail instance
+        batch_size: Maximum messages claimed and sent in this batch
+        max_attempts: Attempts before a message is marked failed
+        backoff: Base retry delay in seconds, doubled after each failed attempt
+    Returns:
+        Dict with counts of sent, retried and failed messages
+    """
+    stats = {'sent': 0, 'retried': 0, 'failed': 0}
+    emails = claim_due_emails(batch_size)
+    if not emails:
+        return stats
+    try:
+        with mail.connect() as connection:
+            for email in emails:
+                try:
+                    connection.send(Message(email.subject, recipients=[email.recipient], body=email.body))
+                    email.status = 'sent'
+                    email.sent_at = utcnow()
+                    stats['sent'] += 1
+                except Exception as e:
+                    stats[_schedule_retry(email, e, max_attempts, backoff)] += 1
+                # Record each outcome immediately so a crash later in the batch cannot cause a resend
+                db.session.commit()
+    except Exception as e:
+        # Could not connect (or the connection dropped): everything still in flight goes back in the queue
+        logging.warning(f"Outbox SMTP connection failed: {e}")
+        for email in emails:
+            if email.status == 'sending':
+                stats[_schedule_retry(email, e, max_attempts, backoff)] += 1
+        db.session.commit()
+    return stats
+
+
+class OutboxWorker(threading.Thread):
+    """Daemon thread that drains the outbox every `interval` seconds."""
+
+    def __init__(self, app, mail, interval=5, **drain_options):
+        super().__init__(name='outbox-worker', daemon=True)
+        self.app = app
+        self.mail = mail
+        self.interval = interval
+        self.drain_options = drain_options
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            with self.app.app_context():
+                try:
+                    # Keep going while batches come back full
+                    while sum(drain_outbox(self.mail, **self.drain_options).values()) == \
+                            self.drain_options.get('batch_size', 50):
+                        pass
+                except Exception as e:
+                    logging.error(f"Outbox worker error: {e}")
+                finally:
+                    db.session.remove()
+
+    def stop(self):
+        self._stopped.set()
+
+
+def start_outbox_worker(app, mail, interval=5, **drain_options):
+    """
+    Start a background sender for this process.
+    Args:
+        app: Flask app
+        mail: Flask-Mail instance
+        interval: Seconds between polls
+        drain_options: Passed to drain_outbox
+    Returns:
+        The running OutboxWorker
+    """
+    worker = OutboxWorker(app, mail, interval, **drain_options)
+    worker.start()
+    return worker
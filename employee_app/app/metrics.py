@@ -0,0 +1,248 @@
+"""
+metrics.py
+Request-level performance metrics in Prometheus text format, and the Server-Timing header.
+
+`init_metrics(app)` installs:
+- before/after_request hooks that time every request and record it per endpoint (the URL rule, e.g.
+  `/employees/<int:emp_id>`, so ids do not create new series);
+- before/after_cursor_execute listeners on the app's engines that count the SQL statements each request runs and
+  the time spent executing them (fetching rows afterwards is not included). They only observe: the dialect still
+  runs every statement itself, including any customised execution (e.g. psycopg's executemany modes);
+- `GET /metrics`, which renders these together with the connection pool statistics from engine.py;
+- a `Server-Timing: app;dur=..., db;dur=...;desc="N queries"` header, readable in the browser's devtools.
+
+Metrics live in the worker process that handled the request; with several gunicorn workers each scrape sees one
+worker, and every series carries a `worker` label (the pid) so series from different workers never mix.
+The cost is SQLAlchemy's cursor-event dispatch plus a few perf_counter() calls per statement, and a few dict updates
+under a lock per request; see bench_metrics.py.
+"""
+import hmac
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from flask import Response, current_app, request
+from sqlalchemy import event
+from employee_app.app.engine import WAIT_BUCKETS, pool_stats
+from employee_app.app.models.db import db
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Upper bounds of the per-request SQL statement count histogram
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def format_labels(labels):
+    """Render a label dict as {name="value",...} with Prometheus escaping."""
+    if not labels:
+        return ''
+    escaped = (
+        f'{name}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for name, value in labels.items()
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+class Histogram:
+    """Prometheus histogram with one series per label tuple. Not locked; the Registry holds the lock."""
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self.series = {}  # label values -> [count per bucket..., count above the last bucket, sum]
+
+    def observe(self, label_values, value):
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+        # Count only the smallest matching bucket (the last slot is +Inf); render() makes them cumulative
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self, common):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        for label_values, series in sorted(self.series.items()):
+            labels = {**common, **dict(zip(self.label_names, label_values))}
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{format_labels({**labels, "le": bound})} {cumulative}')
+            lines.append(f'{self.name}_sum{format_labels(labels)} {series[-1]}')
+            lines.append(f'{self.name}_count{format_labels(labels)} {cumulative}')
+        return lines
+
+
+class Counter:
+    """Prometheus counter with one series per label tuple. Not locked; the Registry holds the lock."""
+
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self.series = {}
+
+    def inc(self, label_values, amount=1):
+        self.series[label_values] = self.series.get(label_values, 0) + amount
+
+    def render(self, common):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        for label_values, value in sorted(self.series.items()):
+            lines.append(f'{self.name}{format_labels({**common, **dict(zip(self.label_names, label_values))})} {value}')
+        return lines
+
+
+class Registry:
+    """The request metrics of one app in one process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = Counter('http_requests_total', 'HTTP requests by endpoint and status.',
+                                ('method', 'endpoint', 'status'))
+        self.latency = Histogram('http_request_duration_seconds', 'Time to build the response, by endpoint.',
+                                 ('method', 'endpoint'), LATENCY_BUCKETS)
+        self.db_time = Histogram('http_request_db_seconds', 'Time spent in SQL statements per request.',
+                                 ('method', 'endpoint'), LATENCY_BUCKETS)
+        self.db_queries = Histogram('http_request_db_queries', 'SQL statements run per request.',
+                                    ('method', 'endpoint'), QUERY_COUNT_BUCKETS)
+
+    def record(self, method, endpoint, status, seconds, db_seconds, db_queries):
+        """Record one finished request."""
+        key = (method, endpoint)
+        with self._lock:
+            self.requests.inc((method, endpoint, status))
+            self.latency.observe(key, seconds)
+            self.db_time.observe(key, db_seconds)
+            self.db_queries.observe(key, db_queries)
+
+    def render(self):
+        """
+        All metrics, including connection pool statistics, in Prometheus text format.
+        Must run inside an app context.
+        """
+        common = {'worker': os.getpid()}
+        with self._lock:
+            lines = []
+            for metric in (self.requests, self.latency, self.db_time, self.db_queries):
+                lines += metric.render(common)
+        lines += render_pool_stats(pool_stats(), common)
+        return '\n'.join(lines) + '\n'
+
+
+def render_pool_stats(stats, common):
+    """
+    Connection pool gauges and the checkout wait histogram.
+    Args:
+        stats: Result of engine.pool_stats()
+        common: Labels added to every series
+    Returns:
+        List of exposition lines
+    """
+    gauges = [('db_pool_size', 'size', 'Connections kept open by the pool.'),
+              ('db_pool_checked_out', 'checked_out', 'Connections currently in use.'),
+              ('db_pool_overflow', 'overflow', 'Connections open beyond the pool size.')]
+    lines = []
+    for name, key, help_text in gauges:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge']
+        for bind, entry in stats.items():
+            if key in entry:
+                lines.append(f'{name}{format_labels({**common, "bind": bind})} {entry[key]}')
+    name = 'db_pool_checkout_wait_seconds'
+    lines += [f'# HELP {name} Time requests waited for a database connection.', f'# TYPE {name} histogram']
+    for bind, entry in stats.items():
+        if 'checkouts' not in entry:
+            continue
+        labels = {**common, 'bind': bind}
+        for bound in WAIT_BUCKETS:
+            lines.append(f'{name}_bucket{format_labels({**labels, "le": bound})} {entry["wait_buckets"][f"le_{bound}"]}')
+        lines.append(f'{name}_bucket{format_labels({**labels, "le": "+Inf"})} {entry["checkouts"]}')
+        lines.append(f'{name}_sum{format_labels(labels)} {entry["wait_total_ms"] / 1000}')
+        lines.append(f'{name}_count{format_labels(labels)} {entry["checkouts"]}')
+    return lines
+
+
+# [start, SQL statement count, SQL seconds] of the request being handled.
+# A ContextVar rather than flask.g: the execute hooks run for every statement and must stay cheap.
+_current = ContextVar('request_metrics', default=None)
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Engine event: note when a statement of the current request starts, on its execution context."""
+    if context is not None and _current.get() is not None:
+        context.metrics_start = time.perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Engine event: add a finished statement and its duration to the current request."""
+    state = _current.get()
+    start = getattr(context, 'metrics_start', None)
+    if state is None or start is None:
+        return  # Not in a request (CLI, outbox worker), or started before the request began
+    state[1] += 1
+    state[2] += time.perf_counter() - start
+
+
+def start_timer():
+    """before_request hook: start timing the request and counting its SQL statements."""
+    _current.set([time.perf_counter(), 0, 0.0])
+
+
+def record_request(response):
+    """after_request hook: record the request's metrics and add the Server-Timing header."""
+    state = _current.get()
+    if state is None:
+        return response
+    elapsed = time.perf_counter() - state[0]
+    _, db_queries, db_time = state
+    app, req = current_app._get_current_object(), request._get_current_object()  # Resolve the proxies once
+    endpoint = req.url_rule.rule if req.url_rule else 'unmatched'
+    app.extensions['metrics'].record(req.method, endpoint, response.status_code, elapsed, db_time, db_queries)
+    if app.config['SERVER_TIMING_ENABLED']:
+        response.headers['Server-Timing'] = (
+            f'app;dur={elapsed * 1000:.2f}, db;dur={db_time * 1000:.2f};desc="{db_queries} queries"'
+        )
+    return response
+
+
+def stop_timer(exc=None):
+    """teardown_request hook: stop counting SQL statements for this request."""
+    _current.set(None)
+
+
+def metrics_endpoint():
+    """GET /metrics: Prometheus scrape target for this worker."""
+    token = current_app.config['METRICS_TOKEN']
+    if token and not hmac.compare_digest(request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode()):
+        return Response('Unauthorized\n', status=401, mimetype='text/plain')
+    return Response(current_app.extensions['metrics'].render(), mimetype=CONTENT_TYPE)
+
+
+def instrument_engine(engine):
+    """
+    Count and time the statements an engine executes for the current request.
+    Args:
+        engine: SQLAlchemy Engine (for an AsyncEngine, its sync_engine)
+    """
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+
+
+def init_metrics(app):
+    """
+    Install request timing, SQL statement counting and the /metrics endpoint, unless METRICS_ENABLED is False.
+    Must run inside an app context after Flask-SQLAlchemy is initialized.
+    Args:
+        app: Flask app
+    """
+    if not app.config['METRICS_ENABLED']:
+        return
+    app.extensions['metrics'] = Registry()
+    for engine in db.engines.values():
+        instrument_engine(engine)
+    app.before_request(start_timer)
+    app.after_request(record_request)
+    app.teardown_request(stop_timer)
+    app.add_url_rule('/metrics', 'metrics', metrics_endpoint)
@@ -0,0 +1,214 @@
+"""
+migrate.py
+Alembic schema migrations for the Employee Directory database, run through the `flask db` commands.
+
+Migration scripts live in employee_app/migrations/versions. Index changes go through `create_index_online` and
+`drop_index_online` (employee_app/migrations/online.py): CREATE INDEX CONCURRENTLY on PostgreSQL, so reads and
+writes continue while the index builds, and batch mode on SQLite.
+
+`flask db upgrade --report-locks` times every statement of every migration step and reports which lock it takes
+and how long that lock is held; `--max-lock-ms` turns the report into a check that fails the deploy when a step
+blocks writes for longer than allowed.
+"""
+import os
+import time
+import click
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from flask.cli import AppGroup
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+db_cli = AppGroup('db', help='Database schema migrations.')
+
+
+def alembic_config(lock_report=None):
+    """
+    Alembic config pointing at employee_app/migrations.
+    Args:
+        lock_report: Optional LockReport for env.py to attach to the migration connection
+    Returns:
+        alembic.config.Config
+    """
+    config = AlembicConfig()
+    config.set_main_option('script_location', MIGRATIONS_DIR)
+    config.attributes['lock_report'] = lock_report
+    return config
+
+
+def upgrade_database(revision='head', lock_report=None):
+    """
+    Apply migrations up to `revision`. Must run inside an app context.
+    Args:
+        revision: Target revision
+        lock_report: Optional LockReport to fill in
+    """
+    command.upgrade(alembic_config(lock_report), revision)
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """
+    Autogenerate filter: ignore the search index, which has no model (the FTS5 table and its shadow tables on
+    SQLite, the GIN expression index on PostgreSQL); migration 0006 manages it.
+    """
+    if not reflected or compare_to is not None:
+        return True
+    return not ((type_ == 'table' and name.startswith('employee_fts')) or (type_ == 'index' and name == 'ix_employee_search'))
+
+
+def lock_mode(statement, dialect):
+    """
+    Lock a DDL or DML statement takes on the table it changes.
+    Args:
+        statement: SQL text
+        dialect: Dialect name
+    Returns:
+        Tuple of (lock description, what it blocks: 'nothing', 'writes' or 'reads and writes')
+    """
+    sql = ' '.join(statement.upper().split())
+    if dialect == 'sqlite':
+        if sql.startswith(('SELECT', 'PRAGMA')):
+            return 'shared', 'nothing'
+        # Any write takes the database write lock until commit; in WAL mode readers continue
+        return 'database write lock', 'writes'
+    if dialect == 'postgresql':
+        if 'CONCURRENTLY' in sql:
+            return 'SHARE UPDATE EXCLUSIVE', 'nothing'
+        if sql.startswith(('CREATE INDEX', 'CREATE UNIQUE INDEX')):
+            return 'SHARE', 'writes'
+        if sql.startswith(('ALTER TABLE', 'DROP TABLE', 'DROP INDEX')):
+            return 'ACCESS EXCLUSIVE', 'reads and writes'
+        if sql.startswith(('INSERT', 'UPDATE', 'DELETE')):
+            return 'ROW EXCLUSIVE', 'nothing'
+        return 'none', 'nothing'
+    return 'unknown', 'writes'
+
+
+class LockReport:
+    """Collects the duration and lock of each statement run by a migration, grouped by revision."""
+
+    def __init__(self):
+        self.steps = []  # dicts: revision, statement, lock, blocks, statement_ms, held_ms
+        self._pending = []  # statements of the step in progress
+        self._open = []  # statements whose lock lasts until the next commit
+        self._started = None
+        self._dialect = None
+
+    def attach(self, connection):
+        """Listen to statement and commit events on the migration connection."""
+        from sqlalchemy import event
+        self._dialect = connection.dialect.name
+        event.listen(connection, 'before_cursor_execute', self._before)
+        event.listen(connection, 'after_cursor_execute', self._after)
+        event.listen(connection, 'commit', self._commit)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        self._started = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        now = time.perf_counter()
+        if 'alembic_version' in statement:
+            return
+        lock, blocks = lock_mode(statement, self._dialect)
+        if blocks == 'nothing':
+            return
+        entry = {'revision': None, 'statement': ' '.join(statement.split())[:120], 'lock': lock, 'blocks': blocks,
+                 'statement_ms': round((now - self._started) * 1000, 3), 'held_ms': None, '_start': self._started}
+        self._pending.append(entry)
+        self._open.append(entry)
+        if not conn.in_transaction():
+            # Autocommit (e.g. CREATE INDEX CONCURRENTLY): the lock ends with the statement
+            self._close(now)
+
+    def _commit(self, conn):
+        self._close(time.perf_counter())
+
+    def _close(self, now):
+        for entry in self._open:
+            entry['held_ms'] = round((now - entry.pop('_start')) * 1000, 3)
+        self._open = []
+
+    def on_version_apply(self, ctx, step, heads, run_args):
+        """Alembic callback after each step: assign the statements run so far to its revision."""
+        for entry in self._pending:
+            entry['revision'] = step.up_revision_id
+        self.steps.extend(self._pending)
+        self._pending = []
+
+    def longest(self, blocks=('writes', 'reads and writes')):
+        """Longest hold time in ms among statements that block any of `blocks`."""
+        return max([s['held_ms'] or 0 for s in self.steps if s['blocks'] in blocks], default=0)
+
+
+@db_cli.command('upgrade')
+@click.argument('revision', default='head')
+@click.option('--report-locks', is_flag=True, help='Report how long each migration step holds a lock.')
+@click.option('--max-lock-ms', type=float, default=None,
+              help='Fail if any step blocks writes for longer than this (implies --report-locks).')
+def upgrade_command(revision, report_locks, max_lock_ms):
+    """Upgrade the database to REVISION (default: head)."""
+    report = LockReport() if report_locks or max_lock_ms is not None else None
+    upgrade_database(revision, report)
+    if report is None:
+        return
+    for step in report.steps:
+        click.echo(f"{step['revision']}  {step['lock']} (blocks {step['blocks']})  "
+                   f"held {step['held_ms']} ms  statement {step['statement_ms']} ms  {step['statement']}")
+    if not report.steps:
+        click.echo('No blocking statements were run')
+    if max_lock_ms is not None and report.longest() > max_lock_ms:
+        raise click.ClickException(f'A migration step blocked writes for {report.longest()} ms (limit {max_lock_ms} ms)')
+
+
+@db_cli.command('downgrade')
+@click.argument('revision')
+def downgrade_command(revision):
+    """Downgrade the database to REVISION (e.g. -1 or base)."""
+    command.downgrade(alembic_config(), revision)
+
+
+@db_cli.command('revision')
+@click.option('-m', '--message', required=True, help='Revision message.')
+@click.option('--autogenerate', is_flag=True, help='Compare the models with the database.')
+def revision_command(message, autogenerate):
+    """Create a new migration script."""
+    command.revision(alembic_config(), message=message, autogenerate=autogenerate)
+
+
+@db_cli.command('current')
+def current_command():
+    """Show the current revision of the database."""
+    command.current(alembic_config())
+
+
+@db_cli.command('history')
+def history_command():
+    """List the migration scripts."""
+    command.history(alembic_config())
+
+
+@db_cli.command('check')
+def check_command():
+    """Fail if the models have changes that no migration covers."""
+    command.check(alembic_config())
+
+
+def init_migrations(app):
+    """
+    Register the `flask db` commands.
+    Args:
+        app: Flask app
+    """
+    app.cli.add_command(db_cli)
+
+
+def current_revision():
+    """
+    Revision the database is at. Must run inside an app context.
+    Returns:
+        Revision id or None for an unmigrated database
+    """
+    from alembic.runtime.migration import MigrationContext
+    from employee_app.app.models.db import db
+    with db.engine.connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
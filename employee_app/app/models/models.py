@@ -6,15 +6,34 @@ from .db import db
 
 class Employee(db.Model):
     """SQLAlchemy model for employee records."""
+    __table_args__ = (
+        # One index per sort key, with id as the tiebreaker, so sorted pages are read in index order.
+        # Sorting by email uses the unique email index and by id the primary key.
+        db.Index('ix_employee_name_id', 'name', 'id'),
+        db.Index('ix_employee_phone_id', 'phone', 'id'),
+        db.Index('ix_employee_department_id', 'department', 'id'),
+        # The department filter combined with each remaining sort key
+        db.Index('ix_employee_department_name_id', 'department', 'name', 'id'),
+        db.Index('ix_employee_department_email_id', 'department', 'email', 'id'),
+        db.Index('ix_employee_department_phone_id', 'department', 'phone', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     department = db.Column(db.String(50), nullable=False)
     phone = db.Column(db.String(20), nullable=False)
+    # Row version for ETags and optimistic concurrency. Values are drawn from the employee table's change counter
+    # (see etags.py), so they are unique over time: a reused id never repeats an earlier row's version
+    version = db.Column(db.Integer, nullable=False, server_default='1')
+    # UPDATE and DELETE check the version that was loaded; the new value is assigned by etags.py before each flush
+    __mapper_args__ = {'version_id_col': version, 'version_id_generator': False}
 
     def __repr__(self):
         return f'<Employee {self.name}>'
 
+# Emails are unique regardless of letter case; the database enforces it, so concurrent inserts cannot race
+db.Index('ux_employee_email_lower', db.func.lower(Employee.email), unique=True)
+
 class User(db.Model):
     """SQLAlchemy model for user authentication."""
     id = db.Column(db.Integer, primary_key=True)
@@ -24,3 +43,5 @@ class User(db.Model):
 
     def __repr__(self):
         return f'<User {self.email}>'
+
+db.Index('ux_user_email_lower', db.func.lower(User.email), unique=True)
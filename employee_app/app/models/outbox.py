@@ -0,0 +1,34 @@
+"""
+outbox.py
+Defines the OutboundEmail model: a durable, database-backed queue of emails waiting to be sent.
+"""
+from .db import db
+from datetime import datetime, timezone
+
+
+def utcnow():
+    """Current UTC time as a naive datetime, matching how SQLite returns stored values."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class OutboundEmail(db.Model):
+    """SQLAlchemy model for queued outgoing emails."""
+    __tablename__ = 'outbound_emails'
+    __table_args__ = (
+        # The sender polls for due messages by status and time
+        db.Index('ix_outbound_emails_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    recipient = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    # pending -> sending -> sent, or back to pending for a retry, or failed after too many attempts
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f'<OutboundEmail {self.id} to {self.recipient} ({self.status})>'
@@ -1,11 +1,26 @@
 from .db import db
 from datetime import datetime, timedelta
+import hashlib
+
+
+def hash_token(token):
+    """SHA-256 hex digest of a reset token; only the digest is stored, so a leaked table cannot reset passwords."""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
 
 class PasswordResetToken(db.Model):
     __tablename__ = 'password_reset_tokens'
+    __table_args__ = (
+        # Partial indexes matching the two purge queries (see reset_tokens.py); they stay small because the purge
+        # keeps only live tokens, and a reset looks tokens up by token_hash
+        db.Index('ix_password_reset_tokens_unused_expires_at', 'expires_at',
+                 sqlite_where=db.text('used = 0'), postgresql_where=db.text('used = false')),
+        db.Index('ix_password_reset_tokens_used', 'id',
+                 sqlite_where=db.text('used = 1'), postgresql_where=db.text('used = true')),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    token = db.Column(db.String(128), unique=True, nullable=False)
+    token_hash = db.Column(db.String(64), unique=True, index=True, nullable=False)  # hash_token() of the emailed token
     expires_at = db.Column(db.DateTime, nullable=False)
     used = db.Column(db.Boolean, default=False)
 
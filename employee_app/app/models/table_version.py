@@ -0,0 +1,15 @@
+"""
+table_version.py
+Defines the TableVersion model: a change counter per table, bumped in the same transaction as every write to it.
+"""
+from .db import db
+
+
+class TableVersion(db.Model):
+    """SQLAlchemy model for table-level change counters (see etags.py)."""
+    __tablename__ = 'table_version'
+    table_name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+
+    def __repr__(self):
+        return f'<TableVersion {self.table_name}={self.version}>'
@@ -0,0 +1,97 @@
+"""
+pagination.py
+Keyset (cursor) pagination helpers for the employee listing endpoint.
+
+Instead of skipping OFFSET rows and counting the whole result set, cursor mode seeks directly past the last row
+of the previous page using the (sort_field, id) pair. Cursors are opaque, URL-safe strings so clients never need
+to know how they are built.
+"""
+import base64
+import json
+from sqlalchemy import tuple_
+
+
+# Cursors carry row ids as JSON numbers; anything outside a 64-bit integer cannot be a row id
+MAX_ROW_ID = 2 ** 63 - 1
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor cannot be decoded or was issued for a different sort order."""
+
+
+def _is_row_id(value):
+    # bool is a subclass of int, but True is not a row id
+    return isinstance(value, int) and not isinstance(value, bool) and -MAX_ROW_ID - 1 <= value <= MAX_ROW_ID
+
+
+def encode_cursor(sort_field, direction, value, row_id):
+    """
+    Build an opaque cursor pointing just after a row.
+    Args:
+        sort_field: Name of the column the listing is sorted on
+        direction: 'asc' or 'desc'
+        value: Value of the sort column for the last row on the page
+        row_id: ID of the last row on the page (tiebreaker)
+    Returns:
+        URL-safe cursor string
+    """
+    raw = json.dumps([sort_field, direction, value, row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort_field, direction):
+    """
+    Decode a cursor and check that it belongs to the requested sort order.
+    The sort value must be a row id when sorting on id and a string otherwise, so a crafted cursor cannot reach
+    the database with a value the column cannot be compared with.
+    Args:
+        cursor: Cursor string from the `after` query parameter
+        sort_field: Sort column of the current request
+        direction: Sort direction of the current request
+    Returns:
+        Tuple of (sort value, row id)
+    Raises:
+        InvalidCursor: If the cursor is malformed, was issued for another sort or holds values of the wrong type
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        field, cursor_direction, value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError):
+        raise InvalidCursor('Invalid cursor')
+    if field != sort_field or cursor_direction != direction:
+        raise InvalidCursor('Cursor does not match the requested sort order')
+    if not _is_row_id(row_id) or not (_is_row_id(value) if sort_field == 'id' else isinstance(value, str)):
+        raise InvalidCursor('Invalid cursor')
+    return value, row_id
+
+
+def keyset_page(query, sort_column, id_column, direction, per_page, after=None):
+    """
+    Fetch one page of a query using keyset pagination.
+    Orders by (sort_column, id_column) in the given direction and, when `after` is given, seeks past it.
+    One extra row is fetched to find out whether another page exists, so no COUNT(*) is needed.
+    Args:
+        query: SQLAlchemy query to paginate (filters already applied)
+        sort_column: Column to sort on
+        id_column: Primary key column used as a tiebreaker
+        direction: 'asc' or 'desc'
+        per_page: Number of rows per page
+        after: Optional (sort value, id) tuple decoded from a cursor
+    Returns:
+        Tuple of (rows on this page, whether more rows follow)
+    """
+    if sort_column is id_column:
+        columns = [id_column]
+        key, bound = id_column, (after[1] if after else None)
+    else:
+        columns = [sort_column, id_column]
+        key, bound = tuple_(sort_column, id_column), (tuple_(*after) if after else None)
+    if after:
+        # Row-value comparison lets the database seek on a (sort_column, id) index
+        query = query.filter(key < bound if direction == 'desc' else key > bound)
+    if direction == 'desc':
+        query = query.order_by(*[column.desc() for column in columns])
+    else:
+        query = query.order_by(*[column.asc() for column in columns])
+    rows = query.limit(per_page + 1).all()
+    return rows[:per_page], len(rows) > per_page
@@ -0,0 +1,122 @@
+"""
+passwords.py
+Password hashing and verification on a bounded process pool.
+
+Werkzeug's password hashes are deliberately slow key-derivation functions. Running them inline lets a burst of
+logins occupy every request worker and CPU core, starving cheap requests such as GET /employees. Hash jobs are
+sent to a small process pool instead; at most `max_pending` jobs may be queued or running at once, which caps the
+CPU that authentication can take from the rest of the service.
+
+The hash method (and with it the cost) is configurable. Stored hashes made with different parameters are detected
+by `needs_rehash` so they can be upgraded transparently on the next successful login.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from functools import lru_cache
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Raised when too many hash jobs are already queued, or a job did not finish within the timeout."""
+
+
+@lru_cache(maxsize=None)
+def method_prefix(method):
+    """
+    Full parameter prefix Werkzeug writes for a hash method, e.g. 'scrypt' -> 'scrypt:32768:8:1'.
+    Args:
+        method: Method string accepted by generate_password_hash
+    Returns:
+        The part of a stored hash before the first '$'
+    """
+    return generate_password_hash('', method=method, salt_length=1).split('$', 1)[0]
+
+
+class PasswordHasher:
+    """Hashes and checks passwords in worker processes, bounded by a semaphore."""
+
+    def __init__(self, method='scrypt', workers=2, max_pending=32, timeout=30):
+        self.method = method
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Take the method, pool size, queue bound and timeout from the PASSWORD_HASH_* app config."""
+        self.method = app.config['PASSWORD_HASH_METHOD']
+        self.workers = app.config['PASSWORD_HASH_WORKERS']
+        self._slots = threading.BoundedSemaphore(app.config['PASSWORD_HASH_MAX_PENDING'])
+        self.timeout = app.config['PASSWORD_HASH_TIMEOUT']
+
+    def _get_executor(self):
+        # Created lazily and re-created after a fork, so every server worker process owns its own pool
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PasswordHasherBusy('Too many password hash operations in progress')
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is held until the job is done, not until we stop waiting for it, so jobs that outlive the
+        # timeout still count against max_pending
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            future.cancel()  # Drops the job if it has not started yet
+            raise PasswordHasherBusy('Password hash operation timed out') from None
+
+    def hash(self, password):
+        """
+        Hash a password with the configured method.
+        Args:
+            password: Plain text password
+        Returns:
+            Werkzeug password hash string
+        """
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        """
+        Check a password against a stored hash.
+        Args:
+            pwhash: Stored hash
+            password: Plain text password
+        Returns:
+            True if the password matches
+        """
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """
+        Check whether a stored hash was made with different parameters than the configured method.
+        Args:
+            pwhash: Stored hash
+        Returns:
+            True if the hash should be regenerated
+        """
+        return pwhash.split('$', 1)[0] != method_prefix(self.method)
+
+    def shutdown(self):
+        """Stop the worker processes, if any were started."""
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
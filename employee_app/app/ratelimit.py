@@ -0,0 +1,183 @@
+"""
+ratelimit.py
+Token bucket rate limits for the authentication endpoints, per client IP and per email.
+
+The `@rate_limited('login')` decorator in app.py calls `RateLimiter.check()` before the view runs, taking a token
+from each bucket configured for the endpoint in RATE_LIMITS. A throttled request therefore costs a JSON parse and a
+dict lookup: no database query, no password hash, no email. It is answered with 429 and a Retry-After header.
+
+A bucket of `capacity` requests per `period` seconds allows a burst of `capacity` and then one request every
+period / capacity seconds. It is stored as a single number, the theoretical arrival time of the next request
+(the GCRA form of a token bucket), which refills continuously, like a sliding window, without a log of past hits.
+
+Backends (RATE_LIMIT_BACKEND):
+- memory: buckets in this process, bounded by RATE_LIMIT_MAX_KEYS (least recently used keys are dropped first);
+  each gunicorn worker then enforces the limits on its own share of the traffic;
+- redis: buckets shared by all workers and servers, updated atomically by a Lua script; needs the `redis` package.
+  If Redis is unreachable requests are let through, so an outage of the limiter is not an outage of login.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from flask import request
+
+
+def gcra(tat, now, capacity, period):
+    """
+    One request against a token bucket.
+    Args:
+        tat: Stored theoretical arrival time of the bucket (None for a full bucket)
+        now: Current time in seconds
+        capacity: Requests allowed in a burst
+        period: Seconds to refill the whole bucket
+    Returns:
+        Tuple of (new tat to store, or None if rejected; seconds until a request would be allowed)
+    """
+    interval = period / capacity
+    new_tat = max(tat or now, now) + interval
+    allow_at = new_tat - period
+    if allow_at > now:
+        return None, allow_at - now
+    return new_tat, 0.0
+
+
+class MemoryBackend:
+    """Buckets in this process, bounded LRU."""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> tat
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, period):
+        """
+        Take one token from a bucket.
+        Returns:
+            0.0 if allowed, else seconds until the next token
+        """
+        now = time.monotonic()
+        with self._lock:
+            new_tat, retry_after = gcra(self._buckets.get(key), now, capacity, period)
+            if new_tat is not None:
+                self._buckets[key] = new_tat
+                self._buckets.move_to_end(key)
+                while len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            return retry_after
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+# Same steps as gcra(), using the Redis server's clock so all workers agree on the time
+GCRA_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local interval = period / capacity
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+local new_tat = math.max(tat, now) + interval
+local allow_at = new_tat - period
+if allow_at > now then
+    return tostring(allow_at - now)
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return '0'
+"""
+
+
+class RedisBackend:
+    """Buckets in Redis (or any server speaking its protocol), shared by all workers; needs the `redis` package."""
+
+    def __init__(self, url=None, client=None, prefix='employee-ratelimit:'):
+        if client is None:
+            import redis  # Optional dependency, only needed for this backend
+            client = redis.Redis.from_url(url, socket_timeout=0.1)
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(GCRA_SCRIPT)
+
+    def take(self, key, capacity, period):
+        try:
+            return float(self._script(keys=[self.prefix + key], args=[capacity, period]))
+        except Exception as e:  # Fail open: throttling must not take login down with it
+            logging.warning(f"Rate limiter unavailable, allowing request: {e}")
+            return 0.0
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=f'{self.prefix}*'))
+        if keys:
+            self.client.delete(*keys)
+
+
+class RateLimiter:
+    """Per-endpoint rate limits with rejection counters; configure with init_app."""
+
+    def __init__(self):
+        self.backend = None
+        self.limits = {}
+        self.trusted_proxies = 0
+        self.rejected = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Pick the backend from RATE_LIMIT_BACKEND ('memory' or 'redis') unless RATE_LIMIT_ENABLED is False.
+        Args:
+            app: Flask app
+        """
+        if not app.config['RATE_LIMIT_ENABLED']:
+            self.backend = None
+        elif app.config['RATE_LIMIT_BACKEND'] == 'redis':
+            self.backend = RedisBackend(app.config['RATE_LIMIT_REDIS_URL'])
+        else:
+            self.backend = MemoryBackend(app.config['RATE_LIMIT_MAX_KEYS'])
+        self.limits = app.config['RATE_LIMITS']
+        self.trusted_proxies = app.config['RATE_LIMIT_TRUSTED_PROXIES']
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    def client_ip(self):
+        """
+        Address of the client: the peer address, or with RATE_LIMIT_TRUSTED_PROXIES = n, the address the n-th
+        proxy from the end of X-Forwarded-For saw (entries further left are chosen by the client and not trusted).
+        """
+        if self.trusted_proxies:
+            hops = [hop.strip() for hop in request.headers.get('X-Forwarded-For', '').split(',') if hop.strip()]
+            if len(hops) >= self.trusted_proxies:
+                return hops[-self.trusted_proxies]
+        return request.remote_addr or 'unknown'
+
+    def check(self, endpoint):
+        """
+        Take a token from each bucket configured for an endpoint and the current request.
+        Args:
+            endpoint: Key in RATE_LIMITS
+        Returns:
+            0.0 if the request may proceed, else seconds until it would be allowed
+        """
+        subjects = {'ip': self.client_ip()}
+        data = request.get_json(silent=True)
+        email = data.get('email') if isinstance(data, dict) else None
+        if isinstance(email, str) and email.strip():
+            subjects['email'] = email.strip().lower()
+        retry_after = 0.0
+        for subject, (capacity, period) in self.limits.get(endpoint, {}).items():
+            if subject in subjects:
+                retry_after = self.backend.take(f'{endpoint}:{subject}:{subjects[subject]}', capacity, period)
+                if retry_after:
+                    break  # Do not drain the remaining buckets for a request that is refused anyway
+        if retry_after:
+            with self._lock:
+                self.rejected[endpoint] = self.rejected.get(endpoint, 0) + 1
+        return retry_after
+
+    def stats(self):
+        with self._lock:
+            return {'enabled': self.enabled, 'rejected': dict(self.rejected)}
+
@@ -0,0 +1,88 @@
+"""
+reset_tokens.py
+Issuing, redeeming and purging password reset tokens.
+
+The emailed token is random; the table stores only its SHA-256 digest (fixed 64 characters, unique index), so a
+reset is a single indexed lookup that also checks `used` and `expires_at` in SQL.
+
+Redeemed and expired tokens can never be used again. `purge_reset_tokens()` (CLI: `flask purge-reset-tokens`)
+deletes them in batches of `batch_size` rows, each in its own short transaction, so it never holds the write lock
+for long and can run from cron while the app serves. Each batch selects its ids through one of the two partial
+indexes on the table, so finding the next batch does not scan live tokens or rows already deleted.
+"""
+import secrets
+import time
+from datetime import timedelta
+from sqlalchemy import delete, false, select, true
+from employee_app.app.models.db import db
+from employee_app.app.models.outbox import utcnow
+from employee_app.app.models.reset_token import PasswordResetToken, hash_token
+
+TOKEN_LIFETIME = timedelta(hours=1)
+
+
+def issue_reset_token(user_id):
+    """
+    Create a reset token for a user. The caller commits it with the rest of its transaction.
+    Args:
+        user_id: Id of the user
+    Returns:
+        The token to send to the user (never stored)
+    """
+    token = secrets.token_urlsafe(32)
+    db.session.add(PasswordResetToken(user_id=user_id, token_hash=hash_token(token), expires_at=utcnow() + TOKEN_LIFETIME))
+    return token
+
+
+def find_valid_token(token):
+    """
+    Look up an unused, unexpired reset token.
+    Args:
+        token: Token as sent to the user
+    Returns:
+        PasswordResetToken or None
+    """
+    return db.session.execute(
+        select(PasswordResetToken).where(
+            PasswordResetToken.token_hash == hash_token(token),
+            PasswordResetToken.used == false(),
+            PasswordResetToken.expires_at > utcnow(),
+        )
+    ).scalar_one_or_none()
+
+
+def purge_reset_tokens(batch_size=1000, max_batches=None, pause=0.0, now=None):
+    """
+    Delete expired and used reset tokens in bounded batches. Must run inside an app context.
+    Args:
+        batch_size: Rows deleted per transaction
+        max_batches: Stop after this many non-empty batches (None: until nothing is left)
+        pause: Seconds to sleep between batches, to leave room for other writers
+        now: Expiry cutoff (defaults to the current UTC time)
+    Returns:
+        Dict with the number of 'expired' and 'used' tokens deleted and the number of non-empty 'batches'
+    """
+    now = now or utcnow()
+    # Each condition matches the WHERE clause of a partial index, so the planner can use it
+    passes = [
+        ('expired', (PasswordResetToken.used == false(), PasswordResetToken.expires_at < now)),
+        ('used', (PasswordResetToken.used == true(),)),
+    ]
+    stats = {'expired': 0, 'used': 0, 'batches': 0}
+    for name, conditions in passes:
+        while max_batches is None or stats['batches'] < max_batches:
+            ids = select(PasswordResetToken.id).where(*conditions).limit(batch_size)
+            deleted = db.session.execute(
+                delete(PasswordResetToken).where(PasswordResetToken.id.in_(ids.scalar_subquery())),
+                execution_options={'synchronize_session': False},
+            ).rowcount
+            db.session.commit()
+            if not deleted:
+                break
+            stats[name] += deleted
+            stats['batches'] += 1
+            if deleted < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+    return stats
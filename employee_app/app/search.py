@@ -0,0 +1,122 @@
+"""
+search.py
+Indexed full-text search for the employee `search` parameter.
+
+On SQLite an FTS5 virtual table (`employee_fts`) mirrors the searchable columns of the `employee` table and is kept
+in sync by triggers, so inserts, updates and deletes from any code path (ORM or bulk SQL) are indexed. On PostgreSQL
+a GIN index over a `tsvector` expression serves the same purpose. Other engines fall back to the original
+`ilike('%term%')` filters. The index, table and triggers are created by migration 0006.
+
+Search terms are split into words and every word is matched as a prefix, so typing "ali smi" finds "Alice Smith".
+"""
+import re
+from flask import current_app
+from sqlalchemy import column, func, literal_column, table, text
+from employee_app.app.models.db import db
+from employee_app.app.models.models import Employee
+
+SEARCH_COLUMNS = ['name', 'email', 'department', 'phone']
+
+# Lightweight handle on the FTS5 table; `rank` is its built-in bm25 relevance column
+employee_fts = table('employee_fts', column('rowid'), column('rank'))
+
+
+def init_search(app):
+    """
+    Record which search backend the database supports. Run by the `init-db` command after migrations; the index
+    itself is created by migration 0006 (see migrations/search_index.py). Must run inside an app context.
+    Args:
+        app: Flask app
+    Returns:
+        Name of the search backend ('fts5', 'postgres' or 'ilike')
+    """
+    app.extensions.pop('employee_search', None)
+    return search_backend()
+
+
+def search_backend():
+    """
+    Backend used by the current app, detected on first use when `init_search` has not run in this process.
+    Returns:
+        'fts5', 'postgres' or 'ilike'
+    """
+    backend = current_app.extensions.get('employee_search')
+    if backend is None:
+        dialect = db.engine.dialect.name
+        backend = 'ilike'
+        if dialect == 'postgresql':
+            backend = 'postgres'
+        elif dialect == 'sqlite':
+            with db.engine.connect() as conn:
+                if conn.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'employee_fts'"
+                )).first():
+                    backend = 'fts5'
+        current_app.extensions['employee_search'] = backend
+    return backend
+
+
+def search_terms(search):
+    """
+    Split a search string into lowercase words.
+    Args:
+        search: Raw search string from the request
+    Returns:
+        List of words (letters, digits and underscores only)
+    """
+    return re.findall(r'\w+', search.lower())
+
+
+def _pg_document():
+    # Must match POSTGRES_DOCUMENT in migrations/search_index.py so the planner can use ix_employee_search
+    separator = literal_column("' '")
+    document = Employee.name.op('||')(separator).op('||')(Employee.email).op('||')(separator) \
+        .op('||')(Employee.department).op('||')(separator).op('||')(Employee.phone)
+    return func.to_tsvector(literal_column("'simple'"), document)
+
+
+def apply_search(query, search):
+    """
+    Filter an employee query by a search string using the configured backend.
+    Args:
+        query: Employee query (ORM query or select over Employee columns)
+        search: Raw search string
+    Returns:
+        Filtered query
+    """
+    backend = search_backend()
+    terms = search_terms(search)
+    if backend == 'fts5' and terms:
+        match = ' '.join(f'"{term}"*' for term in terms)
+        return query.join(employee_fts, employee_fts.c.rowid == Employee.id).filter(
+            text('employee_fts MATCH :match').bindparams(match=match)
+        )
+    if backend == 'postgres' and terms:
+        tsquery = func.to_tsquery(literal_column("'simple'"), ' & '.join(f'{term}:*' for term in terms))
+        return query.filter(_pg_document().op('@@')(tsquery))
+    search_pattern = f"%{search}%"
+    return query.filter(
+        Employee.name.ilike(search_pattern) |
+        Employee.email.ilike(search_pattern) |
+        Employee.department.ilike(search_pattern) |
+        Employee.phone.ilike(search_pattern)
+    )
+
+
+def order_by_relevance(query, search):
+    """
+    Order a query filtered by `apply_search` with the best matches first.
+    Args:
+        query: Query returned by `apply_search`
+        search: The same search string
+    Returns:
+        Ordered query (unchanged order for the ilike fallback)
+    """
+    backend = search_backend()
+    terms = search_terms(search)
+    if backend == 'fts5' and terms:
+        return query.order_by(employee_fts.c.rank, Employee.id)
+    if backend == 'postgres' and terms:
+        tsquery = func.to_tsquery(literal_column("'simple'"), ' & '.join(f'{term}:*' for term in terms))
+        return query.order_by(func.ts_rank(_pg_document(), tsquery).desc(), Employee.id)
+    return query
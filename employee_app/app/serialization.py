@@ -0,0 +1,82 @@
+"""
+serialization.py
+Fast JSON for API responses.
+
+When orjson is installed, `init_json()` replaces Flask's stdlib-json provider with `OrjsonProvider`, which encodes
+straight to bytes in C: `jsonify()` and `request.get_json()` keep working everywhere, and responses skip the
+str -> bytes round trip. Without orjson (or with JSON_BACKEND='stdlib') Flask's default provider stays in place.
+
+Employee reads select plain column tuples (`employee_columns()`) rather than ORM entities, so no identity map,
+instance state or attribute instrumentation is involved between the database row and the JSON bytes.
+"""
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+from employee_app.app.models.models import Employee
+
+try:
+    import orjson  # Optional speedup
+except ImportError:
+    orjson = None
+
+JSON_BACKENDS = ['auto', 'orjson', 'stdlib']
+# Fields of an employee in API responses, in order
+EMPLOYEE_FIELDS = ['id', 'name', 'email', 'department', 'phone']
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, producing the same values as the default provider."""
+    mimetype = 'application/json'
+    # Dates are left to Flask's default handler, so they keep the HTTP date format clients already parse
+    option = orjson.OPT_PASSTHROUGH_DATETIME if orjson else 0
+
+    def dumps_bytes(self, obj):
+        """Serialize to UTF-8 bytes."""
+        return orjson.dumps(obj, default=DefaultJSONProvider.default, option=self.option)
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
+
+
+def init_json(app):
+    """
+    Install the JSON provider selected by JSON_BACKEND: 'orjson', 'stdlib', or 'auto' (orjson when installed).
+    Args:
+        app: Flask app
+    Returns:
+        Name of the provider in use
+    """
+    backend = app.config['JSON_BACKEND']
+    if backend not in JSON_BACKENDS:
+        raise ValueError(f"JSON_BACKEND must be one of: {', '.join(JSON_BACKENDS)}")
+    if backend == 'orjson' and orjson is None:
+        raise RuntimeError('JSON_BACKEND is orjson but the orjson package is not installed')
+    if backend != 'stdlib' and orjson is not None:
+        app.json = OrjsonProvider(app)
+        return 'orjson'
+    return 'stdlib'
+
+
+def employee_columns():
+    """
+    Columns selected for employee responses.
+    Returns:
+        List of Employee columns in EMPLOYEE_FIELDS order
+    """
+    return [getattr(Employee, field) for field in EMPLOYEE_FIELDS]
+
+
+def employee_dicts(rows):
+    """
+    Response dicts for rows selected with `employee_columns()`.
+    Args:
+        rows: Iterable of result rows
+    Returns:
+        List of dicts
+    """
+    return [dict(zip(EMPLOYEE_FIELDS, row)) for row in rows]
@@ -0,0 +1,98 @@
+"""
+token_cache.py
+Bounded LRU/TTL cache of verified JWT payloads.
+
+Clients send the same bearer token on every request, and verifying its HMAC signature each time is wasted work.
+Once a token has been verified, its payload is cached under an HMAC-SHA256 of the token keyed by the secret it was
+verified with (neither the raw token nor the secret is stored), so a payload verified by one app is never accepted
+by another app in the same process that uses a different JWT_SECRET_KEY. An entry expires after the cache TTL or at
+the token's own `exp` claim, whichever comes first, so a cached token is never accepted after it would have failed
+verification.
+"""
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenCache:
+    """Thread-safe LRU cache of verified token payloads with hit/miss counters."""
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # digest -> (payload, expires_at)
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Take the size and TTL from JWT_CACHE_SIZE and JWT_CACHE_TTL in the app config, and drop payloads cached for
+        a previously configured app.
+        Args:
+            app: Flask app
+        """
+        self.maxsize = app.config['JWT_CACHE_SIZE']
+        self.ttl = app.config['JWT_CACHE_TTL']
+        self.clear()
+
+    @staticmethod
+    def _key(token, secret):
+        return hmac.new(secret.encode('utf-8'), token.encode('utf-8'), hashlib.sha256).digest()
+
+    def get(self, token, secret=''):
+        """
+        Look up a verified payload.
+        Args:
+            token: Raw JWT string
+            secret: Key the token must have been verified with
+        Returns:
+            Copy of the cached payload, or None on a miss or if the entry has expired
+        """
+        key = self._key(token, secret)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(entry[0])
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, token, payload, secret=''):
+        """
+        Cache a payload that has just passed signature and expiry verification.
+        Args:
+            token: Raw JWT string
+            payload: Decoded claims
+            secret: Key the token was verified with
+        """
+        expires_at = time.time() + self.ttl
+        if 'exp' in payload:
+            expires_at = min(expires_at, float(payload['exp']))
+        key = self._key(token, secret)
+        with self._lock:
+            self._entries[key] = (dict(payload), expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Current cache statistics.
+        Returns:
+            Dict with hits, misses, size and maxsize
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries), 'maxsize': self.maxsize}
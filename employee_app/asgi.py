@@ -0,0 +1,19 @@
+"""
+asgi.py
+ASGI entry point: read endpoints on the event loop with an async database session (see app/asgi_app.py).
+
+Needs `aiosqlite` (or `asyncpg` for PostgreSQL), `greenlet` and an ASGI server. Create the schema once per deploy,
+then start one worker per core from the project root:
+    flask --app employee_app.wsgi init-db
+    uvicorn employee_app.asgi:app --workers 4
+"""
+from employee_app.app.app import create_app, mail, outbox_drain_options
+from employee_app.app.asgi_app import AsyncReadApp
+from employee_app.app.mailer import start_outbox_worker
+
+flask_app = create_app()
+app = AsyncReadApp(flask_app)
+
+# Each uvicorn worker imports this module, so each gets its own outbox sender (as with gunicorn's post_worker_init)
+if flask_app.config['MAIL_OUTBOX_WORKER']:
+    start_outbox_worker(flask_app, mail, flask_app.config['MAIL_OUTBOX_INTERVAL'], **outbox_drain_options(flask_app))
@@ -0,0 +1,5 @@
+"""
+Benchmark scripts for the Employee Directory backend.
+
+Run them from the project root, e.g. `python -m employee_app.benchmarks.bench_pagination`.
+"""
@@ -0,0 +1,144 @@
+"""
+bench_async_reads.py
+Concurrent reads per worker process: gunicorn's threaded worker versus the ASGI app with an async session.
+
+Both servers run one worker process against the same seeded SQLite file and are driven by `--connections`
+keep-alive clients requesting `--path`. SQLite answers in microseconds, so `--db-latency-ms` adds a wait before each
+statement to stand in for a database across the network: `time.sleep` on the synchronous engine (the thread is held,
+as it would be in a socket read) and `asyncio.sleep` on the async engine (the request is suspended).
+
+Rows:
+- sync, `--threads` threads: the gunicorn worker at its usual size, i.e. about the same memory as the async worker;
+- sync, one thread per connection: what the threaded model needs to keep every connection in flight;
+- async: one worker, one event loop thread.
+Each row reports throughput, latency and the resident memory of the server processes after the run.
+
+Usage:
+    python -m employee_app.benchmarks.bench_async_reads --connections 64 --db-latency-ms 5 --duration 10
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+from employee_app.benchmarks.bench_serving import load, wait_for_port
+from employee_app.benchmarks.common import use_temp_database, create_bench_app, seed_employees, auth_headers, summarize, report
+
+SETTINGS = {'MAIL_OUTBOX_WORKER': False, 'RESPONSE_CACHE_BACKEND': 'none'}
+
+
+def tree_rss_mb(pid):
+    """
+    Resident memory of a process and its children (gunicorn's master and worker).
+    Returns:
+        Megabytes, from /proc (0 where /proc is unavailable)
+    """
+    children = {}
+    for entry in os.listdir('/proc') if os.path.isdir('/proc') else []:
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    children.setdefault(int(f.read().rsplit(')', 1)[1].split()[1]), []).append(int(entry))
+            except OSError:
+                continue
+    total, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        pending.extend(children.get(current, []))
+        try:
+            with open(f'/proc/{current}/status') as f:
+                total += next(int(line.split()[1]) for line in f if line.startswith('VmRSS:'))
+        except (OSError, StopIteration):
+            continue
+    return round(total / 1024, 1)
+
+
+def serve(args):
+    """Run one server in this process (started by main() as a subprocess)."""
+    import asyncio
+    from sqlalchemy import event
+    from employee_app.app.app import create_app
+    from employee_app.app.config import get_config
+    from employee_app.app.models.db import db
+    app = create_app(type('BenchConfig', (get_config(),), SETTINGS))
+    latency = args.db_latency_ms / 1000
+    if args.serve == 'sync':
+        from gunicorn.app.base import BaseApplication
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, 'before_cursor_execute', lambda *_: time.sleep(latency))
+
+        class Server(BaseApplication):
+            def load_config(self):
+                for key, value in {'bind': f'127.0.0.1:{args.port}', 'workers': 1, 'threads': args.threads,
+                                   'worker_class': 'gthread', 'accesslog': None, 'loglevel': 'warning'}.items():
+                    self.cfg.set(key, value)
+
+            def load(self):
+                return app
+
+        Server().run()
+    else:
+        import uvicorn
+        from sqlalchemy.util import await_only
+        from employee_app.app.asgi_app import AsyncReadApp
+        asgi = AsyncReadApp(app)
+        asgi.start()
+        event.listen(asgi.engine.sync_engine, 'before_cursor_execute', lambda *_: await_only(asyncio.sleep(latency)))
+        uvicorn.run(asgi, host='127.0.0.1', port=args.port, log_level='warning', access_log=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--connections', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--threads', type=int, default=4, help='Threads of the memory-matched gunicorn worker')
+    parser.add_argument('--db-latency-ms', type=float, default=5)
+    parser.add_argument('--employees', type=int, default=10000)
+    parser.add_argument('--path', default='/employees/1')
+    parser.add_argument('--json', help='Write results to this JSON file')
+    parser.add_argument('--serve', choices=['sync', 'async'], help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, default=5058, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args)
+        return
+
+    path = use_temp_database()
+    app = create_bench_app(**SETTINGS)
+    with app.app_context():
+        seed_employees(args.employees)
+    headers = auth_headers(app)
+
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ, PYTHONPATH=root, DATABASE_URL=f'sqlite:///{path}')
+    runs = [('sync', args.threads), ('sync', args.connections), ('async', 1)]
+    results = []
+    for server, threads in runs:
+        command = [sys.executable, '-m', 'employee_app.benchmarks.bench_async_reads', '--serve', server,
+                   '--port', str(args.port), '--threads', str(threads), '--db-latency-ms', str(args.db_latency_ms)]
+        process = subprocess.Popen(command, cwd=root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                   start_new_session=True)
+        try:
+            wait_for_port(args.port)
+            load(args.port, args.path, headers, 2, 1)  # Warm up
+            completed, errors, latencies = load(args.port, args.path, headers, args.connections, args.duration)
+            rss = tree_rss_mb(process.pid)
+        finally:
+            os.killpg(process.pid, signal.SIGTERM)
+            process.wait()
+        results.append({
+            'server': 'gunicorn gthread' if server == 'sync' else 'uvicorn + async session',
+            'threads': threads,
+            'connections': args.connections,
+            'req_per_s': round(completed / args.duration, 1),
+            'errors': errors,
+            **summarize(latencies or [0]),
+            'rss_mb': rss,
+        })
+    report(f'GET {args.path}, {args.db_latency_ms} ms per statement, one worker', results, args.json)
+
+
+if __name__ == '__main__':
+    main()
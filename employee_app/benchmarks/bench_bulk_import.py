@@ -0,0 +1,60 @@
+"""
+bench_bulk_import.py
+Measure POST /employees/bulk throughput and peak Python memory for growing NDJSON uploads.
+
+The upload is written to a temporary file and streamed to the endpoint, so the only memory measured is what the
+import itself holds. Peak memory should stay roughly constant as the row count grows.
+
+Usage:
+    python -m employee_app.benchmarks.bench_bulk_import --sizes 10000,100000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from employee_app.benchmarks.common import use_temp_database, create_bench_app, employee_rows, auth_headers, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10000,100000', help='Comma-separated upload sizes (rows)')
+    parser.add_argument('--json', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    use_temp_database()
+    app = create_bench_app()
+
+    client = app.test_client()
+    headers = auth_headers(app)
+    results = []
+    start_row = 0
+    for size in (int(s) for s in args.sizes.split(',')):
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False) as f:
+            for row in employee_rows(size, start=start_row):
+                f.write(json.dumps(row) + '\n')
+            path = f.name
+        start_row += size
+        with open(path, 'rb') as upload:
+            tracemalloc.start()
+            started = time.perf_counter()
+            response = client.post('/employees/bulk', input_stream=upload, content_length=os.path.getsize(path),
+                                   content_type='application/x-ndjson', headers=headers)
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        os.unlink(path)
+        body = response.get_json()
+        results.append({
+            'rows': size,
+            'inserted': body['inserted'],
+            'seconds': round(elapsed, 2),
+            'rows_per_s': round(size / elapsed),
+            'peak_mem_mb': round(peak / 2 ** 20, 2),
+        })
+    report('POST /employees/bulk throughput and memory', results, args.json)
+
+
+if __name__ == '__main__':
+    main()
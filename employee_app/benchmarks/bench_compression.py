@@ -0,0 +1,69 @@
+"""
+bench_compression.py
+Throughput and bytes on the wire for identity, gzip and brotli responses.
+
+Requests a small page, a large page and a full export with each Accept-Encoding, and reports requests per second,
+response size and compression ratio. Run with `--levels` to compare gzip levels.
+
+Usage:
+    python -m employee_app.benchmarks.bench_compression --employees 20000 --repeat 50
+"""
+import argparse
+import time
+from employee_app.benchmarks.common import use_temp_database, create_bench_app, seed_employees, auth_headers, report
+
+URLS = [
+    ('page of 5', '/employees?per_page=5&sort=name&count=none'),
+    ('page of 1000', '/employees?per_page=1000&sort=name&count=none'),
+    ('export csv', '/employees/export'),
+]
+ENCODINGS = ['identity', 'gzip', 'br']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--employees', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--levels', default='6', help='Comma-separated gzip levels to try')
+    parser.add_argument('--json', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    from employee_app.app.compression import brotli
+    path = use_temp_database()
+    app = create_bench_app(SQLALCHEMY_DATABASE_URI=f'sqlite:///{path}', RESPONSE_CACHE_BACKEND='none',
+                           MAIL_OUTBOX_WORKER=False)
+    with app.app_context():
+        seed_employees(args.employees)
+    client = app.test_client()
+    headers = auth_headers(app)
+    results = []
+    for label, url in URLS:
+        # Exports are much larger; keep the run time comparable
+        repeat = max(1, args.repeat // 10) if 'export' in url else args.repeat
+        identity_size = None
+        for encoding in ENCODINGS:
+            if encoding == 'br' and brotli is None:
+                continue
+            for level in ([int(n) for n in args.levels.split(',')] if encoding == 'gzip' else [None]):
+                if level is not None:
+                    app.config['COMPRESS_LEVEL'] = level
+                request_headers = {**headers, 'Accept-Encoding': encoding}
+                client.get(url, headers=request_headers).get_data()  # Warm-up
+                size = 0
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    size = len(client.get(url, headers=request_headers).get_data())
+                elapsed = time.perf_counter() - start
+                identity_size = identity_size or size
+                results.append({
+                    'response': label,
+                    'encoding': encoding if level is None else f'gzip-{level}',
+                    'req_per_s': round(repeat / elapsed, 1),
+                    'kb_on_wire': round(size / 1024, 1),
+                    'ratio': round(identity_size / size, 1),
+                })
+    report('Response compression', results, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+bench_etag.py
+Polling workload with and without conditional GETs.
+
+Simulated clients poll a listing page and a few employee records; every `--change-every` polls one employee is
+updated. Plain clients refetch everything each time; conditional clients send the last ETag in If-None-Match and
+get 304 while nothing changed. Reports response bytes and server CPU time per poll (the response cache is off so
+every 200 is built from the database).
+
+Usage:
+    python -m employee_app.benchmarks.bench_etag --polls 5000 --change-every 50
+"""
+import argparse
+import random
+import time
+from employee_app.benchmarks.common import use_temp_database, create_bench_app, seed_employees, auth_headers, report
+
+POLLED_URLS = ['/employees?page=1&per_page=100&sort=name', '/employees/1', '/employees/2', '/employees/3']
+
+
+def run_polls(client, headers, polls, change_every, conditional):
+    """
+    Poll POLLED_URLS round-robin, updating employee 1..3 now and then.
+    Returns:
+        Dict with bytes, status counts, CPU and wall time
+    """
+    rng = random.Random(11)
+    etags = {}
+    transferred = 0
+    not_modified = 0
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    for n in range(polls):
+        if change_every and n % change_every == change_every - 1:
+            client.put(f'/employees/{rng.randrange(1, 4)}', json={'phone': str(rng.randrange(10 ** 9, 10 ** 10))},
+                       headers=headers)
+        url = POLLED_URLS[n % len(POLLED_URLS)]
+        request_headers = dict(headers)
+        if conditional and url in etags:
+            request_headers['If-None-Match'] = etags[url]
+        response = client.get(url, headers=request_headers)
+        body = response.get_data()
+        # Body plus headers, roughly what goes over the wire
+        transferred += len(body) + sum(len(k) + len(v) + 4 for k, v in response.headers.items())
+        if response.status_code == 304:
+            not_modified += 1
+        elif 'ETag' in response.headers:
+            etags[url] = response.headers['ETag']
+    return {
+        'bytes': transferred,
+        'not_modified': not_modified,
+        'cpu_s': time.process_time() - cpu_start,
+        'wall_s': time.perf_counter() - wall_start,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--polls', type=int, default=5000)
+    parser.add_argument('--change-every', type=int, default=50, help='Update one employee every N polls (0: never)')
+    parser.add_argument('--employees', type=int, default=10000)
+    parser.add_argument('--json', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    path = use_temp_database()
+    app = create_bench_app(SQLALCHEMY_DATABASE_URI=f'sqlite:///{path}', RESPONSE_CACHE_BACKEND='none',
+                           MAIL_OUTBOX_WORKER=False)
+    with app.app_context():
+        seed_employees(args.employees)
+    headers = auth_headers(app)
+    results = []
+    for conditional in (False, True):
+        outcome = run_polls(app.test_client(), headers, args.polls, args.change_every, conditional)
+        results.append({
+            'client': 'If-None-Match' if conditional else 'plain',
+            'polls': args.polls,
+            'not_modified': outcome['not_modified'],
+            'kb_total': round(outcome['bytes'] / 1024, 1),
+            'bytes_per_poll': round(outcome['bytes'] / args.polls),
+            'cpu_ms_per_poll': round(outcome['cpu_s'] * 1000 / args.polls, 3),
+            'wall_ms_per_poll': round(outcome['wall_s'] * 1000 / args.polls, 3),
+        })
+    report(f'Polling {len(POLLED_URLS)} URLs, one change every {args.change_every} polls', results, args.json)
+
+
+if __name__ == '__main__':
+    main()
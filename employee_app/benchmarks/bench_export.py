@@ -0,0 +1,59 @@
+"""
+bench_export.py
+Measure GET /employees/export throughput and peak Python memory as the directory grows.
+
+The streamed response is consumed chunk by chunk and discarded, like a client writing it to disk, so the peak
+memory reported is what the server side of the export holds. It should stay roughly constant up to a million rows.
+
+Usage:
+    python -m employee_app.benchmarks.bench_export --sizes 100000,1000000 --format csv
+"""
+import argparse
+import time
+import tracemalloc
+from employee_app.benchmarks.common import use_temp_database, create_bench_app, seed_employees, auth_headers, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='100000,1000000', help='Comma-separated directory sizes')
+    parser.add_argument('--format', default='csv', choices=['csv', 'ndjson'])
+    parser.add_argument('--json', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    use_temp_database()
+    app = create_bench_app()
+    from employee_app.app.models.models import Employee
+
+    client = app.test_client()
+    headers = auth_headers(app)
+    results = []
+    with app.app_context():
+        current = Employee.query.count()
+    for size in sorted(int(s) for s in args.sizes.split(',')):
+        with app.app_context():
+            seed_employees(size - current, start=current)
+            current = size
+        tracemalloc.start()
+        started = time.perf_counter()
+        response = client.get(f'/employees/export?format={args.format}', headers=headers, buffered=False)
+        total_bytes = 0
+        for chunk in response.response:
+            total_bytes += len(chunk)
+        response.close()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append({
+            'employees': size,
+            'format': args.format,
+            'seconds': round(elapsed, 2),
+            'rows_per_s': round(size / elapsed),
+            'mb_out': round(total_bytes / 2 ** 20, 1),
+            'peak_mem_mb': round(peak / 2 ** 20, 2),
+        })
+    report('GET /employees/export throughput and memory', results, args.json)
+
+
+if __name__ == '__main__':
+    main()
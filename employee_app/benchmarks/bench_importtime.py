@@ -0,0 +1,88 @@
+"""
+bench_importtime.py
+Import-time and cold-start cost of the application.
+
+Every run uses a fresh interpreter. The import of `employee_app.app.app` is profiled with `python -X importtime`,
+and a second child times each cold-start phase: import, create_app() and the first request (GET /employees against
+an initialized temporary database). Also lists the modules with the largest self import time.
+
+Usage:
+    python -m employee_app.benchmarks.bench_importtime --runs 10 --top 15
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from employee_app.benchmarks.common import use_temp_database, create_bench_app, auth_headers, summarize, report
+
+# Runs in the child interpreter; prints phase durations in seconds as JSON
+COLD_START = """
+import json, sys, time
+start = time.perf_counter()
+from employee_app.app.app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+response = app.test_client().get('/employees', headers=json.loads(sys.argv[1]))
+assert response.status_code == 200, response.status_code
+served = time.perf_counter()
+print(json.dumps({'import': imported - start, 'create_app': created - imported, 'first_request': served - created}))
+"""
+
+
+def parse_importtime(stderr):
+    """
+    Parse `-X importtime` output.
+    Args:
+        stderr: Text written by the interpreter
+    Returns:
+        Dict of module name -> (self microseconds, cumulative microseconds)
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--top', type=int, default=15, help='Slowest modules to list')
+    parser.add_argument('--json', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    use_temp_database()
+    headers = json.dumps(auth_headers(create_bench_app()))
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ, PYTHONPATH=root)
+
+    phases = {'import (-X importtime)': [], 'import': [], 'create_app': [], 'first_request': [], 'process total': []}
+    slowest = {}
+    for _ in range(args.runs):
+        profiled = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import employee_app.app.app'],
+                                  cwd=root, env=env, capture_output=True, text=True, check=True)
+        modules = parse_importtime(profiled.stderr)
+        phases['import (-X importtime)'].append(modules['employee_app.app.app'][1] / 1e6)
+        for name, (self_us, _) in modules.items():
+            slowest[name] = slowest.get(name, 0) + self_us
+        began = time.perf_counter()
+        cold = subprocess.run([sys.executable, '-c', COLD_START, headers],
+                              cwd=root, env=env, capture_output=True, text=True, check=True)
+        phases['process total'].append(time.perf_counter() - began)
+        for phase, seconds in json.loads(cold.stdout.strip().splitlines()[-1]).items():
+            phases[phase].append(seconds)
+
+    report(f'Cold start over {args.runs} fresh interpreters',
+           [{'phase': phase, **summarize(samples)} for phase, samples in phases.items()], args.json)
+    ranked = sorted(slowest.items(), key=lambda item: item[1], reverse=True)[:args.top]
+    report('Largest self import times',
+           [{'module': name, 'self_ms': round(total / args.runs / 1000, 2)} for name, total in ranked])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+bench_jwt_cache.py
+Microbenchmark of authentication overhead with the verified-token cache on and off.
+
+Times token verification on its own and a full authenticated GET /employees/<id> request, reusing one token the
+way a logged-in browser session does.
+
+Usage:
+    python -m employee_app.benchmarks.bench_jwt_cache --repeat 5000
+"""
+import argparse
+from employee_app.benchmarks.common import use_temp_database, create_bench_app, auth_headers, measure, summarize, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5000)
+    parser.add_argument('--json', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    use_temp_database()
+    import employee_app.app.app as app_module
+
+    app = create_bench_app()
+    client = app.test_client()
+    headers = auth_headers(app)
+    token = headers['Authorization'].split(' ')[1]
+    results = []
+    for enabled in (False, True):
+        app.config['JWT_CACHE_ENABLED'] = enabled
+        app_module.token_cache.clear()
+        with app.app_context():
+            verify = summarize(measure(lambda: app_module.verify_jwt(token), repeat=args.repeat))
+        request = summarize(measure(lambda: client.get('/employees/1', headers=headers), repeat=args.repeat // 5))
+        results.append({'cache': 'on' if enabled else 'off', 'check': 'verify_jwt', **verify})
+        results.append({'cache': 'on' if enabled else 'off', 'check': 'GET /employees/1', **request})
+    report('JWT verification overhead', results, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+bench_login_load.py
+Load test: GET /employees latency while concurrent logins are hashing passwords.
+
+Starts the app on a threaded local server, keeps `--login-threads` clients logging in continuously, and measures
+list-endpoint latency from a separate client. Runs once with hashing inline in the request threads and once with
+hashing on the process pool.
+
+Usage:
+    python -m employee_app.benchmarks.bench_login_load --login-threads 16 --requests 200
+"""
+import argparse
+import json
+import threading
+import time
+import urllib.request
+from employee_app.benchmarks.common import use_temp_database, create_bench_app, auth_headers, summarize, report
+
+
+def post_json(url, body):
+    request = urllib.request.Request(url, data=json.dumps(body).encode(), headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.read()
+    except urllib.error.HTTPError as e:
+        return e.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--login-threads', type=int, default=16)
+    parser.add_argument('--pool-workers', type=int, default=2, help='Process pool size for the pooled run')
+    parser.add_argument('--requests', type=int, default=200, help='List requests timed per run')
+    parser.add_argument('--json', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    use_temp_database()
+    from werkzeug.serving import make_server
+    import employee_app.app.app as app_module
+
+    app = create_bench_app()
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_port}'
+    credentials = {'name': 'Load Test', 'email': 'loadtest@example.com', 'password': 'loadtest123'}
+    post_json(f'{base}/register', credentials)
+    headers = auth_headers(app)
+
+    results = []
+    for mode, workers in (('inline', 0), ('process pool', args.pool_workers)):
+        app_module.password_hasher.workers = workers
+        stop = threading.Event()
+        logins = [0]
+
+        def login_loop():
+            while not stop.is_set():
+                post_json(f'{base}/login', {'email': credentials['email'], 'password': credentials['password']})
+                logins[0] += 1
+
+        threads = [threading.Thread(target=login_loop, daemon=True) for _ in range(args.login_threads)]
+        for thread in threads:
+            thread.start()
+        time.sleep(1)  # Let the login burst build up
+        samples = []
+        started = time.perf_counter()
+        for _ in range(args.requests):
+            begin = time.perf_counter()
+            with urllib.request.urlopen(urllib.request.Request(f'{base}/employees', headers=headers)) as response:
+                response.read()
+            samples.append(time.perf_counter() - begin)
+        elapsed = time.perf_counter() - started
+        stop.set()
+        for thread in threads:
+            thread.join()
+        results.append({'hashing': mode, 'logins_per_s': round(logins[0] / (elapsed + 1), 1), **summarize(samples)})
+    server.shutdown()
+    app_module.password_hasher.shutdown()
+    report(f'GET /employees latency under {args.login_threads} concurrent login clients', results, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+bench_metrics.py
+Overhead of the request metrics (metrics.py) on typical requests.
+
+Builds two apps on the same database, one with METRICS_ENABLED and one without, and times the same requests on
+both in alternating rounds so machine noise hits both sides alike. Reports p50 latency over all rounds, the best
+per-round p50 of each side and the overhead between those in percent, plus the time to render /metrics.
+The overhead should stay within a few percent; an A/A run varies by about as much, so compare several runs.
+
+Usage:
+    python -m employee_app.benchmarks.bench_metrics --employees 20000 --repeat 200 --rounds 10
+"""
+import argparse
+from employee_app.benchmarks.common import use_temp_database, create_bench_app, seed_employees, auth_headers, measure, summarize, report
+
+URLS = [
+    ('get one', '/employees/{emp_id}'),
+    ('page of 20', '/employees?per_page=20&sort=name&count=none'),
+    ('search', '/employees?search=ali&per_page=20&count=none'),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--employees', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=200, help='Requests per URL per round')
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--json', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    path = use_temp_database()
+    settings = dict(SQLALCHEMY_DATABASE_URI=f'sqlite:///{path}', RESPONSE_CACHE_BACKEND='none',
+                    MAIL_OUTBOX_WORKER=False, COMPRESS_ENABLED=False)
+    apps = {
+        'off': create_bench_app(METRICS_ENABLED=False, **settings),
+        'on': create_bench_app(METRICS_ENABLED=True, **settings),
+    }
+    with apps['off'].app_context():
+        seed_employees(args.employees)
+    headers = auth_headers(apps['on'])
+    clients = {name: app.test_client() for name, app in apps.items()}
+    samples = {(label, name): [] for label, _ in URLS for name in apps}
+    best = {key: float('inf') for key in samples}  # Lowest per-round median: the run least disturbed by noise
+    for n in range(args.rounds):
+        for label, url in URLS:
+            url = url.format(emp_id=args.employees // 2)
+            # Swap which app goes first every round
+            for name in (['off', 'on'] if n % 2 == 0 else ['on', 'off']):
+                client = clients[name]
+                round_samples = measure(lambda: client.get(url, headers=headers), repeat=args.repeat)
+                samples[(label, name)] += round_samples
+                best[(label, name)] = min(best[(label, name)], summarize(round_samples)['p50_ms'])
+    results = []
+    for label, _ in URLS:
+        off, on = summarize(samples[(label, 'off')]), summarize(samples[(label, 'on')])
+        results.append({
+            'request': label,
+            'off_p50_ms': off['p50_ms'],
+            'on_p50_ms': on['p50_ms'],
+            'off_best_ms': best[(label, 'off')],
+            'on_best_ms': best[(label, 'on')],
+            'overhead_pct': round((best[(label, 'on')] / best[(label, 'off')] - 1) * 100, 1),
+        })
+    render = summarize(measure(lambda: clients['on'].get('/metrics').get_data(), repeat=50))
+    results.append({'request': 'render /metrics', 'on_p50_ms': render['p50_ms']})
+    report('Request metrics overhead', results, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+"""
+bench_mixed_workload.py
+Locust-style mixed workload: virtual users running a weighted mix of reads, writes and logins against a server.
+
+Each virtual user logs in as one of the generated users (see generate.py) and then loops: pick a task by weight
+(TASK_WEIGHTS), send it over its own keep-alive connection, wait `--think-ms`. Employees a user creates are the ones
+it later deletes, so the directory keeps its size. Results are reported per task (requests, errors, latency) plus a
+total row, so runs on different commits can be diffed from their `--json` files.
+
+By default the script seeds a temporary database with `--employees` employees and `--users` users and starts gunicorn
+on it (rate limiting off, so logins are not throttled). With `--host`/`--port` it drives a running server instead,
+which must have been seeded by generate.py with at least `--employees` and `--users` rows. The same scenario runs
+under locust with locustfile.py.
+
+Usage:
+    python -m employee_app.benchmarks.bench_mixed_workload --employees 100000 --users 200 --clients 32 --duration 30
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import threading
+import time
+from employee_app.benchmarks.bench_serving import wait_for_port
+from employee_app.benchmarks.common import DEPARTMENTS, FIRST_NAMES, summarize, report
+from employee_app.benchmarks.generate import BENCH_PASSWORD, user_email
+
+# Relative frequency of each task; mostly reads, as in the directory's real traffic
+TASK_WEIGHTS = {
+    'list': 35,
+    'get': 25,
+    'search': 15,
+    'department': 5,
+    'create': 6,
+    'update': 6,
+    'delete': 5,
+    'login': 3,
+}
+
+
+class Scenario:
+    """Request builder for one virtual user."""
+
+    def __init__(self, rng, employees, users, user_index):
+        self.rng = rng
+        self.employees = employees
+        self.email = user_email(user_index % users)
+        self.prefix = f'load{user_index}-{rng.randrange(10 ** 9)}'
+        self.created = []
+        self.counter = 0
+        self.token = None
+
+    def pick(self):
+        """Name of the next task, chosen by TASK_WEIGHTS."""
+        return self.rng.choices(list(TASK_WEIGHTS), weights=list(TASK_WEIGHTS.values()))[0]
+
+    @property
+    def headers(self):
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        return headers
+
+    def request(self, task):
+        """
+        Build the request for a task.
+        Args:
+            task: Key of TASK_WEIGHTS
+        Returns:
+            Tuple of (method, path, JSON body or None)
+        """
+        if task == 'login':
+            return 'POST', '/login', {'email': self.email, 'password': BENCH_PASSWORD}
+        if task == 'list':
+            return 'GET', f'/employees?page={self.rng.randint(1, 50)}&per_page=20', None
+        if task == 'search':
+            return 'GET', f'/employees?search={self.rng.choice(FIRST_NAMES)[:3].lower()}&per_page=20', None
+        if task == 'department':
+            return 'GET', f'/employees?department={self.rng.choice(DEPARTMENTS)}&sort=name&per_page=20', None
+        if task == 'create':
+            self.counter += 1
+            return 'POST', '/employees', {
+                'name': f'Load Test {self.counter}', 'email': f'{self.prefix}-{self.counter}@load.example.com',
+                'department': self.rng.choice(DEPARTMENTS), 'phone': '5550001111'}
+        if task == 'update':
+            phone = f'{self.rng.randrange(10 ** 9, 10 ** 10)}'
+            return 'PUT', f'/employees/{self.rng.randint(1, self.employees)}', {'phone': phone}
+        if task == 'delete' and self.created:
+            return 'DELETE', f'/employees/{self.created.pop()}', None
+        return 'GET', f'/employees/{self.rng.randint(1, self.employees)}', None
+
+    def record(self, task, body):
+        """Keep the state later requests need from a successful response: the login token and created ids."""
+        if task == 'login':
+            self.token = body.get('token')
+        elif task == 'create' and 'id' in body:
+            self.created.append(body['id'])
+
+
+def run_user(host, port, scenario, deadline, think, samples, lock):
+    """Drive one virtual user until the deadline, appending (task, seconds, ok) to `samples`."""
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    local = []
+    while time.perf_counter() < deadline:
+        task = scenario.pick() if scenario.token else 'login'
+        method, path, payload = scenario.request(task)
+        start = time.perf_counter()
+        try:
+            body = json.dumps(payload) if payload is not None else None
+            conn.request(method, path, body=body, headers=scenario.headers)
+            response = conn.getresponse()
+            data = response.read()
+            elapsed = time.perf_counter() - start
+            ok = response.status < 400
+            if ok and task in ('login', 'create'):
+                scenario.record(task, json.loads(data))
+        except Exception:
+            elapsed, ok = time.perf_counter() - start, False
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+        local.append((task, elapsed, ok))
+        if think:
+            time.sleep(scenario.rng.uniform(0, 2 * think))
+    with lock:
+        samples.extend(local)
+
+
+def summarize_tasks(samples, duration):
+    """
+    Per-task and total rows for report().
+    Args:
+        samples: List of (task, seconds, ok)
+        duration: Length of the run in seconds
+    """
+    rows = []
+    for task in list(TASK_WEIGHTS) + ['total']:
+        selected = [(elapsed, ok) for name, elapsed, ok in samples if task in ('total', name)]
+        if not selected:
+            continue
+        rows.append({
+            'task': task,
+            'requests': len(selected),
+            'errors': sum(1 for _, ok in selected if not ok),
+            'req_per_s': round(len(selected) / duration, 1),
+            **summarize([elapsed for elapsed, _ in selected]),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--employees', type=int, default=100000)
+    parser.add_argument('--users', type=int, default=200, help='Generated login users')
+    parser.add_argument('--clients', type=int, default=32, help='Concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--think-ms', type=float, default=0, help='Mean wait between requests of one user')
+    parser.add_argument('--workers', type=int, default=2, help='Gunicorn worker processes')
+    parser.add_argument('--threads', type=int, default=4, help='Gunicorn threads per worker')
+    parser.add_argument('--host', help='Drive a running server instead of starting one')
+    parser.add_argument('--port', type=int, default=5059)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    process = None
+    host = args.host or '127.0.0.1'
+    if not args.host:
+        from employee_app.benchmarks.common import use_temp_database, create_bench_app
+        from employee_app.benchmarks.generate import seed_directory
+        use_temp_database()
+        app = create_bench_app(MAIL_OUTBOX_WORKER=False)
+        with app.app_context():
+            print(f'Seeded {seed_directory(args.employees, args.users)}')
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        env = dict(os.environ, PYTHONPATH=root, MAIL_OUTBOX_WORKER='False', GUNICORN_ACCESS_LOG='', RATE_LIMIT_ENABLED='False')
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'employee_app/gunicorn.conf.py', '--bind', f'{host}:{args.port}',
+             '--workers', str(args.workers), '--threads', str(args.threads), 'employee_app.wsgi:app'],
+            cwd=root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+    try:
+        if process:
+            wait_for_port(args.port)
+        samples, lock = [], threading.Lock()
+        deadline = time.perf_counter() + args.duration
+        threads = [
+            threading.Thread(target=run_user, args=(
+                host, args.port, Scenario(random.Random(args.seed + n), args.employees, args.users, n),
+                deadline, args.think_ms / 1000, samples, lock))
+            for n in range(args.clients)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        if process:
+            os.killpg(process.pid, signal.SIGTERM)
+            process.wait()
+    report(f'Mixed workload, {args.clients} users, {args.employees} employees', summarize_tasks(samples, args.duration), args.json)
+
+
+if __name__ == '__main__':
+    main()
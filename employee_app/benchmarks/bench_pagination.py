@@ -0,0 +1,57 @@
+"""
+bench_pagination.py
+Compare OFFSET pagination with cursor (keyset) pagination on GET /employees.
+
+Seeds a temporary SQLite database with enough rows to reach the deepest page, then times the same page fetched
+both ways. Offset latency grows with the page number; cursor latency should stay flat.
+
+Usage:
+    python -m employee_app.benchmarks.bench_pagination --pages 1,1000,10000 --per-page 5
+"""
+import argparse
+from employee_app.benchmarks.common import use_temp_database, create_bench_app, seed_employees, auth_headers, measure, summarize, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', default='1,1000,10000', help='Comma-separated page numbers to time')
+    parser.add_argument('--per-page', type=int, default=5)
+    parser.add_argument('--sort', default='id', choices=['id', 'name', 'email', 'department', 'phone'])
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--json', help='Write results to this JSON file')
+    args = parser.parse_args()
+    pages = [int(p) for p in args.pages.split(',')]
+
+    use_temp_database()
+    app = create_bench_app()
+    from employee_app.app.models.db import db
+    from employee_app.app.models.models import Employee
+    from employee_app.app.pagination import encode_cursor
+
+    rows_needed = max(pages) * args.per_page + args.per_page
+    with app.app_context():
+        seed_employees(rows_needed)
+        sort_column = getattr(Employee, args.sort)
+        cursors = {}
+        for page in pages:
+            if page == 1:
+                cursors[page] = ''
+                continue
+            # Last row of the previous page, as a client would have received it in next_cursor
+            last = Employee.query.order_by(sort_column, Employee.id).offset((page - 1) * args.per_page - 1).first()
+            cursors[page] = encode_cursor(args.sort, 'asc', getattr(last, args.sort), last.id)
+
+    client = app.test_client()
+    headers = auth_headers(app)
+    results = []
+    for page in pages:
+        offset_url = f"/employees?sort={args.sort}&per_page={args.per_page}&page={page}"
+        cursor_url = f"/employees?sort={args.sort}&per_page={args.per_page}&after={cursors[page]}"
+        for mode, url in (('offset', offset_url), ('cursor', cursor_url)):
+            samples = measure(lambda: client.get(url, headers=headers), repeat=args.repeat)
+            results.append({'mode': mode, 'page': page, 'rows': rows_needed, **summarize(samples)})
+    report('GET /employees pagination latency', results, args.json)
+
+
+if __name__ == '__main__':
+    main()
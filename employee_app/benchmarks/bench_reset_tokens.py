@@ -0,0 +1,106 @@
+"""
+bench_reset_tokens.py
+Reset token lookup and purge cost on a table with millions of historical tokens.
+
+Fills password_reset_tokens with `--tokens` rows, mostly expired, some used and `--live-ratio` still valid, then
+reports the latency of redeeming-style lookups (find_valid_token), the purge run batch by batch (time per batch is
+how long each transaction holds the write lock), the lookups again on the purged table, and the database file size
+before and after (after VACUUM).
+
+Usage:
+    python -m employee_app.benchmarks.bench_reset_tokens --tokens 10000000 --batch-size 1000
+"""
+import argparse
+import os
+import random
+import time
+from datetime import timedelta
+from employee_app.benchmarks.common import use_temp_database, create_bench_app, measure, summarize, report
+
+
+def seed_tokens(count, live_ratio, used_ratio, chunk_size=100000):
+    """
+    Bulk insert reset tokens for one user. Must run inside an app context.
+    Returns:
+        List of plain tokens that are still valid
+    """
+    from sqlalchemy import text
+    from employee_app.app.models.db import db
+    from employee_app.app.models.outbox import utcnow
+    from employee_app.app.models.reset_token import hash_token
+    db.session.execute(text("INSERT INTO user (id, name, email, password_hash) VALUES (1, 'Bench', 'bench@example.com', 'x')"))
+    db.session.commit()
+    rng = random.Random(42)
+    now = utcnow()
+    live = []
+    for offset in range(0, count, chunk_size):
+        rows = []
+        for n in range(offset, min(count, offset + chunk_size)):
+            token = f'bench-token-{n}'
+            roll = rng.random()
+            if roll < live_ratio:
+                live.append(token)
+                rows.append((1, hash_token(token), str(now + timedelta(minutes=30)), 0))
+            elif roll < live_ratio + used_ratio:
+                rows.append((1, hash_token(token), str(now + timedelta(minutes=30)), 1))
+            else:
+                rows.append((1, hash_token(token), str(now - timedelta(days=rng.randrange(1, 365))), 0))
+        db.session.connection().exec_driver_sql(
+            'INSERT INTO password_reset_tokens (user_id, token_hash, expires_at, used) VALUES (?, ?, ?, ?)', rows)
+        db.session.commit()
+    return live
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tokens', type=int, default=10000000)
+    parser.add_argument('--live-ratio', type=float, default=0.001)
+    parser.add_argument('--used-ratio', type=float, default=0.05)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--lookups', type=int, default=2000)
+    parser.add_argument('--json', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    path = use_temp_database()
+    app = create_bench_app(SQLALCHEMY_DATABASE_URI=f'sqlite:///{path}', MAIL_OUTBOX_WORKER=False)
+    from sqlalchemy import text
+    from employee_app.app.models.db import db
+    from employee_app.app.reset_tokens import find_valid_token, purge_reset_tokens
+    results = []
+    with app.app_context():
+        start = time.perf_counter()
+        live = seed_tokens(args.tokens, args.live_ratio, args.used_ratio)
+        print(f'Seeded {args.tokens} tokens in {time.perf_counter() - start:.1f}s')
+        size_before = os.path.getsize(path)
+        rng = random.Random(7)
+
+        def lookup():
+            assert find_valid_token(rng.choice(live)) is not None
+            db.session.rollback()
+
+        results.append({'step': f'lookup, {args.tokens} rows', **summarize(measure(lookup, repeat=args.lookups))})
+        batches, totals = [], {'expired': 0, 'used': 0}
+        start = time.perf_counter()
+        while True:
+            batch_start = time.perf_counter()
+            stats = purge_reset_tokens(args.batch_size, max_batches=1)
+            batches.append(time.perf_counter() - batch_start)
+            totals['expired'] += stats['expired']
+            totals['used'] += stats['used']
+            if stats['expired'] + stats['used'] == 0:
+                break
+        elapsed = time.perf_counter() - start
+        results.append({'step': f"purge {totals['expired']} expired + {totals['used']} used in {len(batches)} batches",
+                        **summarize(batches), 'total_s': round(elapsed, 1)})
+        remaining = db.session.execute(text('SELECT count(*) FROM password_reset_tokens')).scalar()
+        results.append({'step': f'lookup, {remaining} rows', **summarize(measure(lookup, repeat=args.lookups))})
+        db.session.remove()
+        with db.engine.connect() as connection:
+            connection.exec_driver_sql('VACUUM')
+        db.engine.dispose()
+    print(f'Database file: {size_before / 2 ** 20:.0f} MB before purge, {os.path.getsize(path) / 2 ** 20:.1f} MB after purge and VACUUM')
+    report('Reset token lookup and purge', results, args.json)
+
+
+if __name__ == '__main__':
+    main()
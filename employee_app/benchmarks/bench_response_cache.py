@@ -0,0 +1,94 @@
+"""
+bench_response_cache.py
+Read-heavy request mix with the response cache off and on.
+
+A seeded database serves `--requests` requests, `--write-ratio` of them PUT /employees/<id> and the rest split
+between GET /employees/<id> and GET /employees over a small set of popular pages and filters (skewed towards the
+first pages, as real traffic is). Reports latency per operation, throughput, and the cache's hit ratio and memory
+use for each backend.
+
+Usage:
+    python -m employee_app.benchmarks.bench_response_cache --requests 20000 --write-ratio 0.05
+"""
+import argparse
+import random
+import time
+from employee_app.benchmarks.common import (
+    DEPARTMENTS, use_temp_database, create_bench_app, seed_employees, auth_headers, summarize, report
+)
+
+BACKENDS = ['none', 'memory']
+
+
+def list_url(rng):
+    """A popular listing URL: mostly early pages, sometimes filtered or sorted."""
+    url = f'/employees?page={min(int(rng.expovariate(0.5)) + 1, 50)}&per_page=20'
+    if rng.random() < 0.3:
+        url += f'&department={rng.choice(DEPARTMENTS)}'
+    if rng.random() < 0.3:
+        url += '&sort=name'
+    return url
+
+
+def run_mix(client, headers, employees, requests, write_ratio, hot_ids):
+    """
+    Issue the request mix sequentially.
+    Returns:
+        Dict of operation -> latencies in seconds, and the elapsed wall time
+    """
+    rng = random.Random(7)
+    latencies = {'get': [], 'list': [], 'write': []}
+    started = time.perf_counter()
+    for _ in range(requests):
+        roll = rng.random()
+        start = time.perf_counter()
+        if roll < write_ratio:
+            operation = 'write'
+            client.put(f'/employees/{rng.randrange(1, employees + 1)}',
+                       json={'phone': str(rng.randrange(10 ** 9, 10 ** 10))}, headers=headers)
+        elif roll < (1 + write_ratio) / 2:
+            operation = 'get'
+            client.get(f'/employees/{rng.choice(hot_ids)}', headers=headers)
+        else:
+            operation = 'list'
+            client.get(list_url(rng), headers=headers)
+        latencies[operation].append(time.perf_counter() - start)
+    return latencies, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--write-ratio', type=float, default=0.05)
+    parser.add_argument('--employees', type=int, default=10000)
+    parser.add_argument('--hot', type=int, default=500, help='Number of distinct employees read by id')
+    parser.add_argument('--json', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    from employee_app.app.app import response_cache
+    results = []
+    for backend in BACKENDS:
+        path = use_temp_database()
+        app = create_bench_app(SQLALCHEMY_DATABASE_URI=f'sqlite:///{path}', RESPONSE_CACHE_BACKEND=backend,
+                               MAIL_OUTBOX_WORKER=False)
+        with app.app_context():
+            seed_employees(args.employees)
+        headers = auth_headers(app)
+        hot_ids = random.Random(3).sample(range(1, args.employees + 1), args.hot)
+        latencies, elapsed = run_mix(app.test_client(), headers, args.employees, args.requests, args.write_ratio, hot_ids)
+        stats = response_cache.stats()
+        for operation, samples in latencies.items():
+            results.append({
+                'cache': backend,
+                'operation': operation,
+                'requests': len(samples),
+                **summarize(samples or [0]),
+                'req_per_s': round(args.requests / elapsed, 1),
+                'hit_ratio': stats['hit_ratio'],
+                'cache_kb': round((stats.get('memory_bytes') or 0) / 1024, 1),
+            })
+    report(f'Response cache: {args.requests} requests, {args.write_ratio:.0%} writes', results, args.json)
+
+
+if __name__ == '__main__':
+    main()
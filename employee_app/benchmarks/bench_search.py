@@ -0,0 +1,52 @@
+"""
+bench_search.py
+Compare search latency of the indexed full-text path with the original ilike('%term%') path.
+
+Grows a temporary SQLite database through each requested size and times GET /employees?search=... with the
+search backend switched between 'fts5' and 'ilike'. Reports p50/p99 per size.
+
+Usage:
+    python -m employee_app.benchmarks.bench_search --sizes 10000,100000,1000000
+"""
+import argparse
+import itertools
+from employee_app.benchmarks.common import use_temp_database, create_bench_app, seed_employees, auth_headers, measure, summarize, report
+
+# Mix of what users type into the search box: partial names, departments, email fragments and phone prefixes
+SEARCH_TERMS = ['ali', 'smith', 'fin', 'george pat', 'employee123', 'bench.example', '555', 'oper', 'kim', 'julia r']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10000,100000,1000000', help='Comma-separated table sizes')
+    parser.add_argument('--repeat', type=int, default=100)
+    parser.add_argument('--json', help='Write results to this JSON file')
+    args = parser.parse_args()
+    sizes = sorted(int(s) for s in args.sizes.split(','))
+
+    use_temp_database()
+    app = create_bench_app()
+    from employee_app.app.models.db import db
+    from employee_app.app.models.models import Employee
+
+    client = app.test_client()
+    headers = auth_headers(app)
+    backend = app.extensions['employee_search']
+    results = []
+    with app.app_context():
+        current = Employee.query.count()
+    for size in sizes:
+        with app.app_context():
+            seed_employees(size - current, start=current)
+            current = size
+        for mode in (backend, 'ilike'):
+            app.extensions['employee_search'] = mode
+            terms = itertools.cycle(SEARCH_TERMS)
+            samples = measure(lambda: client.get(f"/employees?search={next(terms)}", headers=headers), repeat=args.repeat)
+            results.append({'backend': mode, 'employees': size, **summarize(samples)})
+        app.extensions['employee_search'] = backend
+    report('GET /employees?search= latency', results, args.json)
+
+
+if __name__ == '__main__':
+    main()
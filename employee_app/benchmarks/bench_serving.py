@@ -0,0 +1,119 @@
+"""
+bench_serving.py
+wrk-style throughput comparison of the Werkzeug dev server and gunicorn.
+
+Seeds a temporary SQLite database, starts each server as a subprocess against it, and drives GET /employees from
+`--connections` keep-alive clients for `--duration` seconds. Reports requests per second and latency percentiles.
+
+Usage:
+    python -m employee_app.benchmarks.bench_serving --connections 32 --duration 10 --workers 4 --threads 4
+"""
+import argparse
+import http.client
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from employee_app.benchmarks.common import use_temp_database, create_bench_app, seed_employees, auth_headers, summarize, report
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Server on port {port} did not start')
+
+
+def load(port, path, headers, connections, duration):
+    """
+    Hammer one URL from several keep-alive connections.
+    Returns:
+        Tuple of (completed requests, errors, list of latencies in seconds)
+    """
+    deadline = time.perf_counter() + duration
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+
+    def client():
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        local = []
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                conn.request('GET', path, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    raise RuntimeError(response.status)
+                local.append(time.perf_counter() - start)
+            except Exception:
+                with lock:
+                    errors[0] += 1
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(connections)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(latencies), errors[0], latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--connections', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--workers', type=int, default=4, help='Gunicorn worker processes')
+    parser.add_argument('--threads', type=int, default=4, help='Gunicorn threads per worker')
+    parser.add_argument('--employees', type=int, default=10000)
+    parser.add_argument('--path', default='/employees?per_page=20')
+    parser.add_argument('--json', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    use_temp_database()
+    app = create_bench_app()
+    with app.app_context():
+        seed_employees(args.employees)
+    headers = auth_headers(app)
+
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ, PYTHONPATH=root, MAIL_OUTBOX_WORKER='False', GUNICORN_ACCESS_LOG='')
+    servers = {
+        'dev server': ([sys.executable, '-m', 'employee_app.app.app'], 5000),
+        'gunicorn': ([sys.executable, '-m', 'gunicorn', '-c', 'employee_app/gunicorn.conf.py', '--bind', '127.0.0.1:5057',
+                      '--workers', str(args.workers), '--threads', str(args.threads), 'employee_app.wsgi:app'], 5057),
+    }
+    results = []
+    for name, (command, port) in servers.items():
+        # New session so the dev server's reloader child is stopped along with it
+        process = subprocess.Popen(command, cwd=root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                   start_new_session=True)
+        try:
+            wait_for_port(port)
+            load(port, args.path, headers, 2, 1)  # Warm up
+            completed, errors, latencies = load(port, args.path, headers, args.connections, args.duration)
+        finally:
+            os.killpg(process.pid, signal.SIGTERM)
+            process.wait()
+        results.append({
+            'server': name,
+            'connections': args.connections,
+            'req_per_s': round(completed / args.duration, 1),
+            'errors': errors,
+            **summarize(latencies or [0]),
+        })
+    report(f'GET {args.path} throughput', results, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+bench_sqlite_concurrency.py
+Mixed read/write concurrency against SQLite in WAL mode and in rollback-journal mode.
+
+For each mode a fresh database is seeded, then `--readers` threads page through GET /employees while `--writers`
+threads update random employees with PUT /employees/<id>, all for `--duration` seconds. Reports throughput, errors
+(e.g. "database is locked") and latency per operation, plus the worst pool checkout wait.
+
+Usage:
+    python -m employee_app.benchmarks.bench_sqlite_concurrency --readers 8 --writers 2 --duration 10
+"""
+import argparse
+import random
+import threading
+import time
+from employee_app.benchmarks.common import use_temp_database, create_bench_app, seed_employees, auth_headers, summarize, report
+
+# (journal_mode, synchronous) pairs: WAL with the setting it is designed for, and SQLite's historical defaults
+MODES = [('WAL', 'NORMAL'), ('DELETE', 'FULL')]
+
+
+def run_mixed(app, headers, employees, readers, writers, duration):
+    """
+    Run reader and writer threads against one app.
+    Returns:
+        Dict of operation -> (latencies in seconds, error count)
+    """
+    deadline = time.perf_counter() + duration
+    results = {'read': ([], [0]), 'write': ([], [0])}
+    lock = threading.Lock()
+
+    def worker(operation, seed):
+        rng = random.Random(seed)
+        client = app.test_client()
+        local, errors = [], 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            if operation == 'read':
+                response = client.get(f'/employees?page={rng.randrange(1, employees // 20)}&per_page=20', headers=headers)
+            else:
+                response = client.put(f'/employees/{rng.randrange(1, employees + 1)}',
+                                      json={'phone': str(rng.randrange(10 ** 9, 10 ** 10))}, headers=headers)
+            if response.status_code == 200:
+                local.append(time.perf_counter() - start)
+            else:
+                errors += 1
+        with lock:
+            results[operation][0].extend(local)
+            results[operation][1][0] += errors
+
+    threads = [threading.Thread(target=worker, args=('read', n)) for n in range(readers)]
+    threads += [threading.Thread(target=worker, args=('write', 1000 + n)) for n in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {operation: (latencies, errors[0]) for operation, (latencies, errors) in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--employees', type=int, default=10000)
+    parser.add_argument('--json', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    from employee_app.app.engine import pool_stats
+    results = []
+    for journal_mode, synchronous in MODES:
+        path = use_temp_database()
+        app = create_bench_app(SQLALCHEMY_DATABASE_URI=f'sqlite:///{path}', SQLITE_JOURNAL_MODE=journal_mode,
+                               SQLITE_SYNCHRONOUS=synchronous, MAIL_OUTBOX_WORKER=False)
+        with app.app_context():
+            seed_employees(args.employees)
+        headers = auth_headers(app)
+        outcome = run_mixed(app, headers, args.employees, args.readers, args.writers, args.duration)
+        with app.app_context():
+            wait_max = pool_stats()['default']['wait_max_ms']
+        for operation, (latencies, errors) in outcome.items():
+            results.append({
+                'journal': journal_mode,
+                'synchronous': synchronous,
+                'operation': operation,
+                'ops_per_s': round(len(latencies) / args.duration, 1),
+                'errors': errors,
+                **summarize(latencies or [0]),
+                'pool_wait_max_ms': wait_max,
+            })
+    report(f'{args.readers} readers + {args.writers} writers on SQLite', results, args.json)
+
+
+if __name__ == '__main__':
+    main()
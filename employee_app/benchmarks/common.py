@@ -0,0 +1,153 @@
+"""
+common.py
+Shared helpers for the Employee Directory benchmark scripts.
+
+The app config reads DATABASE_URL when it is imported, so scripts call `use_temp_database()` first and only then
+import anything from `employee_app.app`.
+"""
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from types import SimpleNamespace
+
+FIRST_NAMES = ['Alice', 'Bob', 'Charlie', 'Diana', 'Evan', 'Fatima', 'George', 'Hana', 'Ivan', 'Julia', 'Kenji', 'Laura']
+LAST_NAMES = ['Smith', 'Johnson', 'Lee', 'King', 'Wright', 'Garcia', 'Patel', 'Nguyen', 'Brown', 'Rossi', 'Kim', 'Silva']
+DEPARTMENTS = ['HR', 'IT', 'Finance', 'Marketing', 'Sales', 'Legal', 'Operations', 'Support']
+
+
+def use_temp_database():
+    """
+    Point DATABASE_URL at a fresh SQLite file in a temporary directory.
+    Returns:
+        Path of the database file
+    """
+    path = os.path.join(tempfile.mkdtemp(prefix='employee-bench-'), 'bench.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    return path
+
+
+def create_bench_app(**settings):
+    """
+    Build the app and create its schema in the temporary database.
+    Args:
+        settings: Config values to override, e.g. SQLITE_JOURNAL_MODE='DELETE'
+    Returns:
+        Flask app
+    """
+    from employee_app.app.app import create_app, init_db
+    from employee_app.app.config import get_config
+    app = create_app(type('BenchConfig', (get_config(),), settings) if settings else None)
+    with app.app_context():
+        init_db()
+    return app
+
+
+def employee_rows(count, start=0, seed=42):
+    """
+    Generate deterministic employee rows.
+    Args:
+        count: Number of rows
+        start: Index of the first row (keeps emails unique across calls)
+        seed: Random seed
+    Returns:
+        Generator of dicts ready for a bulk insert
+    """
+    rng = random.Random(seed + start)
+    for n in range(start, start + count):
+        yield {
+            'name': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            'email': f"employee{n}@bench.example.com",
+            'department': rng.choice(DEPARTMENTS),
+            'phone': f"{rng.randrange(10 ** 9, 10 ** 10)}",
+        }
+
+
+def seed_employees(count, start=0, chunk_size=10000):
+    """
+    Bulk insert `count` employees. Must run inside an app context.
+    Args:
+        count: Number of employees to insert
+        start: Index of the first generated row, for growing an already seeded table
+        chunk_size: Rows per executemany batch
+    """
+    from sqlalchemy import insert
+    from employee_app.app.models.db import db
+    from employee_app.app.models.models import Employee
+    for offset in range(0, count, chunk_size):
+        rows = employee_rows(min(chunk_size, count - offset), start + offset)
+        db.session.execute(insert(Employee), list(rows))
+        db.session.commit()
+
+
+def auth_headers(app):
+    """
+    Build an Authorization header with a freshly signed JWT.
+    Args:
+        app: Flask app whose JWT settings sign the token
+    Returns:
+        Dict of request headers
+    """
+    from employee_app.app.app import create_jwt
+    with app.app_context():
+        token = create_jwt(SimpleNamespace(id=1, name='Benchmark', email='bench@example.com'))
+    return {'Authorization': f'Bearer {token}'}
+
+
+def measure(fn, repeat=50, warmup=5):
+    """
+    Time repeated calls to a function.
+    Args:
+        fn: Zero-argument callable
+        repeat: Number of timed calls
+        warmup: Number of untimed calls made first
+    Returns:
+        List of durations in seconds
+    """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def summarize(samples):
+    """
+    Summarize durations as milliseconds.
+    Args:
+        samples: List of durations in seconds
+    Returns:
+        Dict with p50, p99 and mean in milliseconds
+    """
+    ordered = sorted(samples)
+    p99_index = min(len(ordered) - 1, int(round(0.99 * (len(ordered) - 1))))
+    return {
+        'p50_ms': round(statistics.median(ordered) * 1000, 3),
+        'p99_ms': round(ordered[p99_index] * 1000, 3),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+    }
+
+
+def report(title, rows, json_path=None):
+    """
+    Print benchmark results as a table and optionally write them as JSON.
+    Args:
+        title: Benchmark name
+        rows: List of dicts with the same keys
+        json_path: Optional path for machine-readable output
+    """
+    print(f"\n{title}")
+    if rows:
+        columns = list(rows[0].keys())
+        widths = [max(len(str(c)), *(len(str(r.get(c, ''))) for r in rows)) for c in columns]
+        print('  '.join(str(c).ljust(w) for c, w in zip(columns, widths)))
+        for row in rows:
+            print('  '.join(str(row.get(c, '')).ljust(w) for c, w in zip(columns, widths)))
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump({'benchmark': title, 'results': rows}, f, indent=2)
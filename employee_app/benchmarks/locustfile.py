@@ -0,0 +1,46 @@
+"""
+locustfile.py
+The mixed workload of bench_mixed_workload.py as a locust scenario, for distributed or longer load tests.
+
+Seed the target with generate.py first; BENCH_EMPLOYEES and BENCH_USERS must not exceed what was seeded. Needs the
+`locust` package. From the project root, with machine-readable results:
+    python -m employee_app.benchmarks.generate --employees 100000 --users 200 --database bench.db
+    locust -f employee_app/benchmarks/locustfile.py --host http://127.0.0.1:5000 --headless -u 64 -r 16 -t 2m \\
+        --csv results/mixed --json > results/mixed.json
+Rate limits apply to logins; start the server with RATE_LIMIT_ENABLED=False unless they are part of the test.
+"""
+import itertools
+import os
+import random
+from locust import HttpUser, between
+from employee_app.benchmarks.bench_mixed_workload import TASK_WEIGHTS, Scenario
+
+EMPLOYEES = int(os.environ.get('BENCH_EMPLOYEES', 100000))
+USERS = int(os.environ.get('BENCH_USERS', 200))
+_user_numbers = itertools.count()
+
+
+def make_task(name):
+    """Locust task sending one request of the scenario, reported under the task's name."""
+    def task(user):
+        user.send(name)
+    task.__name__ = name
+    return task
+
+
+class DirectoryUser(HttpUser):
+    """One virtual user: logs in as a generated user, then runs TASK_WEIGHTS."""
+    wait_time = between(0, float(os.environ.get('BENCH_THINK_MAX', 0.1)))
+    tasks = {make_task(name): weight for name, weight in TASK_WEIGHTS.items()}
+
+    def on_start(self):
+        number = next(_user_numbers)
+        self.scenario = Scenario(random.Random(number), EMPLOYEES, USERS, number)
+        self.send('login')
+
+    def send(self, name):
+        method, path, payload = self.scenario.request(name)
+        # Locust counts 4xx and 5xx responses as failures
+        response = self.client.request(method, path, json=payload, headers=self.scenario.headers, name=name)
+        if response.status_code < 400 and name in ('login', 'create'):
+            self.scenario.record(name, response.json())
@@ -0,0 +1,55 @@
+"""
+gunicorn.conf.py
+Gunicorn settings for serving the Employee Directory API in production.
+
+Every setting can be overridden with an environment variable. Run from the project root:
+    gunicorn -c employee_app/gunicorn.conf.py employee_app.wsgi:app
+
+Graceful reload: `kill -HUP <master pid>` starts fresh workers and lets the old ones finish their in-flight
+requests (up to GUNICORN_GRACEFUL_TIMEOUT seconds). With GUNICORN_PRELOAD=True the app code is loaded once in the
+master, so picking up new code needs `kill -USR2` (start a new master) followed by `kill -TERM` of the old one.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', 5000)}")
+# Worker processes; WEB_CONCURRENCY is the conventional name used by most hosting platforms
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+# Threads per worker; more than one switches to the threaded worker, which also serves keep-alive connections
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = 'gthread' if threads > 1 else 'sync'
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+# Recycle workers after this many requests (0 = never), with jitter so they do not all restart together
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 50))
+# Load the app once in the master so workers share its memory copy-on-write
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True') == 'True'
+# Empty GUNICORN_ACCESS_LOG disables the access log
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    """Give every worker its own database connections instead of ones inherited from the master."""
+    from employee_app.app.models.db import db
+    from employee_app.wsgi import app
+    with app.app_context():
+        for engine in db.engines.values():
+            # close=False leaves the master's connections alone and just forgets them in this process
+            engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    """Start this worker's outbox sender once the app is loaded."""
+    from employee_app.app.app import mail, outbox_drain_options, start_outbox_worker
+    from employee_app.wsgi import app
+    if app.config['MAIL_OUTBOX_WORKER']:
+        start_outbox_worker(app, mail, app.config['MAIL_OUTBOX_INTERVAL'], **outbox_drain_options(app))
+
+
+def worker_exit(server, worker):
+    """Stop the password hashing pool owned by this worker."""
+    from employee_app.app.app import password_hasher
+    password_hasher.shutdown()
@@ -0,0 +1,73 @@
+"""
+env.py
+Alembic environment for the Employee Directory database.
+
+Migrates the default engine of the Flask app, with the models' metadata as the autogenerate target. Runs inside the
+app context of `flask db ...`, or builds the app itself when Alembic is invoked directly
+(`alembic -c employee_app/alembic.ini upgrade head` from the project root).
+"""
+from logging.config import fileConfig
+from alembic import context
+from flask import current_app, has_app_context
+from employee_app.app.migrate import include_object
+from employee_app.app.models.db import db
+# Import every model module so all tables are registered on db.metadata
+from employee_app.app.models import models, outbox, reset_token, table_version  # noqa: F401
+
+config = context.config
+if config.config_file_name:
+    # Logging setup from alembic.ini when Alembic is run directly
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+
+def run_migrations_offline():
+    """Emit the migration SQL without connecting (`alembic upgrade head --sql`)."""
+    context.configure(
+        url=current_app.config['SQLALCHEMY_DATABASE_URI'],
+        target_metadata=db.metadata,
+        literal_binds=True,
+        include_object=include_object,
+        render_as_batch=current_app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'),
+        transaction_per_migration=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Run the migrations over a connection from the app's engine."""
+    lock_report = config.attributes.get('lock_report')
+    with db.engine.connect() as connection:
+        if connection.dialect.name == 'postgresql':
+            # Give up instead of queueing behind long transactions; every query would otherwise queue behind us
+            connection.exec_driver_sql(f"SET lock_timeout = {current_app.config['MIGRATION_LOCK_TIMEOUT_MS']}")
+            connection.commit()
+        if lock_report is not None:
+            lock_report.attach(connection)
+        context.configure(
+            connection=connection,
+            target_metadata=db.metadata,
+            include_object=include_object,
+            # SQLite cannot ALTER most things in place; batch mode recreates the table when it has to
+            render_as_batch=connection.dialect.name == 'sqlite',
+            # Commit after each revision so locks are released between steps
+            transaction_per_migration=True,
+            on_version_apply=lock_report.on_version_apply if lock_report is not None else (),
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+def run():
+    if context.is_offline_mode():
+        run_migrations_offline()
+    else:
+        run_migrations_online()
+
+
+if has_app_context():
+    run()
+else:
+    from employee_app.app.app import create_app
+    with create_app().app_context():
+        run()
@@ -0,0 +1,54 @@
+"""
+online.py
+Index operations for migration scripts that do not block the application.
+
+- PostgreSQL: CREATE/DROP INDEX CONCURRENTLY, run outside the migration transaction (it cannot run inside one).
+  Reads and writes continue while the index is built.
+- SQLite: batch mode. Adding or dropping an index does not need the table to be recreated, so this is a single
+  CREATE/DROP INDEX holding the write lock only for the build; readers continue in WAL mode.
+- Other databases: a plain CREATE/DROP INDEX.
+
+Both operations are idempotent (IF [NOT] EXISTS), so they are safe on databases where the index was already created
+by hand or by `db.create_all()`.
+"""
+from alembic import op
+
+
+def create_index_online(name, table, columns, unique=False, **kwargs):
+    """
+    Create an index without blocking writes where the database allows it.
+    Args:
+        name: Index name
+        table: Table name
+        columns: List of column names or expressions
+        unique: Create a unique index
+        kwargs: Dialect options passed to op.create_index
+    """
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.create_index(name, table, columns, unique=unique, if_not_exists=True, postgresql_concurrently=True,
+                            **kwargs)
+    elif dialect == 'sqlite':
+        with op.batch_alter_table(table) as batch:
+            batch.create_index(name, columns, unique=unique, if_not_exists=True, **kwargs)
+    else:
+        op.create_index(name, table, columns, unique=unique, if_not_exists=True, **kwargs)
+
+
+def drop_index_online(name, table):
+    """
+    Drop an index without blocking reads and writes where the database allows it.
+    Args:
+        name: Index name
+        table: Table name
+    """
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+    elif dialect == 'sqlite':
+        with op.batch_alter_table(table) as batch:
+            batch.drop_index(name, if_exists=True)
+    else:
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,42 @@
+"""
+search_index.py
+DDL of the employee full-text search index, for migration scripts.
+
+Revision 0006 creates it. On SQLite the FTS5 table is kept in sync by triggers on `employee`, and recreating that
+table (a batch migration that changes columns or constraints) drops the triggers with it: such a revision must call
+`create_sqlite_search()` after its batch operation, or `employee_fts` silently stops following the table.
+"""
+import logging
+from alembic import op
+import sqlalchemy as sa
+
+FTS5_TRIGGERS = {
+    'employee_fts_ai': "AFTER INSERT ON employee BEGIN "
+                       "INSERT INTO employee_fts(rowid, name, email, department, phone) "
+                       "VALUES (new.id, new.name, new.email, new.department, new.phone); END",
+    'employee_fts_ad': "AFTER DELETE ON employee BEGIN "
+                       "INSERT INTO employee_fts(employee_fts, rowid, name, email, department, phone) "
+                       "VALUES ('delete', old.id, old.name, old.email, old.department, old.phone); END",
+    'employee_fts_au': "AFTER UPDATE ON employee BEGIN "
+                       "INSERT INTO employee_fts(employee_fts, rowid, name, email, department, phone) "
+                       "VALUES ('delete', old.id, old.name, old.email, old.department, old.phone); "
+                       "INSERT INTO employee_fts(rowid, name, email, department, phone) "
+                       "VALUES (new.id, new.name, new.email, new.department, new.phone); END",
+}
+
+# Must match _pg_document() in app/search.py so the planner can use the index
+POSTGRES_DOCUMENT = "to_tsvector('simple', name || ' ' || email || ' ' || department || ' ' || phone)"
+
+
+def create_sqlite_search():
+    """Create the FTS5 table and its sync triggers if missing, and index the existing rows."""
+    bind = op.get_bind()
+    if not bind.execute(sa.text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar():
+        logging.warning("SQLite was built without FTS5; employee search falls back to ILIKE")
+        return
+    op.execute("CREATE VIRTUAL TABLE IF NOT EXISTS employee_fts USING fts5("
+               "name, email, department, phone, content='employee', content_rowid='id')")
+    for name, body in FTS5_TRIGGERS.items():
+        op.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+    # Index rows written before the triggers existed
+    op.execute("INSERT INTO employee_fts(employee_fts) VALUES ('rebuild')")
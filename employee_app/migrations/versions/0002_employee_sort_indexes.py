@@ -0,0 +1,35 @@
+"""Employee sort and department filter indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+One (sort key, id) index per supported sort, plus (department, sort key, id) for the department filter.
+Built online: CONCURRENTLY on PostgreSQL, batch mode on SQLite.
+"""
+from employee_app.migrations.online import create_index_online, drop_index_online
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_employee_name_id', ['name', 'id']),
+    ('ix_employee_phone_id', ['phone', 'id']),
+    ('ix_employee_department_id', ['department', 'id']),
+    ('ix_employee_department_name_id', ['department', 'name', 'id']),
+    ('ix_employee_department_email_id', ['department', 'email', 'id']),
+    ('ix_employee_department_phone_id', ['department', 'phone', 'id']),
+]
+
+
+def upgrade():
+    for name, columns in INDEXES:
+        create_index_online(name, 'employee', columns)
+
+
+def downgrade():
+    for name, _ in reversed(INDEXES):
+        drop_index_online(name, 'employee')
@@ -0,0 +1,38 @@
+"""Employee row versions and the table change counter
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+Adds employee.version (ETags and optimistic concurrency) and the table_version change counter, starting at 1 to
+match the version existing rows get. Both are skipped when already present, e.g. on databases made by create_all().
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'version' not in {column['name'] for column in inspector.get_columns('employee')}:
+        # Constant server default: a metadata-only change on PostgreSQL 11+ and SQLite, no table rewrite
+        op.add_column('employee', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+    if 'table_version' not in inspector.get_table_names():
+        table_version = op.create_table(
+            'table_version',
+            sa.Column('table_name', sa.String(length=64), nullable=False),
+            sa.Column('version', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('table_name'),
+        )
+        op.bulk_insert(table_version, [{'table_name': 'employee', 'version': 1}])
+
+
+def downgrade():
+    op.drop_table('table_version')
+    with op.batch_alter_table('employee') as batch:
+        batch.drop_column('version')
@@ -0,0 +1,45 @@
+"""Case-insensitive unique email indexes
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+Unique indexes on lower(email) for employees and users, so the database rejects duplicate emails in any letter case
+and the application no longer checks with a SELECT before each write. Built online. The upgrade stops with the
+offending addresses if existing rows already differ only by case; merge or rename them first.
+"""
+from alembic import op
+import sqlalchemy as sa
+from employee_app.migrations.online import create_index_online, drop_index_online
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ux_employee_email_lower', 'employee'),
+    ('ux_user_email_lower', 'user'),
+]
+
+
+def case_duplicates(table_name):
+    """Emails that occur more than once in a table when letter case is ignored."""
+    table = sa.table(table_name, sa.column('email'))
+    lowered = sa.func.lower(table.c.email)
+    query = sa.select(lowered).group_by(lowered).having(sa.func.count() > 1).limit(20)
+    return op.get_bind().execute(query).scalars().all()
+
+
+def upgrade():
+    for name, table_name in INDEXES:
+        duplicates = case_duplicates(table_name)
+        if duplicates:
+            raise RuntimeError(f"Cannot create {name}: {table_name} has emails differing only by case: {', '.join(duplicates)}")
+        create_index_online(name, table_name, [sa.text('lower(email)')], unique=True)
+
+
+def downgrade():
+    for name, table_name in reversed(INDEXES):
+        drop_index_online(name, table_name)
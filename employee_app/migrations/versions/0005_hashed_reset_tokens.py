@@ -0,0 +1,69 @@
+"""Hashed password reset tokens and purge indexes
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+Replaces password_reset_tokens.token (the plain token) with token_hash, its SHA-256 hex digest, under a unique
+index. Tokens that are used or expired are deleted instead of converted, since they can never be redeemed again;
+the remaining live ones (at most an hour's worth) are hashed in place, so outstanding reset links keep working.
+Adds the two partial indexes the batched purge selects through: unused tokens by expires_at, and used tokens.
+
+The downgrade cannot recover plain tokens from their hashes; it deletes all reset tokens.
+"""
+import hashlib
+from datetime import datetime, timezone
+from alembic import op
+import sqlalchemy as sa
+from employee_app.migrations.online import create_index_online, drop_index_online
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+TABLE = 'password_reset_tokens'
+INDEXES = [
+    ('ix_password_reset_tokens_token_hash', ['token_hash'], {'unique': True}),
+    ('ix_password_reset_tokens_unused_expires_at', ['expires_at'],
+     {'sqlite_where': sa.text('used = 0'), 'postgresql_where': sa.text('used = false')}),
+    ('ix_password_reset_tokens_used', ['id'],
+     {'sqlite_where': sa.text('used = 1'), 'postgresql_where': sa.text('used = true')}),
+]
+
+
+def hash_plain_tokens():
+    """Delete tokens that can no longer be redeemed and replace the plain token of the others with its hash."""
+    tokens = sa.table(TABLE, sa.column('id', sa.Integer), sa.column('token', sa.String),
+                      sa.column('token_hash', sa.String), sa.column('used', sa.Boolean),
+                      sa.column('expires_at', sa.DateTime))
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    op.execute(tokens.delete().where(sa.or_(tokens.c.used == sa.true(), tokens.c.expires_at < now)))
+    bind = op.get_bind()
+    for token_id, token in bind.execute(sa.select(tokens.c.id, tokens.c.token)).all():
+        bind.execute(tokens.update().where(tokens.c.id == token_id)
+                     .values(token_hash=hashlib.sha256(token.encode('utf-8')).hexdigest()))
+
+
+def upgrade():
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns(TABLE)}
+    if 'token' in columns:
+        if 'token_hash' not in columns:
+            op.add_column(TABLE, sa.Column('token_hash', sa.String(length=64), nullable=True))
+        hash_plain_tokens()
+        with op.batch_alter_table(TABLE) as batch:
+            batch.drop_column('token')
+            batch.alter_column('token_hash', existing_type=sa.String(length=64), nullable=False)
+    for name, index_columns, options in INDEXES:
+        create_index_online(name, TABLE, index_columns, **options)
+
+
+def downgrade():
+    for name, _, _ in reversed(INDEXES):
+        drop_index_online(name, TABLE)
+    op.execute(sa.table(TABLE).delete())
+    with op.batch_alter_table(TABLE) as batch:
+        batch.drop_column('token_hash')
+        batch.add_column(sa.Column('token', sa.String(length=128), nullable=False))
+        batch.create_unique_constraint('uq_password_reset_tokens_token', ['token'])
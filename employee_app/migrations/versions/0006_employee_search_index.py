@@ -0,0 +1,43 @@
+"""Employee full-text search index
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+The index behind the `search` parameter (see app/search.py), previously created by `init-db` outside migrations:
+- SQLite: the FTS5 table `employee_fts` with the triggers that keep it in sync with `employee`, filled from the
+  existing rows. Skipped when SQLite was built without FTS5; search then falls back to ILIKE.
+- PostgreSQL: a GIN index over the `tsvector` expression, built CONCURRENTLY.
+Idempotent, so databases where `init-db` already created them are adopted as they are.
+
+A later revision that recreates the `employee` table (a SQLite batch migration) drops these triggers with it, and
+must call `create_sqlite_search()` from migrations/search_index.py afterwards.
+"""
+from alembic import op
+import sqlalchemy as sa
+from employee_app.migrations.online import create_index_online, drop_index_online
+from employee_app.migrations.search_index import FTS5_TRIGGERS, POSTGRES_DOCUMENT, create_sqlite_search
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        create_sqlite_search()
+    elif dialect == 'postgresql':
+        create_index_online('ix_employee_search', 'employee', [sa.text(POSTGRES_DOCUMENT)], postgresql_using='gin')
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for name in reversed(list(FTS5_TRIGGERS)):
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute("DROP TABLE IF EXISTS employee_fts")
+    elif dialect == 'postgresql':
+        drop_index_online('ix_employee_search', 'employee')
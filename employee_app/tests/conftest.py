@@ -2,28 +2,103 @@
 conftest.py
 Pytest fixtures for Employee Directory app.
 
-This file sets up a separate in-memory SQLite test database and provides a Flask test client for isolated, repeatable API testing. It ensures that tests do not affect production data and that each test run starts with a clean database.
+This file builds the app with TestingConfig, which uses a separate in-memory SQLite test database, and provides a Flask test client for isolated, repeatable API testing. It ensures that tests do not affect production data and that each test run starts with a clean database.
+
+It also provides `assert_max_queries`, which fails a test when a block of code runs more SQL statements than its
+budget and lists the statements that ran (see test_query_budgets.py), and `request_reset_token`, which requests a
+password reset and reads the token from the queued email, the only place it appears in plain text.
 """
+import re
+from contextlib import contextmanager
 import pytest
-from employee_app.app.app import app
+from sqlalchemy import event
+from employee_app.app.app import create_app, init_db
+from employee_app.app.config import TestingConfig
 from employee_app.app.models.db import db
 
 @pytest.fixture(scope='session')
-def test_app():
+def app():
     """
-    Pytest fixture to configure the Flask app for testing with an in-memory SQLite database.
-    Creates all tables before tests and drops them after.
+    Pytest fixture that creates the Flask app for testing with an in-memory SQLite database.
+    Creates all tables and the search index before tests and drops them after.
     """
-    app.config['TESTING'] = True
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app = create_app(TestingConfig)
     with app.app_context():
-        db.create_all()
+        init_db()
         yield app
         db.drop_all()
 
 @pytest.fixture()
-def client(test_app):
+def test_client(app):
     """
     Pytest fixture to provide a Flask test client for API requests.
     """
-    return test_app.test_client()
+    return app.test_client()
+
+
+class QueryCounter:
+    """
+    Records the SQL statements the app's engines execute while the counter is active.
+    Use inside an app context: `with QueryCounter() as queries: ...`, then `len(queries)` and `queries.report()`.
+    """
+
+    def __init__(self):
+        self.statements = []
+        self._engines = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append((statement, parameters))
+
+    def __enter__(self):
+        self._engines = list(db.engines.values())
+        for engine in self._engines:
+            event.listen(engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        for engine in self._engines:
+            event.remove(engine, 'before_cursor_execute', self._record)
+
+    def __len__(self):
+        return len(self.statements)
+
+    def report(self):
+        """Numbered list of the recorded statements with their parameters."""
+        return '\n'.join(f'{n}. {" ".join(statement.split())}  {parameters!r}'
+                         for n, (statement, parameters) in enumerate(self.statements, 1))
+
+@pytest.fixture()
+def assert_max_queries(app):
+    """
+    Pytest fixture returning a context manager that fails the test when its block runs more than `budget` SQL
+    statements, reporting every statement that ran:
+        with assert_max_queries(3, 'GET /employees'):
+            client.get('/employees')
+    """
+    @contextmanager
+    def check(budget, label='block'):
+        with QueryCounter() as queries:
+            yield queries
+        if len(queries) > budget:
+            pytest.fail(f'{label} ran {len(queries)} SQL statements, budget is {budget}:\n{queries.report()}',
+                        pytrace=False)
+    return check
+
+
+@pytest.fixture(scope='session')
+def request_reset_token(app):
+    """
+    Pytest fixture returning a function that requests a password reset through a test client and returns the token
+    from the reset link in the queued email:
+        token = request_reset_token(client, 'user@example.com')
+    """
+    from employee_app.app.models.outbox import OutboundEmail
+
+    def request_token(client, email):
+        response = client.post('/password-reset-request', json={'email': email})
+        assert response.status_code == 200, response.get_data(as_text=True)
+        assert 'token' not in response.get_json()
+        queued = OutboundEmail.query.filter_by(recipient=email, subject='Password Reset Request') \
+            .order_by(OutboundEmail.id.desc()).first()
+        return re.search(r'token=([\w-]+)', queued.body)[1]
+    return request_token
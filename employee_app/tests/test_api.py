@@ -4,7 +4,6 @@ API endpoint tests for Employee Directory Flask application.
 Uses a separate test database and Flask test client.
 """
 import pytest
-from employee_app.app.app import app
 from employee_app.app.models.db import db
 
 def test_create_employee(client):
@@ -37,14 +36,13 @@ def test_duplicate_employee(client):
     assert response.status_code == 400
     assert "User already exists" in response.get_json()["error"]
 @pytest.fixture
-def client():
+def client(app):
     """
     Pytest fixture to create a test client for the Flask app and get JWT token.
     Uses an in-memory SQLite database to isolate test data from production.
     Automatically registers and logs in a test user, returns client and auth headers.
     """
-    app.config['TESTING'] = True
-    # Database configuration and initialization are handled in conftest.py
+    # App configuration and database initialization are handled in conftest.py
     with app.test_client() as client:
         # Register test user (ignore if already exists)
         reg_data = {
@@ -78,6 +76,9 @@ def client():
             def delete(self, *args, **kwargs):
                 kwargs.setdefault('headers', self.headers)
                 return self.client.delete(*args, **kwargs)
+            def patch(self, *args, **kwargs):
+                kwargs.setdefault('headers', self.headers)
+                return self.client.patch(*args, **kwargs)
         yield AuthClient(client, headers)
 
 def test_get_employees(client):
@@ -153,17 +154,15 @@ def test_login_nonexistent_user(client):
     assert response.status_code == 401
     assert "No user found" in response.get_json()["error"]
 
-def test_protected_endpoint_no_token():
+def test_protected_endpoint_no_token(app):
     """Test accessing protected endpoint without token returns 401."""
-    from employee_app.app.app import app
     with app.test_client() as client:
         response = client.get("/employees")
         assert response.status_code == 401
         assert "Missing or invalid token" in response.get_json()["error"]
 
-def test_protected_endpoint_invalid_token():
+def test_protected_endpoint_invalid_token(app):
     """Test accessing protected endpoint with invalid token returns 401."""
-    from employee_app.app.app import app
     with app.test_client() as client:
         headers = {"Authorization": "Bearer invalidtoken"}
         response = client.get("/employees", headers=headers)
@@ -199,9 +198,9 @@ def test_logout(client):
     assert response.status_code == 200
     assert "Logout successful" in response.get_json()["message"]
 
-def test_expired_token_rejected():
+def test_expired_token_rejected(app):
     """Test that expired JWT tokens are rejected by protected endpoints."""
-    from employee_app.app.app import app, JWT_SECRET, JWT_ALGORITHM
+    from employee_app.app.app import JWT_ALGORITHM
     import jwt as pyjwt
     from datetime import datetime, timedelta, timezone
     # Create an expired token
@@ -211,22 +210,21 @@ def test_expired_token_rejected():
         'email': 'expired@example.com',
         'exp': datetime.now(timezone.utc) - timedelta(seconds=10)  # Expired 10 seconds ago
     }
-    expired_token = pyjwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    expired_token = pyjwt.encode(payload, app.config['JWT_SECRET_KEY'], algorithm=JWT_ALGORITHM)
     headers = {"Authorization": f"Bearer {expired_token}"}
     with app.test_client() as client:
         response = client.get("/employees", headers=headers)
         assert response.status_code == 401
         assert "Invalid or expired token" in response.get_json()["error"]
 
-def test_password_reset_valid():
+def test_password_reset_valid(app, request_reset_token):
     """Test /password-reset with valid token and password resets password."""
     with app.test_client() as client:
         # Ensure user exists
         reg_data = {"name": "TestUser", "email": "testuser@example.com", "password": "oldpass123"}
         client.post("/register", json=reg_data)
-        # Request password reset to get token
-        resp = client.post("/password-reset-request", json={"email": "testuser@example.com"})
-        token = resp.get_json()["token"]
+        # Request password reset; the token only reaches the user by email
+        token = request_reset_token(client, "testuser@example.com")
         data = {"token": token, "password": "newpass456"}
         response = client.post("/password-reset", json=data)
         assert response.status_code == 200
@@ -234,7 +232,7 @@ def test_password_reset_valid():
         assert "message" in resp_json
         assert resp_json["message"] == "Password reset successful!"
 
-def test_password_reset_missing_fields():
+def test_password_reset_missing_fields(app):
     """Test /password-reset with missing token or password returns error."""
     with app.test_client() as client:
         response = client.post("/password-reset", json={"token": "sometoken"})
@@ -244,7 +242,7 @@ def test_password_reset_missing_fields():
         assert response.status_code == 400
         assert "Token and password are required" in response.get_json()["error"]
 
-def test_password_reset_user_not_found():
+def test_password_reset_user_not_found(app):
     """Test /password-reset when user does not exist returns error."""
     with app.test_client() as client:
         # Delete user if exists
@@ -255,10 +253,938 @@ def test_password_reset_user_not_found():
             if user:
                 db.session.delete(user)
                 db.session.commit()
-        # Request password reset to get token
+        # No user, so no token is issued
         resp = client.post("/password-reset-request", json={"email": "testuser@example.com"})
-        token = resp.get_json().get("token", "invalidtoken")
-        data = {"token": token, "password": "newpass456"}
+        assert resp.status_code == 404
+        data = {"token": "invalidtoken", "password": "newpass456"}
         response = client.post("/password-reset", json=data)
     assert response.status_code == 400
     assert "Invalid or expired token" in response.get_json()["error"]
+
+def test_get_employees_cursor_pagination(client):
+    """Test cursor mode walks every matching employee exactly once, in sort order, without totals."""
+    for i in range(5):
+        client.post("/employees", json={
+            "name": f"Cursorpage {i}",
+            "email": f"cursorpage{i}@example.com",
+            "department": "QA",
+            "phone": "1234567890"
+        })
+    seen = []
+    cursor = ""
+    while True:
+        response = client.get(f"/employees?search=cursorpage&sort=name&direction=desc&per_page=2&after={cursor}")
+        assert response.status_code == 200
+        data = response.get_json()
+        assert "total" not in data
+        seen.extend(e["name"] for e in data["employees"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [f"Cursorpage {i}" for i in range(4, -1, -1)]
+
+def test_get_employees_invalid_cursor(client):
+    """Test cursor mode rejects malformed cursors and cursors issued for another sort order."""
+    response = client.get("/employees?after=not-a-cursor")
+    assert response.status_code == 400
+    first = client.get("/employees?sort=name&per_page=1&after=").get_json()
+    response = client.get(f"/employees?sort=email&per_page=1&after={first['next_cursor']}")
+    assert response.status_code == 400
+    # Well-formed cursors whose values do not fit the sort column or a row id
+    from employee_app.app.pagination import encode_cursor
+    for sort, value, row_id in [
+        ("name", ["a"], 1),
+        ("name", {"a": 1}, 1),
+        ("name", "Alice", True),
+        ("name", "Alice", 10 ** 30),
+        ("id", True, 1),
+        ("id", "1", 1),
+        ("id", 10 ** 30, 10 ** 30),
+    ]:
+        cursor = encode_cursor(sort, "asc", value, row_id)
+        response = client.get(f"/employees?sort={sort}&per_page=1&after={cursor}")
+        assert response.status_code == 400, (sort, value, row_id)
+
+def test_search_prefix_and_index_sync(client):
+    """Test search matches word prefixes and stays in sync after updates and deletes."""
+    client.post("/employees", json={
+        "name": "Quixotic Searchable",
+        "email": "quixotic.searchable@example.com",
+        "department": "Research",
+        "phone": "1112223334"
+    })
+    found = client.get("/employees?search=quixo sear").get_json()["employees"]
+    assert [e["email"] for e in found] == ["quixotic.searchable@example.com"]
+    emp_id = found[0]["id"]
+    client.put(f"/employees/{emp_id}", json={"name": "Renamed Searchable"})
+    assert client.get("/employees?search=quixotic").get_json()["employees"][0]["name"] == "Renamed Searchable"
+    assert client.get("/employees?search=renamed").get_json()["employees"][0]["id"] == emp_id
+    client.delete(f"/employees/{emp_id}")
+    assert client.get("/employees?search=renamed searchable").get_json()["employees"] == []
+
+def test_get_employees_count_modes(client):
+    """Test count=exact|estimate|none and that cached totals are invalidated by writes."""
+    from employee_app.app.app import count_cache
+    client.post("/employees", json={"name": "Countcache One", "email": "countcache1@example.com", "department": "QA", "phone": "1234567890"})
+    exact = client.get("/employees?search=countcache").get_json()
+    assert exact["total"] == 1
+    created = client.post("/employees", json={"name": "Countcache Two", "email": "countcache2@example.com", "department": "QA", "phone": "1234567890"})
+    assert created.status_code == 200
+    after_create = client.get("/employees?search=countcache").get_json()
+    assert after_create["total"] == 2
+    none = client.get("/employees?search=countcache&count=none").get_json()
+    assert none["total"] is None and none["pages"] is None
+    assert none["employees"] == after_create["employees"]
+    assert client.get("/employees?search=countcache&count=estimate").get_json()["total"] == 2
+    count_cache.clear()  # Unfiltered estimates come from the highest rowid on SQLite, the employee just created
+    assert client.get("/employees?count=estimate").get_json()["total"] == created.get_json()["id"]
+    response = client.get("/employees?count=bogus")
+    assert response.status_code == 400
+
+def test_bulk_import_ndjson(client):
+    """Test NDJSON bulk import inserts valid rows and reports bad ones by line number."""
+    lines = [
+        '{"name": "Bulk One", "email": "bulkimport1@example.com", "department": "Ops", "phone": "1234567890"}',
+        '{"name": "Bulk Two", "email": "bulkimport2@example.com", "department": "Ops", "phone": "1234567890"}',
+        'not json',
+        '{"name": "Bulk Bad", "email": "notanemail", "department": "Ops", "phone": "1234567890"}',
+        '{"name": "Bulk Dup", "email": "bulkimport1@example.com", "department": "Ops", "phone": "1234567890"}',
+    ]
+    response = client.post("/employees/bulk", data="\n".join(lines), content_type="application/x-ndjson")
+    assert response.status_code == 200
+    report = response.get_json()
+    assert (report["inserted"], report["failed"]) == (2, 3)
+    failed_lines = {e["line"] for e in report["errors"]}
+    assert {3, 4, 5} <= failed_lines
+    found = client.get("/employees?search=bulkimport1&count=none").get_json()["employees"]
+    assert [e["name"] for e in found] == ["Bulk One"]
+    # A batch that inserts nothing commits nothing, so caches are not invalidated for it
+    from employee_app.app.bulk_import import import_employees, iter_ndjson
+    commits = []
+    import io
+    report = import_employees(iter_ndjson(io.BytesIO(lines[4].encode())), on_commit=lambda: commits.append(1))
+    assert (report["inserted"], report["failed"], commits) == (0, 1, [])
+
+def test_bulk_import_csv(client):
+    """Test CSV bulk import reads the header row and rejects unsupported content types."""
+    body = "name,email,department,phone\nCsv Import,bulkimportcsv@example.com,Ops,1234567890\n"
+    response = client.post("/employees/bulk", data=body, content_type="text/csv")
+    assert response.status_code == 200
+    assert (response.get_json()["inserted"], response.get_json()["failed"]) == (1, 0)
+    assert client.get("/employees?search=bulkimportcsv").get_json()["total"] == 1
+    response = client.post("/employees/bulk", data="{}", content_type="application/json")
+    assert response.status_code == 415
+
+def test_export_employees(client):
+    """Test the export endpoint streams filtered, sorted rows as CSV and NDJSON."""
+    for i in range(3):
+        client.post("/employees", json={"name": f"Exportable {i}", "email": f"exportable{i}@example.com", "department": "Ops", "phone": "1234567890"})
+    response = client.get("/employees/export?search=exportable&sort=name&direction=desc")
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines[0] == "id,name,email,department,phone"
+    assert [line.split(",")[1] for line in lines[1:]] == ["Exportable 2", "Exportable 1", "Exportable 0"]
+    response = client.get("/employees/export?search=exportable&format=ndjson")
+    import json
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [r["name"] for r in rows] == sorted(r["name"] for r in rows)
+    assert set(rows[0]) == {"id", "name", "email", "department", "phone"}
+    assert client.get("/employees/export?format=xml").status_code == 400
+
+def test_jwt_cache_hits(client):
+    """Test repeated requests with the same token are served from the verified-token cache."""
+    from employee_app.app.app import token_cache
+    client.get("/employees")
+    hits = token_cache.stats()["hits"]
+    client.get("/employees")
+    assert token_cache.stats()["hits"] == hits + 1
+
+def test_jwt_cache_never_outlives_exp():
+    """Test cached payloads expire at the token's exp claim even if the cache TTL is longer."""
+    import time
+    from employee_app.app.token_cache import TokenCache
+    cache = TokenCache(maxsize=2, ttl=3600)
+    cache.set("expired-token", {"user_id": 1, "exp": time.time() - 1})
+    assert cache.get("expired-token") is None
+    cache.set("a", {"exp": time.time() + 60})
+    cache.set("b", {"exp": time.time() + 60})
+    cache.set("c", {"exp": time.time() + 60})
+    assert cache.get("a") is None  # Evicted as least recently used
+    assert cache.get("c") is not None
+
+def test_jwt_cache_scoped_to_secret():
+    """Test a payload cached under one signing secret is not returned for another."""
+    import time
+    from employee_app.app.token_cache import TokenCache
+    cache = TokenCache()
+    cache.set("token", {"user_id": 1, "exp": time.time() + 60}, "old-secret")
+    assert cache.get("token", "new-secret") is None
+    assert cache.get("token", "old-secret")["user_id"] == 1
+
+def test_login_rehashes_outdated_hash(client, app):
+    """Test login transparently upgrades a password hash made with outdated parameters."""
+    from werkzeug.security import generate_password_hash
+    from employee_app.app.app import password_hasher
+    from employee_app.app.models.models import User
+    with app.app_context():
+        user = User.query.filter_by(email="testuser@example.com").first()
+        user.password_hash = generate_password_hash("testpass123", method="pbkdf2:sha256:1000")
+        db.session.commit()
+    response = client.client.post("/login", json={"email": "testuser@example.com", "password": "testpass123"})
+    assert response.status_code == 200
+    with app.app_context():
+        stored = User.query.filter_by(email="testuser@example.com").first().password_hash
+    assert not stored.startswith("pbkdf2:sha256:1000$")
+    assert not password_hasher.needs_rehash(stored)
+
+def test_busy_password_hasher_returns_503(client, monkeypatch):
+    """Test login and register answer 503 with Retry-After when the password hashing pool is saturated."""
+    from employee_app.app.app import password_hasher
+    from employee_app.app.passwords import PasswordHasherBusy
+
+    def busy(*args):
+        raise PasswordHasherBusy("Too many password hash operations in progress")
+    monkeypatch.setattr(password_hasher, "verify", busy)
+    monkeypatch.setattr(password_hasher, "hash", busy)
+    for response in (
+        client.client.post("/login", json={"email": "testuser@example.com", "password": "testpass123"}),
+        client.client.post("/register", json={"name": "Busy User", "email": "busyuser@example.com", "password": "testpass123"}),
+    ):
+        assert response.status_code == 503
+        assert int(response.headers["Retry-After"]) >= 1
+        assert "Too many" not in response.get_json()["error"]
+
+def test_password_hasher_timeout_keeps_slot_until_done():
+    """Test a timed-out hash job keeps its slot until it finishes, so abandoned jobs cannot exceed max_pending."""
+    import time
+    from employee_app.app.passwords import PasswordHasher, PasswordHasherBusy
+    hasher = PasswordHasher(workers=1, max_pending=1, timeout=0.2)
+    try:
+        with pytest.raises(PasswordHasherBusy):
+            hasher._run(time.sleep, 2)
+        with pytest.raises(PasswordHasherBusy):
+            hasher._run(time.sleep, 0)  # The abandoned job still holds the only slot
+        deadline = time.monotonic() + 10
+        while not hasher._slots.acquire(timeout=0.1):
+            assert time.monotonic() < deadline
+        hasher._slots.release()
+    finally:
+        hasher.shutdown()
+
+def _free_port():
+    import socket
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def test_password_reset_email_sent_by_outbox(client, monkeypatch, app):
+    """Test reset emails are queued, then delivered by the outbox sender to a local SMTP stand-in."""
+    from aiosmtpd.controller import Controller
+    from employee_app.app.app import mail
+    from employee_app.app.mailer import drain_outbox
+    from employee_app.app.models.outbox import OutboundEmail
+    received = []
+
+    class Handler:
+        async def handle_DATA(self, server, session, envelope):
+            received.append(envelope)
+            return "250 OK"
+
+    port = _free_port()
+    controller = Controller(Handler(), hostname="127.0.0.1", port=port)
+    controller.start()
+    try:
+        state = app.extensions["mail"]
+        for name, value in {"server": "127.0.0.1", "port": port, "use_tls": False, "use_ssl": False,
+                            "username": None, "password": None, "suppress": False,
+                            "default_sender": "noreply@example.com"}.items():
+            monkeypatch.setattr(state, name, value)
+        response = client.client.post("/password-reset-request", json={"email": "testuser@example.com"})
+        assert response.status_code == 200
+        with app.app_context():
+            queued = OutboundEmail.query.filter_by(recipient="testuser@example.com", status="pending").count()
+            assert queued >= 1
+            stats = drain_outbox(mail, batch_size=100)
+            assert stats["sent"] >= queued
+            assert OutboundEmail.query.filter_by(recipient="testuser@example.com", status="pending").count() == 0
+    finally:
+        controller.stop()
+    assert any("testuser@example.com" in envelope.rcpt_tos for envelope in received)
+
+def test_outbox_retries_with_backoff(client, monkeypatch, app):
+    """Test messages are rescheduled with backoff when the SMTP server is unreachable."""
+    from employee_app.app.app import mail
+    from employee_app.app.mailer import drain_outbox, enqueue_email
+    from employee_app.app.models.outbox import OutboundEmail, utcnow
+    state = app.extensions["mail"]
+    monkeypatch.setattr(state, "server", "127.0.0.1")
+    monkeypatch.setattr(state, "port", _free_port())  # Nothing listens here
+    monkeypatch.setattr(state, "suppress", False)
+    with app.app_context():
+        email = enqueue_email("retry@example.com", "Subject", "Body")
+        db.session.commit()
+        stats = drain_outbox(mail, batch_size=100, backoff=60)
+        assert stats["retried"] >= 1
+        email = db.session.get(OutboundEmail, email.id)
+        assert email.status == "pending"
+        assert email.attempts == 1
+        assert email.next_attempt_at > utcnow()
+        db.session.delete(email)
+        db.session.commit()
+
+def test_create_app_does_not_touch_database(tmp_path):
+    """Test create_app() leaves the database alone until init-db and seed-db are run."""
+    from employee_app.app.app import create_app, seed_db
+    from employee_app.app.config import TestingConfig
+    from employee_app.app.models.models import Employee
+    db_file = tmp_path / "factory.db"
+
+    class FileConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_file}"
+
+    app = create_app(FileConfig)
+    assert not db_file.exists()
+    runner = app.test_cli_runner()
+    with app.app_context():  # The CLI commands reuse the active context, so it must be this app's
+        assert "search backend" in runner.invoke(args=["init-db"]).output
+        assert "Added" in runner.invoke(args=["seed-db"]).output
+        assert Employee.query.count() == 5
+        assert seed_db() == 0  # Already seeded
+        db.engine.dispose()
+
+def test_sqlite_engine_tuning_and_pool_stats(tmp_path):
+    """Test file databases get WAL/synchronous PRAGMAs and report pool checkout waits on /stats/db-pool."""
+    from types import SimpleNamespace
+    from sqlalchemy import text
+    from employee_app.app.app import create_app, create_jwt, init_db
+    from employee_app.app.config import TestingConfig
+
+    class FileConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'tuned.db'}"
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        init_db()
+        assert db.session.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert db.session.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        token = create_jwt(SimpleNamespace(id=1, name="Pool", email="pool@example.com"))
+        response = app.test_client().get("/stats/db-pool", headers={"Authorization": f"Bearer {token}"})
+        db.session.remove()
+        db.engine.dispose()
+    stats = response.get_json()["default"]
+    assert stats["pool"] == "TimedQueuePool"
+    assert stats["checkouts"] >= 1
+    assert stats["wait_max_ms"] >= stats["wait_mean_ms"] >= 0
+
+def test_migrations_match_models(app):
+    """Test the migrations produce exactly the schema the models declare."""
+    from alembic.autogenerate import compare_metadata
+    from alembic.runtime.migration import MigrationContext
+    from employee_app.app.migrate import include_object
+    with db.engine.connect() as connection:
+        context = MigrationContext.configure(connection, opts={"include_object": include_object})
+        assert compare_metadata(context, db.metadata) == []
+
+def test_migrations_adopt_legacy_database_and_report_locks(tmp_path):
+    """Test upgrading a create_all() database with --report-locks, the lock limit check, and downgrade."""
+    from sqlalchemy import inspect
+    from employee_app.app.app import create_app
+    from employee_app.app.config import TestingConfig
+    from employee_app.app.migrate import current_revision
+
+    class FileConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'legacy.db'}"
+
+    app = create_app(FileConfig)
+    runner = app.test_cli_runner()
+    with app.app_context():
+        db.metadata.tables["employee"].create(db.engine)  # Schema from before migrations: no sort indexes
+        result = runner.invoke(args=["db", "upgrade", "--report-locks"])
+        assert result.exit_code == 0, result.output
+        assert "0002  database write lock (blocks writes)" in result.output
+        assert "CREATE INDEX IF NOT EXISTS ix_employee_name_id" in result.output
+        assert current_revision() == "0006"
+        assert "ix_employee_name_id" in {i["name"] for i in inspect(db.engine).get_indexes("employee")}
+        search_objects = "SELECT name FROM sqlite_master WHERE name = 'employee_fts' OR name LIKE 'employee_fts_a_'"
+        with db.engine.connect() as conn:
+            # Search table and its three sync triggers come from migration 0006, not from init-db
+            assert len(conn.exec_driver_sql(search_objects).all()) == 4
+        assert runner.invoke(args=["db", "downgrade", "0001"]).exit_code == 0
+        assert "ix_employee_name_id" not in {i["name"] for i in inspect(db.engine).get_indexes("employee")}
+        with db.engine.connect() as conn:
+            assert conn.exec_driver_sql(search_objects).all() == []
+        result = runner.invoke(args=["db", "upgrade", "--max-lock-ms", "0"])
+        assert result.exit_code != 0
+        assert "blocked writes" in result.output
+        db.engine.dispose()
+
+def test_response_cache_read_through_and_invalidation(client, monkeypatch):
+    """Test employee reads are served from the response cache and every write makes them unreachable."""
+    from employee_app.app.app import response_cache
+    from employee_app.app.cache import MemoryBackend
+    monkeypatch.setattr(response_cache, "backend", MemoryBackend())
+    emp_id = client.post("/employees", json={"name": "Cached Reader", "email": "cachedreader@example.com", "department": "Cache", "phone": "1234567890"}).get_json()["id"]
+    assert client.get(f"/employees/{emp_id}").headers["X-Cache"] == "MISS"
+    response = client.get(f"/employees/{emp_id}")
+    assert response.headers["X-Cache"] == "HIT" and response.get_json()["name"] == "Cached Reader"
+    assert client.get("/employees?department=Cache").headers["X-Cache"] == "MISS"
+    assert client.get("/employees?department=Cache&unrelated=1").headers["X-Cache"] == "HIT"
+    client.put(f"/employees/{emp_id}", json={"name": "Cached Renamed"})
+    assert client.get(f"/employees/{emp_id}").get_json()["name"] == "Cached Renamed"
+    assert client.get("/employees?department=Cache").get_json()["employees"][0]["name"] == "Cached Renamed"
+    client.post("/employees", json={"name": "Cached Second", "email": "cachedsecond@example.com", "department": "Cache", "phone": "1234567890"})
+    assert client.get("/employees?department=Cache").get_json()["total"] == 2
+    client.delete(f"/employees/{emp_id}")
+    assert client.get(f"/employees/{emp_id}").status_code == 404
+    assert "X-Cache" not in client.get(f"/employees/{emp_id}").headers  # Missing employees bypass the cache
+    stats = client.get("/stats/cache").get_json()
+    assert stats["backend"] == "MemoryBackend" and stats["hits"] >= 2 and 0 < stats["hit_ratio"] < 1
+    assert stats["entries"] >= 1 and stats["memory_bytes"] > 0
+
+def test_response_cache_sees_writes_from_other_workers(client, monkeypatch):
+    """Test a write this worker never saw (made by another process) is not hidden by this worker's cache."""
+    from employee_app.app.app import response_cache
+    from employee_app.app.cache import MemoryBackend
+    monkeypatch.setattr(response_cache, "backend", MemoryBackend())
+    emp_id = client.post("/employees", json={"name": "Worker Old", "email": "workerold@example.com", "department": "Workers", "phone": "1234567890"}).get_json()["id"]
+    client.get(f"/employees/{emp_id}")
+    client.get("/employees?department=Workers")
+    from employee_app.app.models.models import Employee
+    # Another worker's write: same database, but this process's clear_counts() is never called
+    employee = db.session.get(Employee, emp_id)
+    employee.name = "Worker New"
+    db.session.commit()
+    etag = f'"{emp_id}.{employee.version}"'
+    response = client.get(f"/employees/{emp_id}")
+    assert response.headers["X-Cache"] == "MISS" and response.get_json()["name"] == "Worker New"
+    # The body cached with an ETag is only ever served with that ETag
+    response = client.get(f"/employees/{emp_id}")
+    assert response.headers["X-Cache"] == "HIT" and response.headers["ETag"] == etag
+    assert response.get_json()["name"] == "Worker New"
+    response = client.get("/employees?department=Workers")
+    assert response.headers["X-Cache"] == "MISS" and response.get_json()["employees"][0]["name"] == "Worker New"
+
+def test_cached_list_total_follows_other_workers_writes(client, monkeypatch):
+    """Test a listing cached after another worker's write carries that version's total, not this worker's old count."""
+    from sqlalchemy.orm import Session
+    from employee_app.app.app import response_cache
+    from employee_app.app.cache import MemoryBackend
+    from employee_app.app.etags import bump_table_version
+    from employee_app.app.models.models import Employee
+    monkeypatch.setattr(response_cache, "backend", MemoryBackend())
+    client.post("/employees", json={"name": "Total One", "email": "totalone@example.com", "department": "Totals", "phone": "1234567890"})
+    assert client.get("/employees?department=Totals").get_json()["total"] == 1
+    # Another worker's insert, in its own session: this process's count cache is never cleared
+    with Session(db.engine) as other:
+        version = bump_table_version(other, Employee.__tablename__)
+        other.add(Employee(name="Total Two", email="totaltwo@example.com", department="Totals", phone="1234567890", version=version))
+        other.commit()
+    for expected_cache in ("MISS", "HIT"):
+        response = client.get("/employees?department=Totals")
+        body = response.get_json()
+        assert response.headers["X-Cache"] == expected_cache
+        assert body["total"] == len(body["employees"]) == 2
+
+def test_response_cache_backends():
+    """Test the LRU stays within its entry and byte bounds, and the Redis backend speaks the same interface."""
+    from employee_app.app.cache import MemoryBackend, RedisBackend
+    lru = MemoryBackend(max_entries=2, max_bytes=1000)
+    lru.set("a", b"1", 60)
+    lru.set("b", b"2", 60)
+    lru.get("a")
+    lru.set("c", b"3", 60)
+    assert lru.get("b") is None and lru.get("a") == b"1"  # b was least recently used
+    lru.set("big", b"x" * 995, 60)
+    assert lru.stats()["memory_bytes"] <= 1000 and lru.get("c") is None
+    lru.set("gone", b"1", -1)
+    assert lru.get("gone") is None  # Expired
+
+    class FakeRedis:
+        def __init__(self):
+            self.data = {}
+        def get(self, key):
+            return self.data.get(key)
+        def set(self, key, value, ex=None):
+            self.data[key] = value
+        def scan_iter(self, match):
+            return [k for k in self.data if k.startswith(match.rstrip("*"))]
+        def delete(self, *keys):
+            for key in keys:
+                self.data.pop(key)
+        def info(self, section):
+            return {"used_memory": 1024, "maxmemory": 0}
+
+    shared = RedisBackend(client=FakeRedis())
+    shared.set("k", b"v", 60)
+    assert shared.get("k") == b"v"
+    shared.clear()
+    assert shared.get("k") is None and shared.stats()["memory_bytes"] == 1024
+
+def test_conditional_get_with_etags(client):
+    """Test GET /employees and /employees/<id> answer If-None-Match with 304 until an employee changes."""
+    emp_id = client.post("/employees", json={"name": "Etag Poll", "email": "etagpoll@example.com", "department": "Etag", "phone": "1234567890"}).get_json()["id"]
+    first = client.get(f"/employees/{emp_id}")
+    etag = first.headers["ETag"]
+    assert etag.startswith(f'"{emp_id}.')
+    not_modified = client.get(f"/employees/{emp_id}", headers={**client.headers, "If-None-Match": etag})
+    assert not_modified.status_code == 304 and not_modified.get_data() == b"" and not_modified.headers["ETag"] == etag
+    listing = client.get("/employees?department=Etag")
+    assert client.get("/employees?department=Etag", headers={**client.headers, "If-None-Match": listing.headers["ETag"]}).status_code == 304
+    assert client.get("/employees?department=Other", headers={**client.headers, "If-None-Match": listing.headers["ETag"]}).status_code == 200
+    client.put(f"/employees/{emp_id}", json={"phone": "9999999999"})
+    changed = client.get(f"/employees/{emp_id}", headers={**client.headers, "If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    assert client.get("/employees?department=Etag", headers={**client.headers, "If-None-Match": listing.headers["ETag"]}).status_code == 200
+    assert "ETag" not in client.get("/employees/999999").headers
+
+def test_if_match_optimistic_concurrency(client):
+    """Test PUT and DELETE with a stale If-Match fail with 412, and versions are never reused."""
+    emp_id = client.post("/employees", json={"name": "Etag Writer", "email": "etagwriter@example.com", "department": "Etag", "phone": "1234567890"}).get_json()["id"]
+    etag = client.get(f"/employees/{emp_id}").headers["ETag"]
+    updated = client.put(f"/employees/{emp_id}", json={"name": "Etag First"}, headers={**client.headers, "If-Match": etag})
+    assert updated.status_code == 200 and updated.headers["ETag"] != etag
+    stale = client.put(f"/employees/{emp_id}", json={"name": "Etag Lost Update"}, headers={**client.headers, "If-Match": etag})
+    assert stale.status_code == 412 and stale.headers["ETag"] == updated.headers["ETag"]
+    assert client.get(f"/employees/{emp_id}").get_json()["name"] == "Etag First"
+    assert client.delete(f"/employees/{emp_id}", headers={**client.headers, "If-Match": etag}).status_code == 412
+    assert client.delete(f"/employees/{emp_id}", headers={**client.headers, "If-Match": updated.headers["ETag"]}).status_code == 200
+    # SQLite may hand the deleted id to the next employee; its ETag must still differ
+    new_id = client.post("/employees", json={"name": "Etag Reuse", "email": "etagreuse@example.com", "department": "Etag", "phone": "1234567890"}).get_json()["id"]
+    assert client.get(f"/employees/{new_id}").headers["ETag"] not in (etag, updated.headers["ETag"])
+    assert client.put(f"/employees/{new_id}", json={"name": "Etag Any"}, headers={**client.headers, "If-Match": "*"}).status_code == 200
+
+def test_stale_version_detected_at_commit(app):
+    """Test a concurrent update between load and commit is caught by the version check."""
+    from sqlalchemy import update
+    from sqlalchemy.orm.exc import StaleDataError
+    from employee_app.app.models.models import Employee
+    employee = Employee(name="Etag Race", email="etagrace@example.com", department="Etag", phone="1234567890")
+    db.session.add(employee)
+    db.session.commit()
+    db.session.execute(update(Employee).where(Employee.id == employee.id).values(version=Employee.version + 1).execution_options(synchronize_session=False))
+    employee.name = "Etag Race Loser"
+    with pytest.raises(StaleDataError):
+        db.session.commit()
+    db.session.rollback()
+
+def test_json_provider_selection(app):
+    """Test orjson is installed when available and encodes like the stdlib provider, and JSON_BACKEND is honoured."""
+    from datetime import datetime
+    from flask import Flask
+    from flask.json.provider import DefaultJSONProvider
+    from employee_app.app.serialization import OrjsonProvider, init_json, orjson
+    if orjson is not None:
+        assert isinstance(app.json, OrjsonProvider)
+    value = {"name": "Zoë", "when": datetime(2024, 1, 2, 3, 4, 5), "items": [1, 2.5, None, True]}
+    assert app.json.loads(app.json.dumps(value)) == DefaultJSONProvider(app).loads(DefaultJSONProvider(app).dumps(value))
+    stdlib_app = Flask(__name__)
+    stdlib_app.config["JSON_BACKEND"] = "stdlib"
+    assert init_json(stdlib_app) == "stdlib" and type(stdlib_app.json) is DefaultJSONProvider
+    stdlib_app.config["JSON_BACKEND"] = "ujson"
+    with pytest.raises(ValueError):
+        init_json(stdlib_app)
+
+def test_response_compression(client):
+    """Test large responses are gzip/brotli encoded per Accept-Encoding, and small ones are left alone."""
+    import gzip
+    import json
+    from employee_app.app.compression import brotli
+    for i in range(30):
+        client.post("/employees", json={"name": f"Squeeze {i:02d}", "email": f"squeeze{i}@example.com", "department": "Squeeze", "phone": "1234567890"})
+    url = "/employees?department=Squeeze&per_page=30&sort=name"
+    plain = client.get(url)
+    assert "Content-Encoding" not in plain.headers and "Accept-Encoding" in plain.headers["Vary"]
+    zipped = client.get(url, headers={**client.headers, "Accept-Encoding": "gzip"})
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert len(zipped.get_data()) < len(plain.get_data()) / 3
+    assert json.loads(gzip.decompress(zipped.get_data())) == plain.get_json()
+    assert zipped.headers["ETag"] == "W/" + plain.headers["ETag"]
+    assert client.get(url, headers={**client.headers, "Accept-Encoding": "gzip", "If-None-Match": zipped.headers["ETag"]}).status_code == 304
+    if brotli is not None:
+        squeezed = client.get(url, headers={**client.headers, "Accept-Encoding": "gzip, br"})
+        assert squeezed.headers["Content-Encoding"] == "br"
+        assert json.loads(brotli.decompress(squeezed.get_data())) == plain.get_json()
+    small = client.get("/employees?department=Squeeze&per_page=1", headers={**client.headers, "Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in small.headers  # Below COMPRESS_MIN_SIZE
+    exported = client.get("/employees/export?department=Squeeze", headers={**client.headers, "Accept-Encoding": "gzip"})
+    assert exported.headers["Content-Encoding"] == "gzip" and "Content-Length" not in exported.headers
+    lines = gzip.decompress(exported.get_data()).decode().splitlines()
+    assert lines[0] == "id,name,email,department,phone" and len(lines) == 31
+
+def test_batch_get_and_update(client):
+    """Test batch-get returns records in request order, and PATCH /employees/batch in both modes."""
+    ids = [client.post("/employees", json={"name": f"Batch {i}", "email": f"batch{i}@example.com", "department": "Batch", "phone": "1234567890"}).get_json()["id"] for i in range(3)]
+    data = client.post("/employees/batch-get", json={"ids": [ids[2], 999999, ids[0], ids[2]]}).get_json()
+    assert [e["id"] for e in data["employees"]] == [ids[2], ids[0]] and data["missing"] == [999999]
+    assert client.post("/employees/batch-get", json={"ids": "1,2"}).status_code == 400
+    # All or nothing: one bad item and nothing is written
+    response = client.patch("/employees/batch", json={"items": [{"id": ids[0], "department": "Moved"}, {"id": ids[1], "phone": "123"}]})
+    assert response.status_code == 400
+    assert [r["status"] for r in response.get_json()["results"]] == ["rolled_back", "invalid"]
+    assert client.get(f"/employees/{ids[0]}").get_json()["department"] == "Batch"
+    response = client.patch("/employees/batch", json={"items": [{"id": i, "department": "Moved"} for i in ids]})
+    assert response.status_code == 200 and response.get_json()["succeeded"] == 3
+    assert {e["department"] for e in client.post("/employees/batch-get", json={"ids": ids}).get_json()["employees"]} == {"Moved"}
+    # Best effort: two items claim the same email, the second is rolled back to its savepoint
+    response = client.patch("/employees/batch", json={"mode": "best_effort", "items": [
+        {"id": ids[0], "name": "Batch Renamed"},
+        {"id": ids[1], "email": "batchshared@example.com"},
+        {"id": ids[2], "email": "batchshared@example.com", "name": "Batch Lost"},
+        {"id": 999999, "name": "Nobody"},
+        {"id": ids[0], "name": "Twice"},
+    ]})
+    assert response.status_code == 200
+    assert [r["status"] for r in response.get_json()["results"]] == ["updated", "updated", "conflict", "not_found", "invalid"]
+    names = {e["id"]: e for e in client.post("/employees/batch-get", json={"ids": ids}).get_json()["employees"]}
+    assert names[ids[0]]["name"] == "Batch Renamed" and names[ids[1]]["email"] == "batchshared@example.com"
+    assert names[ids[2]]["name"] == "Batch 2" and names[ids[2]]["email"] == "batch2@example.com"
+    assert client.patch("/employees/batch", json={"items": [{"id": ids[2], "email": "batch0@example.com"}]}).get_json()["results"][0]["status"] == "conflict"
+    # All or nothing: the shared batch flush fails, and the items are retried one by one to find the conflict
+    response = client.patch("/employees/batch", json={"items": [
+        {"id": ids[0], "email": "batchtwice@example.com"}, {"id": ids[2], "email": "batchtwice@example.com"}]})
+    assert response.status_code == 400
+    assert [r["status"] for r in response.get_json()["results"]] == ["rolled_back", "conflict"]
+    assert client.get(f"/employees/{ids[0]}").get_json()["email"] == "batch0@example.com"
+
+def test_batch_delete(client):
+    """Test DELETE /employees/batch removes all targets in one commit, or none in all-or-nothing mode."""
+    ids = [client.post("/employees", json={"name": f"Batchdel {i}", "email": f"batchdel{i}@example.com", "department": "Batchdel", "phone": "1234567890"}).get_json()["id"] for i in range(3)]
+    response = client.delete("/employees/batch", json={"ids": [ids[0], 999999]})
+    assert response.status_code == 400 and response.get_json()["results"][0]["status"] == "rolled_back"
+    assert client.get(f"/employees/{ids[0]}").status_code == 200
+    response = client.delete("/employees/batch", json={"ids": [ids[0], 999999], "mode": "best_effort"})
+    assert response.status_code == 200 and response.get_json()["succeeded"] == 1
+    response = client.delete("/employees/batch", json={"ids": ids[1:]})
+    assert response.status_code == 200 and response.get_json()["succeeded"] == 2
+    assert client.post("/employees/batch-get", json={"ids": ids}).get_json()["missing"] == ids
+    assert client.delete("/employees/batch", json={"ids": ids, "mode": "sometimes"}).status_code == 400
+
+def test_duplicate_email_enforced_by_database(client):
+    """Test emails are unique in any letter case, without a SELECT before the write."""
+    from sqlalchemy import event
+    statements = []
+    capture = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        created = client.post("/employees", json={"name": "Case One", "email": "Case.Unique@example.com", "department": "Case", "phone": "1234567890"})
+    finally:
+        event.remove(db.engine, "before_cursor_execute", capture)
+    assert created.status_code == 200
+    assert not [s for s in statements if s.startswith("SELECT") and "FROM employee" in s]
+    response = client.post("/employees", json={"name": "Case Two", "email": "case.unique@EXAMPLE.com", "department": "Case", "phone": "1234567890"})
+    assert response.status_code == 400 and response.get_json()["error"] == "User already exists"
+    other = client.post("/employees", json={"name": "Case Three", "email": "case.other@example.com", "department": "Case", "phone": "1234567890"}).get_json()["id"]
+    response = client.put(f"/employees/{other}", json={"email": "CASE.UNIQUE@example.com"})
+    assert response.status_code == 400 and response.get_json()["error"] == "User already exists"
+    assert client.put(f"/employees/{other}", json={"name": "Case Renamed"}).status_code == 200  # Session usable after rollback
+    response = client.post("/register", json={"name": "Case", "email": "TestUser@example.com", "password": "testpass123"})
+    assert response.status_code == 400 and response.get_json()["error"] == "User already exists"
+    # Lookups ignore case too, through the same unique index
+    assert client.client.post("/login", json={"email": "TestUser@Example.com", "password": "testpass123"}).status_code == 200
+    assert client.client.post("/password-reset-request", json={"email": "TESTUSER@example.com"}).status_code == 200
+    from employee_app.app.models.models import User
+    from sqlalchemy import func
+    lookup = User.query.filter(func.lower(User.email) == "testuser@example.com").statement.compile(db.engine)
+    plan = db.session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {lookup}", tuple(lookup.params.values())).all()
+    assert any("ux_user_email_lower" in row[-1] for row in plan)
+
+def test_concurrent_duplicate_inserts(tmp_path):
+    """Stress test: threads racing to create the same emails end with exactly one employee per email."""
+    import threading
+    from sqlalchemy import func, select
+    from employee_app.app.app import create_app, init_db, create_jwt
+    from employee_app.app.config import TestingConfig
+    from employee_app.app.models.models import Employee
+    from types import SimpleNamespace
+
+    class FileConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'race.db'}"
+        PASSWORD_HASH_WORKERS = 0
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        init_db()
+        headers = {"Authorization": f"Bearer {create_jwt(SimpleNamespace(id=1, name='Race', email='race@example.com'))}"}
+    statuses = []
+    barrier = threading.Barrier(8)
+
+    def worker(n):
+        client = app.test_client()
+        barrier.wait()
+        for i in range(10):
+            email = f"race{i}@example.com" if n % 2 else f"RACE{i}@example.com"
+            response = client.post("/employees", json={"name": f"Racer {n}", "email": email, "department": "Race", "phone": "1234567890"}, headers=headers)
+            statuses.append((i, response.status_code, (response.get_json() or {}).get("error")))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(i for i, status, _ in statuses if status == 200) == list(range(10))
+    assert {error for _, status, error in statuses if status != 200} == {"User already exists"}
+    with app.app_context():
+        counts = db.session.execute(select(func.lower(Employee.email), func.count()).group_by(func.lower(Employee.email))).all()
+        assert len(counts) == 10 and all(count == 1 for _, count in counts)
+        db.session.remove()
+        db.engine.dispose()
+
+def test_metrics_and_server_timing(client, app, monkeypatch):
+    """Test requests are timed per URL rule with their SQL statement count, and exposed on /metrics."""
+    import re
+    emp_id = client.post("/employees", json={"name": "Metric", "email": "metric@example.com", "department": "Ops", "phone": "1234567890"}).get_json()["id"]
+    response = client.get(f"/employees/{emp_id}")
+    match = re.fullmatch(r'app;dur=([\d.]+), db;dur=([\d.]+);desc="(\d+) queries"', response.headers["Server-Timing"])
+    assert match and float(match[1]) >= float(match[2]) and int(match[3]) >= 1
+    client.get("/no-such-page")
+    response = client.client.get("/metrics")  # No JWT needed
+    assert response.status_code == 200 and response.mimetype == "text/plain"
+    body = response.get_data(as_text=True)
+    assert re.search(r'http_requests_total\{worker="\d+",method="GET",endpoint="/employees/<int:emp_id>",status="200"\} [1-9]', body)
+    assert 'endpoint="unmatched",status="404"' in body
+    assert re.search(r'http_request_db_queries_bucket\{[^}]*endpoint="/employees/<int:emp_id>",le="\+Inf"\} [1-9]', body)
+    monkeypatch.setitem(app.config, "METRICS_TOKEN", "scrape-secret")
+    assert client.client.get("/metrics").status_code == 401
+    assert client.client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
+
+def test_metrics_leave_statement_execution_to_the_dialect(client, monkeypatch):
+    """Test statements of a timed request still run through the dialect's own do_execute."""
+    dialect = db.engine.dialect
+    executed = []
+    do_execute = dialect.do_execute
+    monkeypatch.setattr(dialect, "do_execute", lambda *args: executed.append(args[1]) or do_execute(*args))
+    response = client.get("/employees?per_page=1")
+    queries = int(response.headers["Server-Timing"].rsplit('desc="', 1)[1].split()[0])
+    assert queries >= 1 and len(executed) == queries
+
+def test_metrics_disabled(tmp_path):
+    """Test METRICS_ENABLED=False removes /metrics and the Server-Timing header; pool stats render on file databases."""
+    from employee_app.app.app import create_app, init_db
+    from employee_app.app.config import TestingConfig
+
+    class FileConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'metrics.db'}"
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        init_db()
+        body = app.test_client().get("/metrics").get_data(as_text=True)
+        db.session.remove()
+        db.engine.dispose()
+    assert 'db_pool_size{worker=' in body and 'db_pool_checkout_wait_seconds_count{' in body
+
+    class DisabledConfig(FileConfig):
+        METRICS_ENABLED = False
+
+    app = create_app(DisabledConfig)
+    with app.app_context():
+        client = app.test_client()
+        assert client.get("/metrics").status_code == 404
+        assert "Server-Timing" not in client.post("/login", json={}).headers
+        db.session.remove()
+        db.engine.dispose()
+
+def test_reset_tokens_hashed_and_purged(client, app, request_reset_token):
+    """Test reset tokens are stored as hashes, redeemed once, and expired or used ones purged in batches."""
+    from datetime import timedelta
+    from employee_app.app.models.outbox import utcnow
+    from employee_app.app.models.reset_token import PasswordResetToken, hash_token
+    from employee_app.app.models.models import User
+    from employee_app.app.reset_tokens import purge_reset_tokens
+    purge_reset_tokens()  # Tokens left by earlier tests
+    token = request_reset_token(client.client, "testuser@example.com")
+    entry = PasswordResetToken.query.filter_by(token_hash=hash_token(token)).one()
+    assert len(entry.token_hash) == 64 and token not in entry.token_hash
+    user_id = User.query.filter_by(email="testuser@example.com").one().id
+    db.session.add_all([PasswordResetToken(user_id=user_id, token_hash=f"{n:064x}", expires_at=utcnow() - timedelta(hours=1)) for n in range(5)]
+                       + [PasswordResetToken(user_id=user_id, token_hash=f"{n:064x}", expires_at=utcnow() + timedelta(hours=1), used=True) for n in range(5, 8)])
+    db.session.commit()
+    result = app.test_cli_runner().invoke(args=["purge-reset-tokens", "--batch-size", "2"])
+    assert result.exit_code == 0, result.output
+    assert "Purged 5 expired and 3 used reset tokens in 5 batches" in result.output
+    assert client.post("/password-reset", json={"token": token, "password": "testpass123"}).status_code == 200
+    assert client.post("/password-reset", json={"token": token, "password": "testpass123"}).status_code == 400  # Used
+    assert purge_reset_tokens(batch_size=2) == {"expired": 0, "used": 1, "batches": 1}
+    assert PasswordResetToken.query.filter_by(token_hash=hash_token(token)).first() is None
+
+def test_reset_token_migration_hashes_live_tokens(tmp_path):
+    """Test migration 0005 hashes live plain tokens, drops dead ones, and its downgrade restores the old column."""
+    from datetime import timedelta
+    from sqlalchemy import inspect, text
+    from employee_app.app.app import create_app
+    from employee_app.app.config import TestingConfig
+    from employee_app.app.migrate import upgrade_database
+    from employee_app.app.models.outbox import utcnow
+    from employee_app.app.models.reset_token import hash_token
+
+    class FileConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'tokens.db'}"
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        upgrade_database("0004")
+        with db.engine.begin() as connection:
+            connection.execute(text("INSERT INTO user (id, name, email, password_hash) VALUES (1, 'Old', 'old@example.com', 'x')"))
+            for token, expires_at, used in [("live", utcnow() + timedelta(minutes=30), False),
+                                            ("expired", utcnow() - timedelta(minutes=1), False),
+                                            ("used", utcnow() + timedelta(minutes=30), True)]:
+                connection.execute(text("INSERT INTO password_reset_tokens (user_id, token, expires_at, used) VALUES (1, :token, :expires_at, :used)"),
+                                   {"token": token, "expires_at": expires_at, "used": used})
+        upgrade_database()
+        assert "token" not in {column["name"] for column in inspect(db.engine).get_columns("password_reset_tokens")}
+        with db.engine.connect() as connection:
+            assert connection.execute(text("SELECT token_hash FROM password_reset_tokens")).scalars().all() == [hash_token("live")]
+        assert app.test_client().post("/password-reset", json={"token": "live", "password": "newpass456"}).status_code == 200
+        assert app.test_cli_runner().invoke(args=["db", "downgrade", "0004"]).exit_code == 0
+        columns = {column["name"] for column in inspect(db.engine).get_columns("password_reset_tokens")}
+        assert "token" in columns and "token_hash" not in columns
+        db.session.remove()
+        db.engine.dispose()
+
+def test_rate_limits_bound_login_attack(client, app, monkeypatch):
+    """Stress test: a login attack is throttled before any query or password hash, while list traffic is unaffected."""
+    from employee_app.app.app import password_hasher, rate_limiter
+    from employee_app.app.ratelimit import MemoryBackend
+    monkeypatch.setattr(rate_limiter, "backend", MemoryBackend())
+    monkeypatch.setattr(rate_limiter, "limits", {"login": {"ip": (5, 60), "email": (3, 60)}, "password_reset_request": {"ip": (2, 60)}})
+    verified = []
+    verify = password_hasher.verify
+    monkeypatch.setattr(password_hasher, "verify", lambda *args: verified.append(1) or verify(*args))
+    statuses, list_statuses = [], []
+    for n in range(200):
+        # Credential stuffing from one address: the same victim, then many accounts
+        email = "testuser@example.com" if n < 100 else f"victim{n}@example.com"
+        response = client.client.post("/login", json={"email": email, "password": "wrongpass"}, environ_base={"REMOTE_ADDR": "10.9.9.9"})
+        statuses.append(response.status_code)
+        if response.status_code == 429:
+            assert int(response.headers["Retry-After"]) >= 1
+            assert response.headers["Server-Timing"].endswith('desc="0 queries"')  # Rejected before the database
+        if n % 10 == 0:
+            list_statuses.append(client.get("/employees?per_page=5").status_code)
+    assert statuses[:3] == [401] * 3 and statuses.count(429) == 197
+    assert len(verified) <= 3  # Password hashing CPU is bounded by the limit, not by the attack
+    assert set(list_statuses) == {200}
+    # The victim's bucket is shared by every address; other users and addresses are unaffected
+    assert client.client.post("/login", json={"email": "testuser@example.com", "password": "testpass123"}, environ_base={"REMOTE_ADDR": "10.8.8.8"}).status_code == 429
+    response = client.client.post("/login", json={"email": "other@example.com", "password": "wrongpass"}, environ_base={"REMOTE_ADDR": "10.8.8.8"})
+    assert response.status_code == 401
+    for expected in (200, 200, 429):
+        assert client.client.post("/password-reset-request", json={"email": "testuser@example.com"}, environ_base={"REMOTE_ADDR": "10.7.7.7"}).status_code == expected
+    assert rate_limiter.stats()["rejected"]["login"] >= 198
+
+def test_rate_limit_backends(app):
+    """Test the token bucket refill, the shared backend against a local stand-in, and X-Forwarded-For handling."""
+    from employee_app.app.ratelimit import MemoryBackend, RateLimiter, RedisBackend, gcra
+    tat = None
+    for _ in range(3):
+        tat, retry_after = gcra(tat, 100.0, capacity=3, period=60)
+        assert retry_after == 0.0
+    assert gcra(tat, 100.0, 3, 60) == (None, 20.0)  # Burst used up; one token back every 20 seconds
+    assert gcra(tat, 120.0, 3, 60)[1] == 0.0
+    lru = MemoryBackend(max_keys=2)
+    for key in ("a", "b", "c"):
+        lru.take(key, 1, 60)
+    assert lru.take("a", 1, 60) == 0.0 and lru.take("c", 1, 60) > 0  # "a" was evicted with a full bucket
+
+    class LocalRedis:
+        """Stand-in for a shared Redis: runs the script's algorithm on a dict."""
+        def __init__(self):
+            self.data = {}
+            self.down = False
+        def register_script(self, script):
+            def run(keys, args):
+                if self.down:
+                    raise ConnectionError("connection refused")
+                new_tat, retry_after = gcra(self.data.get(keys[0]), 1000.0, *args)
+                if new_tat is not None:
+                    self.data[keys[0]] = new_tat
+                return str(retry_after).encode()
+            return run
+
+    redis = LocalRedis()
+    workers = [RedisBackend(client=redis), RedisBackend(client=redis)]
+    assert [worker.take("login:ip:x", 2, 60) for worker in workers] == [0.0, 0.0]
+    assert workers[0].take("login:ip:x", 2, 60) == 30.0  # Both workers drew from the same bucket
+    redis.down = True
+    assert workers[1].take("login:ip:x", 2, 60) == 0.0  # Fails open
+    limiter = RateLimiter()
+    limiter.trusted_proxies = 1
+    with app.test_request_context(headers={"X-Forwarded-For": "6.6.6.6, 1.2.3.4"}, environ_base={"REMOTE_ADDR": "10.0.0.1"}):
+        assert limiter.client_ip() == "1.2.3.4"  # The client cannot choose its address by adding entries on the left
+    with app.test_request_context(environ_base={"REMOTE_ADDR": "10.0.0.1"}):
+        assert limiter.client_ip() == "10.0.0.1"
+
+def test_asgi_reads_use_async_session(client, tmp_path):
+    """Test the ASGI app serves reads through the async engine with the same responses as WSGI, and writes via threads."""
+    import asyncio
+    from sqlalchemy import event
+    from employee_app.app.app import create_app, init_db
+    from employee_app.app.asgi_app import AsyncReadApp
+    from employee_app.app.config import TestingConfig
+    from employee_app.app.models.models import Employee
+
+    class FileConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'asgi.db'}"
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        init_db()
+        db.session.add_all([Employee(name=f"Async {n}", email=f"async{n}@example.com", department="Ops",
+                                     phone="1234567890") for n in range(5)])
+        db.session.commit()
+        wsgi = app.test_client()
+        expected = {path: wsgi.get(path, headers=client.headers).data
+                    for path in ("/employees?per_page=2", "/employees/1", "/employees/export?format=csv")}
+        db.session.remove()
+    asgi = AsyncReadApp(app)
+    async_statements = []
+
+    async def call(method, path, headers=None, body=b""):
+        path, _, query = path.partition("?")
+        scope = {"type": "http", "method": method, "path": path, "query_string": query.encode(),
+                 "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+                 "client": ("127.0.0.1", 5000), "server": ("testserver", 80)}
+        messages = [{"type": "http.request", "body": body}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        await asgi(scope, receive, send)
+        return sent[0]["status"], {k.decode(): v.decode() for k, v in sent[0]["headers"]}, b"".join(m.get("body", b"") for m in sent[1:])
+
+    async def scenario():
+        asgi.start()
+        event.listen(asgi.engine.sync_engine, "before_cursor_execute", lambda *args: async_statements.append(args[2]))
+        results = {
+            "list": await call("GET", "/employees?per_page=2", client.headers),
+            "one": await call("GET", "/employees/1", client.headers),
+            "missing": await call("GET", "/employees/999", client.headers),
+            "anonymous": await call("GET", "/employees"),
+            "export": await call("GET", "/employees/export?format=csv", client.headers),
+        }
+        results["not_modified"] = await call("GET", "/employees/1", {**client.headers, "If-None-Match": results["one"][1]["ETag"]})
+        reads = len(async_statements)
+        results["concurrent"] = await asyncio.gather(*[call("GET", f"/employees/{n}", client.headers) for n in range(1, 6)])
+        results["create"] = await call("POST", "/employees", {**client.headers, "Content-Type": "application/json"},
+                                       b'{"name": "Threaded", "email": "threaded@example.com", "department": "Ops", "phone": "1234567890"}')
+        results["writes_on_loop"] = len(async_statements) - reads - 10  # Two statements per concurrent read
+        await asgi.stop()
+        return results
+
+    results = asyncio.run(scenario())
+    with app.app_context():
+        db.engine.dispose()
+    assert results["list"][0] == 200 and results["list"][2] == expected["/employees?per_page=2"]
+    assert results["one"][2] == expected["/employees/1"]
+    assert results["export"][2] == expected["/employees/export?format=csv"]
+    assert results["export"][1]["Content-Disposition"] == "attachment; filename=employees.csv"
+    assert results["missing"][0] == 404 and results["anonymous"][0] == 401
+    assert results["not_modified"][0] == 304
+    assert [status for status, _, _ in results["concurrent"]] == [200] * 5
+    assert results["create"][0] in (200, 201) and results["writes_on_loop"] == 0
+    assert any("employee" in statement for statement in async_statements)
@@ -0,0 +1,110 @@
+"""
+test_endpoint_benchmarks.py
+pytest-benchmark suite timing each API endpoint against a generated directory.
+
+Seeds BENCH_EMPLOYEES employees (default 10,000) and BENCH_USERS users with the deterministic generator in
+benchmarks/generate.py, then times full requests through the test client: listing, sorted deep pages, search,
+department filter, single reads, create, update, delete and login. Everything generated is removed afterwards.
+Run only the benchmarks and save machine-readable results for comparison between commits with:
+    BENCH_EMPLOYEES=100000 python -m pytest employee_app/tests/test_endpoint_benchmarks.py --benchmark-only \\
+        --benchmark-autosave
+    python -m pytest employee_app/tests/test_endpoint_benchmarks.py --benchmark-only --benchmark-compare
+(or --benchmark-json=results.json). Skipped when pytest-benchmark is not installed.
+"""
+import itertools
+import os
+import pytest
+from sqlalchemy import delete, func, select
+from employee_app.app.etags import bump_table_version
+from employee_app.app.models.db import db
+from employee_app.app.models.models import Employee, User
+from employee_app.benchmarks.generate import BENCH_PASSWORD, seed_directory, user_email
+
+pytest.importorskip('pytest_benchmark')
+
+EMPLOYEES = int(os.environ.get('BENCH_EMPLOYEES', 10000))
+USERS = int(os.environ.get('BENCH_USERS', 10))
+DOMAIN = '%@bench.example.com'
+
+
+@pytest.fixture(scope='module')
+def directory(app):
+    """
+    Test client, auth headers and the id range of a generated directory.
+    Removes the generated employees and users afterwards.
+    """
+    seed_directory(EMPLOYEES, USERS)
+    first_id = db.session.execute(select(func.min(Employee.id)).where(Employee.email.like(DOMAIN))).scalar()
+    client = app.test_client()
+    token = client.post('/login', json={'email': user_email(0), 'password': BENCH_PASSWORD}).get_json()['token']
+    yield client, {'Authorization': f'Bearer {token}'}, first_id
+    bump_table_version(db.session, Employee.__tablename__)
+    db.session.execute(delete(Employee).where(Employee.email.like(DOMAIN)))
+    db.session.execute(delete(User).where(User.email.like(DOMAIN)))
+    db.session.commit()
+
+
+@pytest.mark.benchmark(group='endpoints-read', max_time=0.5, min_rounds=5)
+@pytest.mark.parametrize('url', [
+    '/employees?per_page=20',
+    '/employees?sort=name&page=100&per_page=20',
+    '/employees?department=Finance&sort=email&per_page=20',
+    '/employees?search=ali+smi&per_page=20',
+], ids=['first-page', 'sorted-deep-page', 'department', 'search'])
+def test_list_employees_endpoint(benchmark, directory, url):
+    """Benchmark GET /employees with the common query shapes."""
+    client, headers, _ = directory
+    response = benchmark(client.get, url, headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['employees']
+
+
+@pytest.mark.benchmark(group='endpoints-read', max_time=0.5, min_rounds=5)
+def test_get_employee_endpoint(benchmark, directory):
+    """Benchmark GET /employees/<id> over different ids."""
+    client, headers, first_id = directory
+    ids = itertools.cycle(range(first_id, first_id + EMPLOYEES, max(1, EMPLOYEES // 997)))
+    response = benchmark(lambda: client.get(f'/employees/{next(ids)}', headers=headers))
+    assert response.status_code == 200
+
+
+@pytest.mark.benchmark(group='endpoints-write', max_time=0.5, min_rounds=5)
+def test_create_employee_endpoint(benchmark, directory):
+    """Benchmark POST /employees with a new email each round."""
+    client, headers, _ = directory
+    counter = itertools.count(EMPLOYEES)
+
+    def create():
+        n = next(counter)
+        return client.post('/employees', headers=headers, json={
+            'name': f'Created {n}', 'email': f'created{n}@bench.example.com', 'department': 'IT', 'phone': '5550001111'})
+
+    assert benchmark(create).status_code in (200, 201)
+
+
+@pytest.mark.benchmark(group='endpoints-write', max_time=0.5, min_rounds=5)
+def test_update_employee_endpoint(benchmark, directory):
+    """Benchmark PUT /employees/<id> on one generated employee."""
+    client, headers, first_id = directory
+    names = itertools.cycle(['Updated Name A', 'Updated Name B'])
+    response = benchmark(lambda: client.put(f'/employees/{first_id}', headers=headers, json={'name': next(names)}))
+    assert response.status_code == 200
+
+
+@pytest.mark.benchmark(group='endpoints-write', max_time=0.5, min_rounds=5)
+def test_delete_employee_endpoint(benchmark, directory):
+    """Benchmark DELETE /employees/<id>, deleting a different generated employee each round."""
+    client, headers, first_id = directory
+    ids = itertools.count(first_id + EMPLOYEES - 1, -1)
+    response = benchmark.pedantic(lambda emp_id: client.delete(f'/employees/{emp_id}', headers=headers),
+                                  setup=lambda: ((next(ids),), {}), rounds=20)
+    assert response.status_code == 200
+
+
+@pytest.mark.benchmark(group='endpoints-auth', max_time=0.5, min_rounds=3)
+def test_login_endpoint(benchmark, directory):
+    """Benchmark POST /login for generated users, including password verification."""
+    client, _, _ = directory
+    emails = itertools.cycle([user_email(n) for n in range(USERS)])
+    response = benchmark(lambda: client.post('/login', json={'email': next(emails), 'password': BENCH_PASSWORD}))
+    assert response.status_code == 200
@@ -0,0 +1,67 @@
+"""
+test_json_benchmarks.py
+pytest-benchmark suite for employee list responses.
+
+Times a full GET /employees request at per_page 5, 100 and 1,000 with the orjson and stdlib JSON providers.
+Run only the benchmarks, with comparison tables, using:
+    python -m pytest employee_app/tests/test_json_benchmarks.py --benchmark-only
+Skipped when pytest-benchmark is not installed.
+"""
+import pytest
+from types import SimpleNamespace
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import delete, insert
+from employee_app.app.app import create_jwt
+from employee_app.app.etags import bump_table_version
+from employee_app.app.models.db import db
+from employee_app.app.models.models import Employee
+from employee_app.app.serialization import OrjsonProvider, orjson
+
+pytest.importorskip('pytest_benchmark')
+
+DEPARTMENT = 'JsonBench'
+PER_PAGE = [5, 100, 1000]
+
+
+@pytest.fixture(scope='module')
+def bench_client(app):
+    """
+    Test client with auth headers and 1,000 employees in their own department.
+    Removes the employees afterwards.
+    """
+    rows = [
+        {'name': f'Json Bench {n:04d}', 'email': f'jsonbench{n}@example.com', 'department': DEPARTMENT,
+         'phone': f'5551{n:06d}'}
+        for n in range(max(PER_PAGE))
+    ]
+    version = bump_table_version(db.session, Employee.__tablename__)
+    db.session.execute(insert(Employee), [{**row, 'version': version} for row in rows])
+    db.session.commit()
+    token = create_jwt(SimpleNamespace(id=1, name='Bench', email='bench@example.com'))
+    yield app.test_client(), {'Authorization': f'Bearer {token}'}
+    bump_table_version(db.session, Employee.__tablename__)
+    db.session.execute(delete(Employee).where(Employee.department == DEPARTMENT))
+    db.session.commit()
+
+
+@pytest.fixture(params=['orjson', 'stdlib'])
+def json_provider(request, app, monkeypatch):
+    """Run the benchmark with each JSON provider installed on the app."""
+    if request.param == 'orjson':
+        if orjson is None:
+            pytest.skip('orjson is not installed')
+        monkeypatch.setattr(app, 'json', OrjsonProvider(app))
+    else:
+        monkeypatch.setattr(app, 'json', DefaultJSONProvider(app))
+    return request.param
+
+
+@pytest.mark.benchmark(group='list-employees', max_time=0.5, min_rounds=5)
+@pytest.mark.parametrize('per_page', PER_PAGE)
+def test_list_employees_serialization(benchmark, bench_client, json_provider, per_page):
+    """Benchmark GET /employees for one page of `per_page` employees."""
+    client, headers = bench_client
+    url = f'/employees?department={DEPARTMENT}&sort=name&per_page={per_page}'
+    response = benchmark(client.get, url, headers=headers)
+    assert response.status_code == 200
+    assert len(response.get_json()['employees']) == per_page
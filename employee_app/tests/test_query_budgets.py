@@ -0,0 +1,216 @@
+"""
+test_query_budgets.py
+SQL statement budgets for every API endpoint.
+
+Each case below makes one request and fails if it runs more SQL statements than its budget, listing the statements
+that ran, so an endpoint cannot quietly gain an N+1 query or an extra round trip. Budgets are the current counts
+(with cold count caches); when a change legitimately needs another statement, raise the budget in the same commit.
+Every route must have at least one case.
+"""
+import io
+import itertools
+import pytest
+from employee_app.app.app import count_cache
+from employee_app.app.models.db import db
+
+PASSWORD = 'budgetpass123'
+_numbers = itertools.count()
+
+
+class Api:
+    """Authenticated test client plus helpers that create the rows a case needs (outside the counted block)."""
+
+    def __init__(self, client, headers, reset_token=None):
+        self.client = client
+        self.headers = headers
+        self.reset_token = reset_token
+
+    def employee(self):
+        n = next(_numbers)
+        return self.client.post('/employees', headers=self.headers, json={
+            'name': f'Budget {n}', 'email': f'budget{n}@example.com', 'department': 'Budget', 'phone': '1234567890'
+        }).get_json()['id']
+
+    def user(self):
+        email = f'budgetuser{next(_numbers)}@example.com'
+        self.client.post('/register', json={'name': 'Budget User', 'email': email, 'password': PASSWORD})
+        return email
+
+
+def list_employees(api, counted):
+    with counted:
+        return api.client.get('/employees?per_page=20', headers=api.headers)
+
+
+def search_employees(api, counted):
+    with counted:
+        return api.client.get('/employees?search=budg&per_page=20', headers=api.headers)
+
+
+def list_department_sorted(api, counted):
+    with counted:
+        return api.client.get('/employees?department=Budget&sort=name&page=2&per_page=5', headers=api.headers)
+
+
+def export_employees(api, counted):
+    api.employee()
+    with counted:
+        return api.client.get('/employees/export?format=ndjson&department=Budget', headers=api.headers)
+
+
+def get_employee(api, counted):
+    emp_id = api.employee()
+    with counted:
+        return api.client.get(f'/employees/{emp_id}', headers=api.headers)
+
+
+def get_employee_not_modified(api, counted):
+    emp_id = api.employee()
+    etag = api.client.get(f'/employees/{emp_id}', headers=api.headers).headers['ETag']
+    with counted:
+        return api.client.get(f'/employees/{emp_id}', headers={**api.headers, 'If-None-Match': etag})
+
+
+def create_employee(api, counted):
+    with counted:
+        return api.client.post('/employees', headers=api.headers, json={
+            'name': 'Budget New', 'email': f'budgetnew{next(_numbers)}@example.com', 'department': 'Budget',
+            'phone': '1234567890'})
+
+
+def update_employee(api, counted):
+    emp_id = api.employee()
+    with counted:
+        # Every field at once: the duplicate email check must not cost a query per field
+        return api.client.put(f'/employees/{emp_id}', headers=api.headers, json={
+            'name': 'Budget Renamed', 'email': f'budgetrenamed{next(_numbers)}@example.com', 'department': 'Budget2',
+            'phone': '0987654321'})
+
+
+def delete_employee(api, counted):
+    emp_id = api.employee()
+    with counted:
+        return api.client.delete(f'/employees/{emp_id}', headers=api.headers)
+
+
+def bulk_import(api, counted):
+    rows = ''.join(f'{{"name": "Bulk Budget", "email": "bulkbudget{next(_numbers)}@example.com", '
+                   f'"department": "Budget", "phone": "1234567890"}}\n' for _ in range(20))
+    with counted:
+        return api.client.post('/employees/bulk', headers={**api.headers, 'Content-Type': 'application/x-ndjson'},
+                               data=io.BytesIO(rows.encode()))
+
+
+def batch_get(api, counted):
+    ids = [api.employee() for _ in range(10)]
+    with counted:
+        return api.client.post('/employees/batch-get', headers=api.headers, json={'ids': ids})
+
+
+def batch_update(api, counted):
+    ids = [api.employee() for _ in range(10)]
+    with counted:
+        return api.client.patch('/employees/batch', headers=api.headers,
+                                json={'items': [{'id': emp_id, 'department': 'Budget2'} for emp_id in ids]})
+
+
+def batch_delete(api, counted):
+    ids = [api.employee() for _ in range(10)]
+    with counted:
+        return api.client.delete('/employees/batch', headers=api.headers, json={'ids': ids})
+
+
+def register(api, counted):
+    with counted:
+        return api.client.post('/register', json={
+            'name': 'Budget User', 'email': f'budgetreg{next(_numbers)}@example.com', 'password': PASSWORD})
+
+
+def login(api, counted):
+    email = api.user()
+    with counted:
+        return api.client.post('/login', json={'email': email, 'password': PASSWORD})
+
+
+def logout(api, counted):
+    with counted:
+        return api.client.post('/logout', headers=api.headers)
+
+
+def password_reset_request(api, counted):
+    email = api.user()
+    with counted:
+        return api.client.post('/password-reset-request', json={'email': email})
+
+
+def password_reset(api, counted):
+    token = api.reset_token(api.client, api.user())
+    with counted:
+        return api.client.post('/password-reset', json={'token': token, 'password': 'budgetpass456'})
+
+
+def db_pool_stats(api, counted):
+    with counted:
+        return api.client.get('/stats/db-pool', headers=api.headers)
+
+
+def response_cache_stats(api, counted):
+    with counted:
+        return api.client.get('/stats/cache', headers=api.headers)
+
+
+def metrics(api, counted):
+    with counted:
+        return api.client.get('/metrics')
+
+
+# Case -> (endpoint, maximum SQL statements per request, request function)
+QUERY_BUDGETS = {
+    'list': ('api.get_employees', 3, list_employees),
+    'search': ('api.get_employees', 3, search_employees),
+    'department sorted page': ('api.get_employees', 3, list_department_sorted),
+    'export': ('api.export_employees', 1, export_employees),
+    'get': ('api.get_employee', 2, get_employee),
+    'get not modified': ('api.get_employee', 1, get_employee_not_modified),
+    'create': ('api.create_employee', 3, create_employee),
+    'update': ('api.update_employee', 4, update_employee),  # Load, change counter (2), UPDATE
+    'delete': ('api.delete_employee', 4, delete_employee),
+    'bulk import 20 rows': ('api.bulk_import_employees', 4, bulk_import),
+    'batch get 10': ('api.batch_get_employees', 1, batch_get),
+    'batch update 10': ('api.batch_update_employees', 13, batch_update),  # One UPDATE per employee
+    'batch delete 10': ('api.batch_delete_employees', 4, batch_delete),
+    'register': ('api.register', 1, register),
+    'login': ('api.login', 1, login),
+    'logout': ('api.logout', 0, logout),
+    'password reset request': ('api.password_reset_request', 3, password_reset_request),
+    'password reset': ('api.password_reset', 5, password_reset),
+    'db pool stats': ('api.db_pool_stats', 0, db_pool_stats),
+    'cache stats': ('api.response_cache_stats', 0, response_cache_stats),
+    'metrics': ('metrics', 0, metrics),
+}
+
+
+@pytest.fixture(scope='module')
+def api(app, request_reset_token):
+    """Test client logged in as a dedicated user."""
+    client = app.test_client()
+    email = Api(client, {}).user()
+    token = client.post('/login', json={'email': email, 'password': PASSWORD}).get_json()['token']
+    return Api(client, {'Authorization': f'Bearer {token}'}, request_reset_token)
+
+
+@pytest.mark.parametrize('case', list(QUERY_BUDGETS))
+def test_query_budget(case, api, assert_max_queries):
+    """Test an endpoint runs no more SQL statements than its budget."""
+    _, budget, run = QUERY_BUDGETS[case]
+    count_cache.clear()  # Budgets are for cold count caches, whatever ran before
+    response = run(api, assert_max_queries(budget, case))
+    assert response.status_code < 400, response.get_data(as_text=True)
+    db.session.remove()
+
+
+def test_every_endpoint_has_a_budget(app):
+    """Test each route is covered by at least one query budget case."""
+    covered = {endpoint for endpoint, _, _ in QUERY_BUDGETS.values()}
+    endpoints = {rule.endpoint for rule in app.url_map.iter_rules() if rule.endpoint != 'static'}
+    assert endpoints <= covered, f'Add QUERY_BUDGETS cases for: {sorted(endpoints - covered)}'
@@ -0,0 +1,137 @@
+"""
+test_query_plans.py
+Query plan tests for employee listings.
+
+Every supported sort/direction/department-filter combination of GET /employees (page and cursor mode) and of the
+export is requested, the SQL it issues is captured through engine events, and SQLite's EXPLAIN QUERY PLAN must show
+that rows come straight off an index: no temporary B-tree sort and no full table scan when filtering.
+"""
+import pytest
+from types import SimpleNamespace
+from sqlalchemy import event
+from employee_app.app.app import SORT_FIELDS, create_jwt
+from employee_app.app.models.db import db
+from employee_app.app.models.models import Employee
+
+DEPARTMENT = 'PlanQA'
+
+@pytest.fixture(scope='module')
+def plan_client(app):
+    """
+    Test client with auth headers and a few employees in their own department.
+    Removes the employees afterwards.
+    """
+    employees = [
+        Employee(name=f"Plan {n % 3}", email=f"plan{n}@example.com", department=DEPARTMENT, phone=f"55500000{n:02d}")
+        for n in range(12)
+    ]
+    db.session.add_all(employees)
+    db.session.commit()
+    token = create_jwt(SimpleNamespace(id=1, name='Plan', email='plan@example.com'))
+    yield app.test_client(), {'Authorization': f'Bearer {token}'}
+    for employee in employees:
+        db.session.delete(employee)
+    db.session.commit()
+
+def capture_employee_selects(client, url, headers):
+    """Issue a request and return the (statement, parameters) of every SELECT it ran against employee."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('SELECT') and 'FROM employee' in statement:
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        response = client.get(url, headers=headers)
+        response.get_data()  # Drain streamed responses (the export) so all their queries run
+        response.close()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response, statements
+
+def query_plan(statement, parameters=()):
+    """EXPLAIN QUERY PLAN detail lines for a statement."""
+    rows = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+    return [row[-1] for row in rows]
+
+def assert_index_plan(statements, filtered):
+    """Assert every captured statement avoids a temp B-tree sort, and uses an index when filtered."""
+    assert statements
+    for statement, parameters in statements:
+        plan = query_plan(statement, parameters)
+        assert not any('TEMP B-TREE' in line for line in plan), (statement, plan)
+        if filtered:
+            assert any('USING' in line and 'INDEX' in line for line in plan), (statement, plan)
+
+def listing_urls(base):
+    """Every supported sort/direction/filter combination for a listing URL."""
+    for department in (None, DEPARTMENT):
+        for sort in [None] + SORT_FIELDS:
+            for direction in ('asc', 'desc'):
+                url = f'{base}direction={direction}'
+                if sort:
+                    url += f'&sort={sort}'
+                if department:
+                    url += f'&department={department}'
+                yield url, bool(department)
+
+def test_plan_check_detects_sorts(plan_client):
+    """Test the plan check itself: ordering by an unindexed expression needs a temp B-tree."""
+    plan = query_plan('SELECT id FROM employee ORDER BY lower(name)')
+    assert any('TEMP B-TREE' in line for line in plan)
+
+def test_page_mode_plans_use_indexes(plan_client):
+    """Test every sort/filter combination in page mode reads rows in index order."""
+    client, headers = plan_client
+    for url, filtered in listing_urls('/employees?per_page=5&'):
+        _, statements = capture_employee_selects(client, url, headers)
+        assert_index_plan(statements, filtered)
+
+def test_cursor_mode_plans_use_indexes(plan_client):
+    """Test every sort/filter combination in cursor mode seeks on an index, on the first and a later page."""
+    client, headers = plan_client
+    for url, filtered in listing_urls('/employees?per_page=5&'):
+        response, statements = capture_employee_selects(client, url + '&after=', headers)
+        assert_index_plan(statements, filtered)
+        next_cursor = response.get_json()['next_cursor']
+        if next_cursor:
+            _, statements = capture_employee_selects(client, f'{url}&after={next_cursor}', headers)
+            assert_index_plan(statements, filtered)
+
+def test_export_plans_use_indexes(plan_client):
+    """Test the export reads every sort/filter combination in index order."""
+    client, headers = plan_client
+    for url, filtered in listing_urls('/employees/export?'):
+        _, statements = capture_employee_selects(client, url, headers)
+        assert_index_plan(statements, filtered)
+
+def test_department_filter(plan_client):
+    """Test GET /employees?department= returns only that department, with a matching total."""
+    client, headers = plan_client
+    data = client.get(f'/employees?department={DEPARTMENT}&per_page=100&sort=name', headers=headers).get_json()
+    assert data['total'] == 12
+    assert {e['department'] for e in data['employees']} == {DEPARTMENT}
+    assert [(e['name'], e['id']) for e in data['employees']] == sorted((e['name'], e['id']) for e in data['employees'])
+
+def test_reset_token_plans_use_indexes(app):
+    """Test the reset token lookup and both purge batches select through their indexes, not a table scan."""
+    from employee_app.app.reset_tokens import find_valid_token, purge_reset_tokens
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if 'FROM password_reset_tokens' in statement:
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        find_valid_token('no-such-token')
+        purge_reset_tokens(batch_size=10)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+    plans = [' '.join(query_plan(statement, parameters)) for statement, parameters in statements]
+    assert len(plans) == 3
+    assert 'USING INDEX ix_password_reset_tokens_token_hash' in plans[0]
+    assert 'USING INDEX ix_password_reset_tokens_unused_expires_at' in plans[1]
+    assert 'USING INDEX ix_password_reset_tokens_used' in plans[2]
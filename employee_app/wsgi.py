@@ -0,0 +1,11 @@
+"""
+wsgi.py
+WSGI entry point for production servers.
+
+Create the schema once per deploy, then start gunicorn from the project root:
+    flask --app employee_app.wsgi init-db
+    gunicorn -c employee_app/gunicorn.conf.py employee_app.wsgi:app
+"""
+from employee_app.app.app import create_app
+
+app = create_app()